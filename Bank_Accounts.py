@@ -1,4 +1,183 @@
-from datetime import datetime, date
+import copy
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Iterator
+
+import Bank_History as bh
+
+# Lock held while a transaction is settled, shared by the menu and the background executor
+settlement_lock: threading.RLock = threading.RLock();
+
+# Functions called with the accounts and the event after every transfer, settlement and account opening
+event_listeners: list[Callable[[dict[int, dict[str, any]], dict[str, any]], None]] = [];
+
+# Functions called with the accounts, an account number and its new checksum whenever a stored checksum changes
+checksum_listeners: list[Callable[[dict[int, dict[str, any]], int, str], None]] = [];
+
+# Copy-on-write state of every account store with open read snapshots, keyed by id(accounts): the number of open
+# snapshots and the account numbers already copied since the newest snapshot was taken
+snapshot_states: dict[int, dict[str, any]] = {};
+
+# Format of every timestamp stored in a transaction
+TIME_FORMAT: str = "%Y-%m-%d %H:%M:%S";
+
+# Number of seconds add_transaction waits for the ingest pipeline to commit a transaction
+INGEST_TIMEOUT_SECONDS: float = 30.0;
+
+
+class SystemClock:
+    """
+       The source of the current time for transactions.
+
+       Timestamps have a resolution of one second, so the formatted text of the last second is cached and
+       reused by every transaction settled within that second.
+    """
+
+    def __init__(self) -> None:
+        self.cache: tuple[int, str] = (-1, "");
+
+    def time(self) -> float:
+        """
+           Returns:
+               float: The current time in seconds since the epoch.
+        """
+
+        return time.time();
+
+    def format(self, seconds: float) -> str:
+        """
+           Formats a time in seconds since the epoch as a local timestamp, reusing the text of the last second.
+
+           Args:
+               seconds (float): The time in seconds since the epoch.
+
+           Returns:
+               str: The timestamp in TIME_FORMAT.
+        """
+
+        whole_seconds: int = int(seconds);
+        cached_second, text = self.cache;
+        if whole_seconds != cached_second:
+            text = datetime.fromtimestamp(whole_seconds).strftime(TIME_FORMAT);
+            self.cache = (whole_seconds, text);
+        return text;
+
+    def timestamp(self) -> str:
+        """
+           Returns:
+               str: The current time formatted as a timestamp.
+        """
+
+        return self.format(self.time());
+
+
+class FixedClock(SystemClock):
+    """
+       A deterministic clock for tests and benchmarks that only moves when it is advanced.
+    """
+
+    def __init__(self, start: datetime) -> None:
+        """
+           Args:
+               start (datetime): The time the clock shows until it is advanced.
+        """
+
+        super().__init__();
+        self.seconds: float = start.timestamp();
+
+    def time(self) -> float:
+        return self.seconds;
+
+    def advance(self, seconds: float) -> None:
+        """
+           Moves the clock forward.
+
+           Args:
+               seconds (float): The number of seconds to move forward.
+        """
+
+        self.seconds += seconds;
+
+
+# Clock used when no clock is passed to a function
+system_clock: SystemClock = SystemClock();
+
+
+# Function to convert an amount to integer cents
+def to_cents(amount: float) -> int:
+    """
+       Converts an amount in currency units, such as a transaction amount or an initial balance, to the integer
+       number of cents that balances and views are stored in and every money calculation is done in.
+
+       Args:
+           amount (float): An amount in currency units.
+
+       Returns:
+           int: The amount in cents, rounded to the nearest cent.
+    """
+
+    return round(amount * 100);
+
+
+# Function to convert integer cents back to an amount in currency units
+def from_cents(cents: int) -> float:
+    """
+       Returns the float closest to the exact value of the cents, for transaction amounts and exports. Balances
+       are never kept in this form, so no rounding error can accumulate in them.
+
+       Args:
+           cents (int): An amount in cents.
+
+       Returns:
+           float: The amount in currency units.
+    """
+
+    return cents / 100;
+
+
+# Function to parse an amount entered by the user into integer cents
+def parse_cents(amount: str) -> int:
+    """
+       Args:
+           amount (str): The amount as text, such as '100' or '12.34'.
+
+       Returns:
+           int: The amount in cents.
+
+       Raises:
+           ValueError: If the text is not a number or includes fractions of a cent.
+    """
+
+    try:
+        cents: Decimal = Decimal(amount.strip()) * 100;
+    except InvalidOperation:
+        raise ValueError(f"'{amount}' is not a number.") from None;
+    if not cents.is_finite():
+        raise ValueError(f"'{amount}' is not a number.");
+    if cents != cents.to_integral_value():
+        raise ValueError("The amount cannot include fractions of a cent.");
+    return int(cents);
+
+
+# Function to format integer cents for display
+def format_cents(cents: int) -> str:
+    """
+       Args:
+           cents (int): An amount in cents.
+
+       Returns:
+           str: The amount with two decimal places, such as '-12.05'.
+    """
+
+    sign: str = "-" if cents < 0 else "";
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}";
 
 
 # Function to initialize the bank accounts data structure
@@ -12,12 +191,12 @@ def init_interface() -> dict[int, dict[str, any]]:
            containing account details.
     """
 
-    return {
+    return build_exposure_views(build_activity_views(build_reserved_views({
         1001: {
             "first_name": "Alice",
             "last_name": "Smith",
             "id_number": "123456789",
-            "balance": 2500.50,
+            "balance_cents": 250050,
             "transactions_to_execute": [
                 ("2024-08-17 14:00:00", "2024-08-18 14:00:00", 1001, 1002, 300),
                 ("2024-08-17 15:00:00", "2024-08-19 15:00:00", 1001, 1003, 200)
@@ -30,7 +209,7 @@ def init_interface() -> dict[int, dict[str, any]]:
             "first_name": "Bob",
             "last_name": "Johnson",
             "id_number": "987654321",
-            "balance": 1500.00,
+            "balance_cents": 150000,
             "transactions_to_execute": [],
             "transaction_history": []
         },
@@ -38,11 +217,11 @@ def init_interface() -> dict[int, dict[str, any]]:
             "first_name": "Charlie",
             "last_name": "Brown",
             "id_number": "555555555",
-            "balance": 3500.75,
+            "balance_cents": 350075,
             "transactions_to_execute": [],
             "transaction_history": []
         }
-    };
+    })));
 
 
 # Function to print the main menu and get user's selection
@@ -61,7 +240,8 @@ def print_menu() -> str:
     print("4. Reports interface");
     print("5. Open a new account");
     print("6. Exit");
-    return input("Select an option (1-6): ");
+    print("7. Memory diagnostics");
+    return input("Select an option (1-7): ");
 
 
 # Function to validate the account number
@@ -92,7 +272,8 @@ def account_validation_check(account_number: str, accounts: dict[int, dict[str,
 # Function to validate the amount to be transferred
 def amount_validation_check(amount: str, account_number: int, accounts: dict[int, dict[str, any]]) -> float | None:
     """
-        Validates the amount entered for a transaction to ensure it's positive and doesn't exceed the balance.
+        Validates the amount entered for a transaction to ensure it's positive and doesn't exceed the available
+        balance, which is the balance minus the amount reserved by pending transactions.
 
         Args:
             amount (str): The amount to be validated.
@@ -108,23 +289,71 @@ def amount_validation_check(amount: str, account_number: int, accounts: dict[int
 
     if amount.upper() == 'EX':
         return;
-    amount: float = float(amount);
-    if amount <= 0:
+    cents: int = parse_cents(amount);
+    # Funds already committed to pending transactions are not available
+    account: dict[str, any] = accounts[account_number];
+    available: int = account["balance_cents"] - reserved_amount(account);
+    if cents <= 0:
         raise ValueError("The amount must be a positive number.");
-    elif amount > accounts[account_number]["balance"]:
+    elif cents > available:
         raise ValueError(f"The amount exceeds the available balance. "
-                         f"You can transfer up to {accounts[account_number]['balance']:.2f}.");
+                         f"You can transfer up to {format_cents(available)}.");
     else:
-        return amount;
+        return from_cents(cents);
+
+
+# Function to get the amount reserved by an account's pending transactions
+def reserved_amount(account: dict[str, any]) -> int:
+    """
+        Returns the total amount of the account's pending transactions without changing the account, so it is
+        safe to call without the settlement lock.
+
+        The total is read from the account's 'reserved_cents' field, which build_reserved_views and create_account
+        set up and enqueue_transaction and settle_transaction keep up to date in O(1). An account without the field
+        is summed from its queue.
+
+        Args:
+            account (dict): The account details.
+
+        Returns:
+            int: The reserved amount in cents.
+    """
+
+    reserved: int | None = account.get("reserved_cents");
+    if reserved is None:
+        return sum(to_cents(transaction[4]) for transaction in account["transactions_to_execute"]);
+    return reserved;
+
+
+# Function to build the reserved amount of every account
+def build_reserved_views(accounts: dict[int, dict[str, any]]) -> dict[int, dict[str, any]]:
+    """
+       Sets the 'reserved_cents' field of every account to the total of its pending transactions. After that,
+       enqueue_transaction and settle_transaction keep it up to date.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+
+       Returns:
+           dict: The accounts dictionary with the reserved amounts set.
+    """
+
+    with settlement_lock:
+        for account in accounts.values():
+            account["reserved_cents"] = sum(to_cents(transaction[4])
+                                            for transaction in account["transactions_to_execute"]);
+    return accounts;
 
 
 # Function to validate the date/time for future transactions
-def date_validation_check(future_date: str) -> datetime | None:
+def date_validation_check(future_date: str, clock: SystemClock | None = None) -> datetime | None:
     """
        Validates whether the provided future date is in the correct format and is in the future.
 
        Args:
            future_date (str): The date string to validate.
+           clock (SystemClock | None): The clock the date must be later than, or None for the system clock
+                                       (default is None).
 
        Returns:
            datetime | None: The validated future datetime or None if 'EX' is typed.
@@ -135,20 +364,27 @@ def date_validation_check(future_date: str) -> datetime | None:
 
     if future_date.upper() == 'EX':
         return;
-    future_date: datetime = datetime.strptime(future_date, "%Y-%m-%d %H:%M:%S");
-    if future_date < datetime.now():
+    future_date: datetime = datetime.strptime(future_date, TIME_FORMAT);
+    now: datetime = datetime.now() if clock is None else datetime.fromtimestamp(clock.time());
+    if future_date < now:
         raise ValueError("The time entered must be in the future.");
     else:
         return future_date;
 
 
 # Function to add a new transaction to the accounts
-def add_transaction(accounts: dict[int, dict[str, any]]) -> dict[int, dict[str, any]]:
+def add_transaction(accounts: dict[int, dict[str, any]], scheduler: any = None,
+                    clock: SystemClock | None = None, ingest: any = None) -> dict[int, dict[str, any]]:
     """
        Adds a new transaction to the accounts' transaction queue.
 
        Args:
            accounts (dict): The dictionary containing all accounts.
+           scheduler (any): An optional background executor whose schedule method is called with the new
+                            transaction, so it is settled automatically at its future time (default is None).
+           clock (SystemClock | None): The clock for the creation time, or None for the system clock (default is None).
+           ingest (any): An optional ingest pipeline that commits the transaction instead of this function, and
+                         schedules it with its own scheduler (default is None).
 
        Returns:
            dict: The updated accounts dictionary after the transaction is added.
@@ -190,35 +426,785 @@ def add_transaction(accounts: dict[int, dict[str, any]]) -> dict[int, dict[str,
         except ValueError as e:
             print(f"Invalid amount: {e} Please enter a valid positive number.");
 
-    creation_time: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S");
+    creation_time: str = (clock or system_clock).timestamp();
 
     while True:
         future_time: str = input("Enter the future time for execution (YYYY-MM-DD HH:MM:SS) "
                                  "or type 'EX' to return to the main menu: ");
         try:
-            future_time: datetime | None = date_validation_check(future_time);
+            future_time: datetime | None = date_validation_check(future_time, clock);
             if future_time is None:
                 return accounts;
-            future_datetime: str = future_time.strftime("%Y-%m-%d %H:%M:%S");
+            future_datetime: str = future_time.strftime(TIME_FORMAT);
             break;
         except ValueError as e:
             print(f"Invalid datetime format or past date: {e}. Please try again.");
 
     transaction: tuple[str, str, int, int, float] = (creation_time, future_datetime, source_account_number,
                                                      target_account_number, amount);
-    accounts[source_account_number]["transactions_to_execute"].append(transaction)
+    if ingest is not None:
+        future: any = ingest.submit(transaction);
+        if future is None:
+            print("The system is busy. The transaction was not added, please try again.");
+            return accounts;
+        try:
+            future.result(timeout=INGEST_TIMEOUT_SECONDS);
+        except TimeoutError:
+            print(f"The transaction was not committed within {INGEST_TIMEOUT_SECONDS:g} seconds. It may still be "
+                  f"added, so check the pending transactions before submitting it again.");
+            return accounts;
+        except ValueError as e:
+            print(f"The transaction was rejected: {e}");
+            return accounts;
+        except Exception as e:
+            print(f"The transaction could not be added: {e!r}");
+            return accounts;
+        print("Transaction added successfully.");
+        return accounts;
+    enqueue_transaction(accounts, transaction);
+    if scheduler is not None:
+        scheduler.schedule(transaction);
     print("Transaction added successfully.");
     return accounts;
 
 
+class DedupIndex:
+    """
+       A bounded, time-expiring set of idempotency keys used to reject repeated transaction submissions.
+
+       Keys are kept in insertion order, which is also their expiry order, so expired keys are dropped from the
+       front in amortized O(1). When the index is full the oldest key is dropped as well.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, ttl_seconds: float = 24 * 60 * 60,
+                 clock: Callable[[], float] | None = None) -> None:
+        """
+           Args:
+               capacity (int): The maximum number of remembered keys (default is 1,000,000).
+               ttl_seconds (float): How long a key is remembered (default is one day).
+               clock (Callable | None): Returns the current time in seconds, such as the time method of a
+                                        FixedClock, or None for time.monotonic (default is None).
+        """
+
+        self.capacity: int = capacity;
+        self.ttl_seconds: float = ttl_seconds;
+        self.clock: Callable[[], float] = clock or time.monotonic;
+        self.expiries: OrderedDict[str, float] = OrderedDict();
+
+    def __len__(self) -> int:
+        return len(self.expiries);
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.expiries and self.expiries[key] > self.clock();
+
+    def add(self, key: str, now: float | None = None) -> bool:
+        """
+           Remembers a key unless it was seen within its time to live.
+
+           Args:
+               key (str): The idempotency key.
+               now (float | None): The current time, or None to read the index's clock (default is None).
+
+           Returns:
+               bool: True if the key is new, False if it is a duplicate.
+        """
+
+        now = self.clock() if now is None else now;
+        expiries: OrderedDict[str, float] = self.expiries;
+        while expiries:
+            oldest_key, expiry = next(iter(expiries.items()));
+            if expiry > now:
+                break;
+            del expiries[oldest_key];
+
+        if key in expiries:
+            return False;
+        if len(expiries) >= self.capacity:
+            expiries.popitem(last=False);
+        expiries[key] = now + self.ttl_seconds;
+        return True;
+
+
+# Function to add a validated transaction to the source account's queue
+def enqueue_transaction(accounts: dict[int, dict[str, any]], transaction: tuple[str, str, int, int, float],
+                        idempotency_key: str | None = None, dedup_index: DedupIndex | None = None,
+                        publish: bool = True) -> None:
+    """
+       Appends a validated transaction to the source account's queue, rejecting repeated submissions.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+           transaction (tuple): The transaction to add.
+           idempotency_key (str | None): A client-supplied key identifying the submission (default is None).
+           dedup_index (DedupIndex | None): The index of recently used keys, required with a key (default is None).
+           publish (bool): Whether to publish a 'transfer' event to the event listeners (default is True).
+
+       Returns:
+           None
+
+       Raises:
+           ValueError: If an idempotency key is given without an index, or the key was already used.
+    """
+
+    if idempotency_key is not None and dedup_index is None:
+        raise ValueError("An idempotency key requires a dedup index to check it against.");
+    with store_lock(accounts):
+        source_account: dict[str, any] = writable_account(accounts, transaction[2]);
+        if idempotency_key is not None and not dedup_index.add(idempotency_key):
+            raise ValueError(f"Duplicate submission: idempotency key '{idempotency_key}' was already used.");
+        if transaction[3] in accounts:
+            writable_account(accounts, transaction[3]);
+        source_account["reserved_cents"] = reserved_amount(source_account) + to_cents(transaction[4]);
+        source_account["transactions_to_execute"].append(transaction);
+        update_exposure(accounts, transaction, 1);
+        if publish:
+            publish_event(accounts, {"type": "transfer", "transaction": transaction});
+
+
+class UndoLog:
+    """
+       A log of the old values overwritten by a batch of changes, so the batch can be rolled back.
+
+       Changes are made through set, append and remove, which record just enough to reverse them. Nothing is
+       copied up front, so logging costs O(1) per change. The log of untracked_changes records nothing and is used
+       when no rollback is needed.
+    """
+
+    # Marks a key that did not exist before it was set
+    MISSING: object = object();
+
+    def __init__(self, enabled: bool = True) -> None:
+        """
+           Args:
+               enabled (bool): Whether to record the changes (default is True).
+        """
+
+        self.enabled: bool = enabled;
+        self.entries: list[tuple] = [];
+
+    def set(self, container: dict, key: any, value: any) -> None:
+        if self.enabled:
+            self.entries.append(("set", container, key, container.get(key, UndoLog.MISSING)));
+        container[key] = value;
+
+    def append(self, items: list, item: any) -> None:
+        if self.enabled:
+            self.entries.append(("append", items));
+        items.append(item);
+
+    def delete(self, container: dict, key: any) -> None:
+        if self.enabled:
+            self.entries.append(("set", container, key, container[key]));
+        del container[key];
+
+    def remove(self, items: list, item: any) -> bool:
+        """
+           Removes the first occurrence of an item from a list.
+
+           Returns:
+               bool: False if the item is not in the list.
+        """
+
+        try:
+            index: int = items.index(item);
+        except ValueError:
+            return False;
+        del items[index];
+        if self.enabled:
+            self.entries.append(("remove", items, index, item));
+        return True;
+
+    def call(self, function: Callable, *args: any) -> None:
+        # Records a function that reverses a change made outside the account dicts
+        if self.enabled:
+            self.entries.append(("call", function, args));
+
+    def rollback(self) -> None:
+        """
+           Reverses every recorded change, the last change first, and empties the log.
+        """
+
+        for entry in reversed(self.entries):
+            match entry:
+                case ("set", container, key, old) if old is UndoLog.MISSING:
+                    del container[key];
+                case ("set", container, key, old):
+                    container[key] = old;
+                case ("append", items):
+                    items.pop();
+                case ("remove", items, index, item):
+                    items.insert(index, item);
+                case ("call", function, args):
+                    function(*args);
+        self.entries.clear();
+
+
+# Log used by changes that are never rolled back
+untracked_changes: UndoLog = UndoLog(enabled=False);
+
+
+# Function to settle a single pending transaction
+def settle_transaction(accounts: dict[int, dict[str, any]], transaction: tuple[str, str, int, int, float],
+                       execution_time: str, publish: bool = True,
+                       undo: UndoLog | None = None) -> tuple[str, str, int, int, float, str] | None:
+    """
+       Moves a pending transaction from the source account's queue to its history and transfers the amount.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+           transaction (tuple): The pending transaction to settle.
+           execution_time (str): The execution time recorded in the transaction history. A time earlier than the
+                                 last execution time in the source account's history is raised to it.
+           publish (bool): Whether to publish a 'settlement' event to the event listeners (default is True).
+           undo (UndoLog | None): The log that records the changes for a rollback, or None (default is None).
+
+       Returns:
+           tuple | None: The executed transaction, or None if the transaction is no longer pending.
+
+       Raises:
+           KeyError: If the source or target account does not exist. Nothing has been changed then.
+    """
+
+    creation_time, future_time, source, target, amount = transaction;
+    log: UndoLog = undo if undo is not None else untracked_changes;
+    with store_lock(accounts):
+        source_account: dict[str, any] = writable_account(accounts, source);
+        target_account: dict[str, any] = writable_account(accounts, target);
+        reserved: int = reserved_amount(source_account);
+        if not log.remove(source_account["transactions_to_execute"], transaction):
+            return;
+        cents: int = to_cents(amount);
+        log.set(source_account, "reserved_cents", reserved - cents);
+        update_exposure(accounts, transaction, -1, log);
+
+        log.set(source_account, "balance_cents", source_account["balance_cents"] - cents);
+        log.set(target_account, "balance_cents", target_account["balance_cents"] + cents);
+
+        # History is searched by binary search on the execution time (see Bank_History.history_between), so a
+        # settlement whose clock was read before an earlier settlement took the lock is recorded at the later time
+        history: list[tuple[str, str, int, int, float, str]] = source_account["transaction_history"];
+        segments: list[dict[str, any]] = source_account.get("history_segments", []);
+        last_execution_time: str | None = history[-1][bh.EXECUTION_TIME] if history else \
+            segments[-1]["last_executed"] if segments else None;
+        if last_execution_time is not None and execution_time < last_execution_time:
+            execution_time = last_execution_time;
+
+        executed_transaction: tuple[str, str, int, int, float, str] = transaction + (execution_time,);
+        digest: str = history_digest(source_account);
+        log.append(source_account["transaction_history"], executed_transaction);
+        log.set(source_account, "history_digest", chain_digest(digest, executed_transaction));
+        update_checksum(source, source_account, log, accounts);
+        update_checksum(target, target_account, log, accounts);
+        update_activity(accounts, executed_transaction, log);
+        if publish:
+            publish_event(accounts, {"type": "settlement", "transaction": transaction,
+                                     "execution_time": execution_time});
+    return executed_transaction;
+
+
+# Function to settle a batch of pending transactions atomically
+def settle_batch(accounts: dict[int, dict[str, any]], transactions: list[tuple[str, str, int, int, float]],
+                 execution_time: str, publish: bool = True) -> list[tuple[str, str, int, int, float, str]]:
+    """
+       Settles a batch of pending transactions as one unit: either every transaction is settled, or an error
+       rolls back the changes of the whole batch through its undo log and is raised again. The settlement events
+       are published only after the whole batch has been applied.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+           transactions (list): The pending transactions to settle, in order.
+           execution_time (str): The execution time recorded in the transaction history.
+           publish (bool): Whether to publish 'settlement' events to the event listeners (default is True).
+
+       Returns:
+           list: The executed transactions. Transactions that are no longer pending are skipped.
+
+       Raises:
+           KeyError: If the source or target account of a transaction does not exist.
+    """
+
+    undo: UndoLog = UndoLog();
+    executed_transactions: list[tuple[str, str, int, int, float, str]] = [];
+    with store_lock(accounts):
+        try:
+            for transaction in transactions:
+                executed_transaction: tuple[str, str, int, int, float, str] | None = settle_transaction(
+                    accounts, transaction, execution_time, publish=False, undo=undo);
+                if executed_transaction is not None:
+                    executed_transactions.append(executed_transaction);
+        except BaseException:
+            undo.rollback();
+            raise;
+        if publish:
+            for executed_transaction in executed_transactions:
+                publish_event(accounts, {"type": "settlement", "transaction": executed_transaction[:5],
+                                         "execution_time": execution_time});
+    return executed_transactions;
+
+
+class ReadSnapshot(Mapping):
+    """
+       A read-only, point-in-time view of an account store for long reports.
+
+       Taking a snapshot copies only the account numbers, and unchanged accounts are read from the live store, so
+       a snapshot of a Bank_Storage.CachedAccounts store loads accounts one at a time through its cache instead of
+       all at once. While a snapshot is open, writers copy an account before its first change (see
+       writable_account), hand the unchanged account to the open snapshots and put the copy in the live store.
+       Reports therefore never see half-applied transfers or newly opened accounts, writers never wait for a
+       report, and only the accounts changed during the report are kept twice.
+    """
+
+    def __init__(self, accounts: dict[int, dict[str, any]]) -> None:
+        """
+           Args:
+               accounts (dict): The dictionary containing all accounts.
+        """
+
+        with settlement_lock:
+            self.accounts: dict[int, dict[str, any]] = accounts;
+            self.account_numbers: list[int] = list(accounts);
+            self.members: set[int] = set(self.account_numbers);
+            # The accounts as they were when the snapshot was taken, for the accounts changed since
+            self.saved: dict[int, dict[str, any]] = {};
+            state: dict[str, any] = snapshot_states.setdefault(id(accounts), {"snapshots": [], "copied": set()});
+            state["snapshots"].append(self);
+            # Every account is shared with this snapshot, including the ones copied for older snapshots
+            state["copied"] = set();
+        self.store_id: int = id(accounts);
+        self.closed: bool = False;
+
+    def __getitem__(self, account_number: int) -> dict[str, any]:
+        if account_number not in self.members:
+            raise KeyError(account_number);
+        account: dict[str, any] | None = self.saved.get(account_number);
+        return self.accounts[account_number] if account is None else account;
+
+    def __contains__(self, account_number: object) -> bool:
+        return account_number in self.members;
+
+    def __iter__(self):
+        return iter(self.account_numbers);
+
+    def __len__(self) -> int:
+        return len(self.account_numbers);
+
+    def __enter__(self) -> "ReadSnapshot":
+        return self;
+
+    def __exit__(self, *exc_info: any) -> None:
+        self.close();
+
+    def close(self) -> None:
+        """
+           Releases the snapshot. Once the last snapshot of a store is closed, writers change accounts in place again.
+        """
+
+        with settlement_lock:
+            if self.closed:
+                return;
+            self.closed = True;
+            state: dict[str, any] = snapshot_states[self.store_id];
+            # Snapshots compare equal by their contents, so this one is found by identity
+            state["snapshots"] = [snapshot for snapshot in state["snapshots"] if snapshot is not self];
+            self.saved = {};
+            if not state["snapshots"]:
+                del snapshot_states[self.store_id];
+
+
+# Function to lock an account store for one operation
+@contextmanager
+def store_lock(accounts: dict[int, dict[str, any]]) -> Iterator[None]:
+    """
+       Holds the settlement lock for an operation that changes the accounts. If the store is a cache that can
+       evict accounts, such as Bank_Storage.CachedAccounts, every account the operation touches is also pinned in
+       memory until the operation ends, so changes and rollbacks of account dicts held by the operation are never
+       lost to an eviction.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+    """
+
+    with settlement_lock:
+        pinned: Callable | None = getattr(accounts, "pinned", None);
+        with pinned() if pinned is not None else nullcontext():
+            yield;
+
+
+# Function to get an account for a change without affecting open read snapshots
+def writable_account(accounts: dict[int, dict[str, any]], account_number: int) -> dict[str, any]:
+    """
+       Returns the live account to change. If a read snapshot of the store is open and may still share the
+       account, the account is copied first, the open snapshots keep the unchanged account and the copy replaces
+       it in the live store. Call it while holding the settlement lock, and only keep the returned account until
+       the lock is released.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+           account_number (int): The account number.
+
+       Returns:
+           dict: The account, safe to change.
+
+       Raises:
+           KeyError: If the account does not exist.
+    """
+
+    account: dict[str, any] = accounts[account_number];
+    state: dict[str, any] | None = snapshot_states.get(id(accounts));
+    if state is None or account_number in state["copied"]:
+        return account;
+    for snapshot in state["snapshots"]:
+        if account_number in snapshot.members:
+            snapshot.saved.setdefault(account_number, account);
+    # Lists and nested views are changed in place, so they are copied as well; history rows are immutable tuples
+    account = {key: list(value) if isinstance(value, list) else copy.deepcopy(value) if isinstance(value, dict)
+               else value for key, value in account.items()};
+    accounts[account_number] = account;
+    state["copied"].add(account_number);
+    return account;
+
+
+# Function to notify the event listeners of a change to the accounts
+def publish_event(accounts: dict[int, dict[str, any]], event: dict[str, any]) -> None:
+    """
+       Calls every registered event listener with the accounts and the event. Events are published while the
+       settlement lock is held, so listeners see them in the order they were applied.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+           event (dict): The event, with a 'type' of 'transfer', 'settlement' or 'account_open'.
+
+       Returns:
+           None
+    """
+
+    for listener in list(event_listeners):
+        listener(accounts, event);
+
+
+# Function to apply a published event to an account store
+def apply_event(accounts: dict[int, dict[str, any]], event: dict[str, any]) -> None:
+    """
+       Applies an event through the same functions that produced it, without publishing it again. Replaying the
+       events of a store in order, starting from an empty store, rebuilds the store.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+           event (dict): A 'transfer', 'settlement', 'account_open' or 'accounts_import' event, or a journal entry.
+
+       Returns:
+           None
+
+       Raises:
+           ValueError: If the event type is unknown.
+    """
+
+    match event["type"]:
+        case "transfer":
+            enqueue_transaction(accounts, tuple(event["transaction"]), publish=False);
+        case "settlement":
+            settle_transaction(accounts, tuple(event["transaction"]), event["execution_time"], publish=False);
+        case "account_open":
+            create_account(accounts, event["account_number"], event["first_name"], event["last_name"],
+                           event["id_number"], event["balance"], publish=False);
+        case "accounts_import":
+            import_accounts(accounts, event["accounts"]);
+        case _:
+            raise ValueError(f"Unknown event type '{event['type']}'.");
+
+
+# Function to describe accounts as an event that recreates them
+def accounts_import_event(accounts: dict[int, dict[str, any]]) -> dict[str, any]:
+    """
+       Builds the 'accounts_import' event that brings existing accounts into an event log, with their balances,
+       pending queues and histories (archived segments included) as they are, for example at the start of a
+       journal.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+
+       Returns:
+           dict: The event.
+    """
+
+    with settlement_lock:
+        return {"type": "accounts_import", "accounts": {
+            account_number: {"first_name": account["first_name"], "last_name": account["last_name"],
+                             "id_number": account["id_number"], "balance_cents": account["balance_cents"],
+                             "transactions_to_execute": list(account["transactions_to_execute"]),
+                             "transaction_history": list(bh.iter_history(account))}
+            for account_number, account in accounts.items()}};
+
+
+# Function to set accounts to the state recorded in an 'accounts_import' event
+def import_accounts(accounts: dict[int, dict[str, any]], imported: dict[any, dict[str, any]]) -> None:
+    """
+       Replaces or adds the imported accounts and rebuilds the reserved, activity and exposure views of the store,
+       since imported history and pending transactions also count for the other accounts they name.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+           imported (dict): The accounts of the event by account number; the numbers may be strings, as in a
+                            journal entry.
+
+       Returns:
+           None
+    """
+
+    with store_lock(accounts):
+        for account_number, account in imported.items():
+            accounts[int(account_number)] = {
+                "first_name": sys.intern(account["first_name"]),
+                "last_name": sys.intern(account["last_name"]),
+                "id_number": account["id_number"],
+                "balance_cents": account["balance_cents"],
+                "transactions_to_execute": [tuple(transaction) for transaction in account["transactions_to_execute"]],
+                "transaction_history": [tuple(executed_transaction)
+                                        for executed_transaction in account["transaction_history"]]
+            };
+        build_exposure_views(build_activity_views(build_reserved_views(accounts)));
+        for account_number in imported:
+            update_checksum(int(account_number), accounts[int(account_number)], accounts=accounts);
+
+
+# Function to extend a history digest with one more history row
+def chain_digest(digest: str, executed_transaction: tuple[str, str, int, int, float, str]) -> str:
+    """
+       Args:
+           digest (str): The digest of the history before the row.
+           executed_transaction (tuple): The history row appended to the history.
+
+       Returns:
+           str: The digest of the history including the row.
+    """
+
+    return hashlib.blake2b(f"{digest}|{executed_transaction!r}".encode("utf-8"), digest_size=16).hexdigest();
+
+
+# Function to get the rolling digest of an account's transaction history
+def history_digest(account: dict[str, any]) -> str:
+    """
+       Returns the digest chained over every history row in order, archived segments included.
+
+       The digest depends only on the history itself, so two copies of an account with the same history have the
+       same digest no matter when it was first computed. It is computed the first time it is needed and stored in
+       the account's 'history_digest' field, which settle_transaction then extends in O(1).
+
+       Args:
+           account (dict): The account details.
+
+       Returns:
+           str: The history digest.
+    """
+
+    digest: str | None = account.get("history_digest");
+    if digest is None:
+        digest = "";
+        for executed_transaction in bh.iter_history(account):
+            digest = chain_digest(digest, executed_transaction);
+        account["history_digest"] = digest;
+    return digest;
+
+
+# Function to recompute the checksum of an account after a mutation
+def update_checksum(account_number: int, account: dict[str, any], undo: UndoLog | None = None,
+                    accounts: dict[int, dict[str, any]] | None = None) -> str:
+    """
+       Stores in the account's 'checksum' field a hash of the account number, the identity fields, the balance and
+       the history digest.
+
+       Args:
+           account_number (int): The account number.
+           account (dict): The account details.
+           undo (UndoLog | None): The log that records the change for a rollback, or None (default is None).
+           accounts (dict | None): The store of the account, whose checksum listeners are notified, or None
+                                   (default is None).
+
+       Returns:
+           str: The new checksum.
+    """
+
+    log: UndoLog = undo if undo is not None else untracked_changes;
+    content: str = (f"{account_number}|{account['first_name']}|{account['last_name']}|{account['id_number']}|"
+                    f"{format_cents(account['balance_cents'])}|{history_digest(account)}");
+    old: str | None = account.get("checksum");
+    log.set(account, "checksum", hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest());
+    if accounts is not None:
+        notify_checksum(accounts, account_number, account["checksum"]);
+        # A rollback restores the old checksum, so the listeners are given it back as well
+        log.call(notify_checksum, accounts, account_number, old);
+    return account["checksum"];
+
+
+# Function to notify the checksum listeners of a changed checksum
+def notify_checksum(accounts: dict[int, dict[str, any]], account_number: int, checksum: str | None) -> None:
+    """
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+           account_number (int): The account number.
+           checksum (str | None): The checksum of the account, or None if it has none.
+    """
+
+    for listener in list(checksum_listeners):
+        listener(accounts, account_number, checksum);
+
+
+# Function to get the checksum of an account
+def account_checksum(account_number: int, account: dict[str, any]) -> str:
+    """
+       Args:
+           account_number (int): The account number.
+           account (dict): The account details.
+
+       Returns:
+           str: The stored checksum, computed first if the account has none yet.
+    """
+
+    return account.get("checksum") or update_checksum(account_number, account);
+
+
+# Function to record a settled transaction in the activity views of both accounts
+def update_activity(accounts: dict[int, dict[str, any]], executed_transaction: tuple[str, str, int, int, float, str],
+                    undo: UndoLog | None = None) -> None:
+    """
+       Adds a settled transaction to the 'activity' views of its source and target accounts: the totals (in
+       cents) and counts sent and received, the time of the last activity, and the rollups per execution day. Accounts
+       without a view are skipped, since a view started now would leave out the earlier history;
+       build_activity_views builds them.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+           executed_transaction (tuple): The settled transaction, as stored in the transaction history.
+           undo (UndoLog | None): The log that records the changes for a rollback, or None (default is None).
+
+       Returns:
+           None
+    """
+
+    source, target, amount, execution_time = executed_transaction[2:6];
+    log: UndoLog = undo if undo is not None else untracked_changes;
+    cents: int = to_cents(amount);
+    day: str = execution_time[:10];
+    for account_number, direction in ((source, "sent"), (target, "received")):
+        activity: dict[str, any] | None = accounts[account_number].get("activity");
+        if activity is None:
+            continue;
+        log.set(activity, direction, activity[direction] + cents);
+        log.set(activity, f"{direction}_count", activity[f"{direction}_count"] + 1);
+        if activity["last_activity"] is None or execution_time > activity["last_activity"]:
+            log.set(activity, "last_activity", execution_time);
+        if day not in activity["daily"]:
+            log.set(activity["daily"], day, {"sent": 0, "received": 0, "count": 0});
+        daily: dict[str, any] = activity["daily"][day];
+        log.set(daily, direction, daily[direction] + cents);
+        log.set(daily, "count", daily["count"] + 1);
+
+
+# Function to build the activity views from the existing transaction history
+def build_activity_views(accounts: dict[int, dict[str, any]]) -> dict[int, dict[str, any]]:
+    """
+       Rebuilds the 'activity' view of every account from the full transaction history, archived segments included.
+       After that, settle_transaction keeps the views up to date.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+
+       Returns:
+           dict: The accounts dictionary with rebuilt activity views.
+    """
+
+    # Every view starts empty before any history is added, since a row also counts for its target account
+    for account in accounts.values():
+        account["activity"] = empty_activity_view();
+    for account in list(accounts.values()):
+        for executed_transaction in bh.iter_history(account):
+            update_activity(accounts, executed_transaction);
+    return accounts;
+
+
+# Function to create the activity view of an account without any settled transactions
+def empty_activity_view() -> dict[str, any]:
+    """
+       Returns:
+           dict: The view, with zero totals and counts, no last activity and no daily rollups.
+    """
+
+    return {"sent": 0, "sent_count": 0, "received": 0, "received_count": 0, "last_activity": None, "daily": {}};
+
+
+# Function to add or remove a pending transaction in the exposure views of both accounts
+def update_exposure(accounts: dict[int, dict[str, any]], transaction: tuple[str, str, int, int, float], sign: int,
+                    undo: UndoLog | None = None) -> None:
+    """
+       Adds a pending transaction to, or removes it from, the 'exposure' views of its source and target accounts:
+       the totals in cents scheduled to leave and to arrive, and the same totals per due day. A day is dropped once it
+       has no pending transactions left. Accounts without an exposure view are skipped, since a view started from a
+       non-empty queue would be wrong; build_exposure_views and create_account give accounts their views.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+           transaction (tuple): The pending transaction.
+           sign (int): 1 when the transaction is enqueued, -1 when it leaves the queue.
+           undo (UndoLog | None): The log that records the changes for a rollback, or None (default is None).
+
+       Returns:
+           None
+    """
+
+    source, target, amount = transaction[2:5];
+    log: UndoLog = undo if undo is not None else untracked_changes;
+    cents: int = sign * to_cents(amount);
+    day: str = transaction[1][:10];
+    for account_number, direction in ((source, "outgoing"), (target, "incoming")):
+        # A transfer may be queued before its target account is opened
+        account: dict[str, any] | None = accounts.get(account_number);
+        if account is None or "exposure" not in account:
+            continue;
+        exposure: dict[str, any] = account["exposure"];
+        log.set(exposure, direction, exposure[direction] + cents);
+        if day not in exposure["daily"]:
+            log.set(exposure["daily"], day, {"outgoing": 0, "incoming": 0, "count": 0});
+        daily: dict[str, any] = exposure["daily"][day];
+        if daily["count"] + sign == 0:
+            log.delete(exposure["daily"], day);
+        else:
+            log.set(daily, direction, daily[direction] + cents);
+            log.set(daily, "count", daily["count"] + sign);
+
+
+# Function to build the exposure views from the pending queues
+def build_exposure_views(accounts: dict[int, dict[str, any]]) -> dict[int, dict[str, any]]:
+    """
+       Rebuilds the 'exposure' view of every account from every pending queue. After that, enqueue_transaction
+       and settle_transaction keep the views up to date, so the amounts scheduled to leave or reach an account are
+       read without scanning any queue.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+
+       Returns:
+           dict: The accounts dictionary with rebuilt exposure views.
+    """
+
+    for account in accounts.values():
+        account["exposure"] = {"outgoing": 0, "incoming": 0, "daily": {}};
+    for account in list(accounts.values()):
+        for transaction in account["transactions_to_execute"]:
+            update_exposure(accounts, transaction, 1);
+    return accounts;
+
+
 # Function to execute pending or due transactions
-def execute_transactions(accounts: dict[int, dict[str, any]], due_only: bool = False) -> dict[int, dict[str, any]]:
+def execute_transactions(accounts: dict[int, dict[str, any]], due_only: bool = False,
+                         clock: SystemClock | None = None) -> dict[int, dict[str, any]]:
     """
        Executes transactions for a specific account, either all or only those due.
 
        Args:
            accounts (dict): The dictionary containing all accounts.
            due_only (bool): Whether to execute only transactions that are due (default is False).
+           clock (SystemClock | None): The clock for the settlement instant, or None for the system clock
+                                       (default is None).
 
        Returns:
            dict: The updated accounts dictionary after executing the transactions.
@@ -237,28 +1223,24 @@ def execute_transactions(accounts: dict[int, dict[str, any]], due_only: bool = F
 
     transactions_to_execute: list[tuple[str, str, int, int, float]] = accounts[source_account_number][
         "transactions_to_execute"];
-    transaction_history: list[tuple[str, str, int, int, float, str]] = accounts[source_account_number][
-        "transaction_history"];
 
     executed_any: bool = False;
 
-    for transaction in transactions_to_execute[:]:
-        creation_time, future_time_str, source, target, amount = transaction;
-
-        if due_only:
-            future_time: datetime = datetime.strptime(future_time_str, "%Y-%m-%d %H:%M:%S");
-            if future_time > datetime.now():
-                continue;
-
-        accounts[source]["balance"] -= amount;
-        accounts[target]["balance"] += amount;
+    # The whole batch is settled at one instant; timestamps compare correctly as strings
+    execution_time: str = (clock or system_clock).timestamp();
 
-        execution_time: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S");
-        executed_transaction: tuple[str, str, int, int, float, str] = transaction + (execution_time,)
-        transaction_history.append(executed_transaction);
+    due_transactions: list[tuple[str, str, int, int, float]] = [
+        transaction for transaction in transactions_to_execute if not (due_only and transaction[1] > execution_time)];
 
-        transactions_to_execute.remove(transaction);
+    # The batch is settled atomically; transactions already settled by the background executor are skipped
+    try:
+        executed_transactions: list[tuple[str, str, int, int, float, str]] = settle_batch(
+            accounts, due_transactions, execution_time);
+    except KeyError as e:
+        print(f"Error: account {e} does not exist. No transactions were executed.");
+        return accounts;
 
+    for executed_transaction in executed_transactions:
         print(f"Executed transaction: {executed_transaction}");
         executed_any = True;
 
@@ -269,10 +1251,48 @@ def execute_transactions(accounts: dict[int, dict[str, any]], due_only: bool = F
     return accounts;
 
 
+# Function to format account details as a single block of text
+def format_account_details(account_number: int, account: dict[str, any]) -> str:
+    """
+        Formats the details of a specific account into one string, one field per line.
+
+        Args:
+            account_number (int): The account number of the account.
+            account (dict): The account details.
+
+        Returns:
+            str: The formatted account details.
+    """
+
+    lines: list[str] = [f"\nAccount {account_number} details:"];
+    for key, value in account.items():
+        if key in ("balance_cents", "opening_balance_cents", "reserved_cents"):
+            # Amounts are kept in cents and only shown with two decimal places
+            lines.append(f"{key.removesuffix('_cents')}: {format_cents(value)}");
+        elif key in ("history_digest", "checksum", "history_segments"):
+            # Integrity fields are only used to compare copies of the store, and the archived rows are listed
+            # together with the in-memory rows below
+            continue;
+        elif key == "transaction_history":
+            lines.append(f"{key}: {list(bh.iter_history(account))}");
+        elif key == "activity":
+            # The daily rollups are left out of the details
+            lines.append(f"{key}: sent {format_cents(value['sent'])} ({value['sent_count']}), "
+                         f"received {format_cents(value['received'])} ({value['received_count']}), "
+                         f"last {value['last_activity']}");
+        elif key == "exposure":
+            # The due days are left out of the details
+            lines.append(f"{key}: outgoing {format_cents(value['outgoing'])}, "
+                         f"incoming {format_cents(value['incoming'])}");
+        else:
+            lines.append(f"{key}: {value}");
+    return "\n".join(lines);
+
+
 # Function to print account details
 def print_account_details(accounts: dict[int, dict[str, any]], account_number: int) -> None:
     """
-        Prints the details of a specific account.
+        Prints the details of a specific account with a single write.
 
         Args:
             accounts (dict): The dictionary containing all accounts.
@@ -286,22 +1306,20 @@ def print_account_details(accounts: dict[int, dict[str, any]], account_number: i
     if not account:
         print(f"No account found with account number {account_number}.");
     else:
-        print(f"\nAccount {account_number} details:");
-        for key, value in account.items():
-            if key == "balance":
-                # Format the balance to always show two decimal places
-                print(f"{key}: {value:.2f}");
-            else:
-                print(f"{key}: {value}");
+        print(format_account_details(account_number, account));
 
 
 # Function to handle various reports related to accounts
-def reports_interface(accounts: dict[int, dict[str, any]]) -> None:
+def reports_interface(accounts: dict[int, dict[str, any]], identities: any = None, events: any = None) -> None:
     """
         Provides an interface to generate various reports on bank accounts.
 
         Args:
             accounts (dict): The dictionary containing all accounts.
+            identities (any): An optional IdentityTable of Bank_Identity that answers reports 3 and 4 from its
+                              indexes instead of scanning every account (default is None).
+            events (any): An optional EventStore of Bank_Events whose 'balances' projection answers report 9
+                          without summing every account (default is None).
 
         Returns:
             None
@@ -322,99 +1340,116 @@ def reports_interface(accounts: dict[int, dict[str, any]]) -> None:
 
         option_menu: str = input("Select an option (1-10): ");
 
-        match option_menu:
-            case "1":
-                print("\nAll bank accounts:");
-                for account_number in accounts:
-                    print_account_details(accounts, account_number);
-
-            case "2":
-                while True:
-                    account_number_input: str = input("Enter account number (or type 'EX' to return to the main menu): ")
-                    try:
-                        account_number: int | None = account_validation_check(account_number_input, accounts)
-                        if account_number is None:
+        # Each report reads a consistent point-in-time view while transactions keep being settled
+        with ReadSnapshot(accounts) as snapshot:
+            match option_menu:
+                case "1":
+                    print("\nAll bank accounts:");
+                    for account_number in snapshot:
+                        print_account_details(snapshot, account_number);
+
+                case "2":
+                    while True:
+                        account_number_input: str = input("Enter account number "
+                                                          "(or type 'EX' to return to the main menu): ")
+                        try:
+                            account_number: int | None = account_validation_check(account_number_input, snapshot)
+                            if account_number is None:
+                                break;
+                            print_account_details(snapshot, account_number);
                             break;
-                        print_account_details(accounts, account_number);
-                        break;
-                    except ValueError as e:
-                        print(f"Error: {e} Please enter a valid account number.");
-
-            case "3":
-                while True:
-                    id_number: str = input("Enter ID number (or type 'EX' to return to the main menu): ");
-                    if id_number.upper() == 'EX':
-                        break;
-                    try:
-                        found: bool = False;
-                        for account_number, account in accounts.items():
-                            if account["id_number"] == id_number:
-                                print_account_details(accounts, account_number);
-                                found = True;
-                        if not found:
-                            raise ValueError("ID number does not exist.");
-                        break;
-                    except ValueError as e:
-                        print(f"Error: {e} Please try again.");
-            case "4":
-                while True:
-                    first_name = input("Enter first name (or type 'EX' to return to the main menu): ").lower();
-                    if first_name.upper() == 'EX':
-                        break;
-                    try:
-                        found: bool = False;
-                        for account_number, account in accounts.items():
-                            if first_name in account["first_name"].lower():
-                                print_account_details(accounts, account_number);
-                                found = True;
-                        if not found:
-                            raise ValueError("First name does not exist in any account.");
-                        break;
-                    except ValueError as e:
-                        print(f"Error: {e} Please try again.");
-
-            case "5":
-                for account_number, account in sorted(accounts.items(), key=lambda x: x[1]["balance"]):
-                    print_account_details(accounts, account_number);
-
-            case "6":
-                print("\nAll transaction history:");
-                transactions: list[tuple[str, str, int, int, float, str]] = [];
-                for account in accounts.values():
-                    transactions.extend(account["transaction_history"]);
-                for transaction in sorted(transactions, key=lambda x: x[0], reverse=True):
-                    print(transaction);
-
-            case "7":
-                today: str = date.today().strftime("%Y-%m-%d");
-                transactions: list[tuple[str, str, int, int, float, str]] = [];
-                print(f"\nTransactions for today ({today}):");
-                for account in accounts.values():
-                    transactions.extend(account["transaction_history"]);
-                for transaction in transactions:
-                    if transaction[0].startswith(today):
-                        print(transaction);
+                        except ValueError as e:
+                            print(f"Error: {e} Please enter a valid account number.");
 
-            case "8":
-                print("\nAccounts with negative balance:");
-                found_negative_balance: bool = False;
-                for account_number, account in accounts.items():
-                    if account["balance"] < 0:
-                        print_account_details(accounts, account_number);
-                        found_negative_balance = True;
-                if not found_negative_balance:
-                    print("No account with negative balance was found.");
-
-            case "9":
-                total_balance: float = sum(account["balance"] for account in accounts.values());
-                print(f"\nTotal balance of all accounts: {total_balance}");
-
-            case "10":
-                print("Returning to main menu.");
-                break;
+                case "3":
+                    while True:
+                        id_number: str = input("Enter ID number (or type 'EX' to return to the main menu): ");
+                        if id_number.upper() == 'EX':
+                            break;
+                        try:
+                            if identities is not None:
+                                matches: list[int] = [account_number for account_number in
+                                                      identities.find_by_id_number(id_number)
+                                                      if account_number in snapshot];
+                            else:
+                                matches = [account_number for account_number, account in snapshot.items()
+                                           if account["id_number"] == id_number];
+                            for account_number in matches:
+                                print_account_details(snapshot, account_number);
+                            if not matches:
+                                raise ValueError("ID number does not exist.");
+                            break;
+                        except ValueError as e:
+                            print(f"Error: {e} Please try again.");
+                case "4":
+                    while True:
+                        first_name = input("Enter first name (or type 'EX' to return to the main menu): ").lower();
+                        if first_name.upper() == 'EX':
+                            break;
+                        try:
+                            if identities is not None:
+                                # The distinct first names are scanned instead of every account
+                                matches: list[int] = [account_number for account_number in
+                                                      identities.find_by_first_name(first_name)
+                                                      if account_number in snapshot];
+                            else:
+                                matches = [account_number for account_number, account in snapshot.items()
+                                           if first_name in account["first_name"].lower()];
+                            for account_number in matches:
+                                print_account_details(snapshot, account_number);
+                            if not matches:
+                                raise ValueError("First name does not exist in any account.");
+                            break;
+                        except ValueError as e:
+                            print(f"Error: {e} Please try again.");
+
+                case "5":
+                    for account_number, account in sorted(snapshot.items(), key=lambda x: x[1]["balance_cents"]):
+                        print_account_details(snapshot, account_number);
+
+                case "6":
+                    print("\nAll transaction history:");
+                    transactions: list[tuple[str, str, int, int, float, str]] = [];
+                    for account in snapshot.values():
+                        transactions.extend(bh.iter_history(account));
+                    for transaction in sorted(transactions, key=lambda x: x[0], reverse=True):
+                        print(transaction);
 
-            case _:
-                print("Invalid option. Please try again.");
+                case "7":
+                    today_date: date = date.today();
+                    today: str = today_date.strftime("%Y-%m-%d");
+                    tomorrow: str = (today_date + timedelta(days=1)).strftime("%Y-%m-%d");
+                    print(f"\nTransactions for today ({today}):");
+                    # Archived history segments are only read if they contain transactions created today
+                    for account in snapshot.values():
+                        for transaction in bh.iter_history(account, today, tomorrow):
+                            print(transaction);
+
+                case "8":
+                    print("\nAccounts with negative balance:");
+                    found_negative_balance: bool = False;
+                    for account_number, account in snapshot.items():
+                        if account["balance_cents"] < 0:
+                            print_account_details(snapshot, account_number);
+                            found_negative_balance = True;
+                    if not found_negative_balance:
+                        print("No account with negative balance was found.");
+
+                case "9":
+                    if events is not None and "balances" in events.projections:
+                        # Settlements only move money between accounts, so the live total matches the snapshot's
+                        # unless an account was opened since
+                        total_cents: int = events.projections["balances"].total_cents;
+                    else:
+                        total_cents = sum(account["balance_cents"] for account in snapshot.values());
+                    print(f"\nTotal balance of all accounts: {format_cents(total_cents)}");
+
+                case "10":
+                    print("Returning to main menu.");
+                    break;
+
+                case _:
+                    print("Invalid option. Please try again.");
 
 
 # Function to open a new bank account
@@ -459,8 +1494,8 @@ def open_new_account(accounts: dict[int, dict[str, any]]) -> dict[int, dict[str,
             id_number: str = input("Enter ID number (or type 'EX' to return to the main menu): ");
             if id_number.upper() == 'EX':
                 return accounts;
-            if not id_number.isdigit():
-                raise ValueError("ID number should only contain digits.");
+            if not (id_number.isascii() and id_number.isdecimal()):
+                raise ValueError("ID number should only contain the digits 0-9.");
             break;  # Exit the loop if the input is valid
         except ValueError as e:
             print(f"Error: {e}. Please enter valid information and try again.");
@@ -470,20 +1505,58 @@ def open_new_account(accounts: dict[int, dict[str, any]]) -> dict[int, dict[str,
             balance = input("Enter initial balance (or type 'EX' to return to the main menu): ");
             if balance.upper() == 'EX':
                 return accounts;
-            balance = float(balance);
-            if balance < 0:
+            # Parsed exactly, so the balance is stored as a whole number of cents
+            cents: int = parse_cents(balance);
+            if cents < 0:
                 raise ValueError("Initial balance cannot be negative.");
+            balance = from_cents(cents);
             break;  # Exit the loop if the input is valid
         except ValueError as e:
             print(f"Error: {e}. Please enter valid information and try again.");
 
-    accounts[account_number] = {
-        "first_name": first_name,
-        "last_name": last_name,
-        "id_number": id_number,
-        "balance": balance,
-        "transactions_to_execute": [],
-        "transaction_history": []
-    }
+    create_account(accounts, account_number, first_name, last_name, id_number, balance);
     print(f"New account created successfully with account number {account_number}.");
     return accounts;
+
+
+# Function to add a validated account to the accounts
+def create_account(accounts: dict[int, dict[str, any]], account_number: int, first_name: str, last_name: str,
+                   id_number: str, balance: float, publish: bool = True) -> dict[str, any]:
+    """
+       Adds a new account with empty transaction queues. The initial balance is stored in cents, and also kept as
+       the account's 'opening_balance_cents', from which Bank_Integrity.reconcile replays accounts opened after its
+       snapshot.
+
+       Args:
+           accounts (dict): The dictionary containing all accounts.
+           account_number (int): The number of the new account.
+           first_name (str): The first name of the account holder.
+           last_name (str): The last name of the account holder.
+           id_number (str): The ID number of the account holder.
+           balance (float): The initial balance.
+           publish (bool): Whether to publish an 'account_open' event to the event listeners (default is True).
+
+       Returns:
+           dict: The new account.
+    """
+
+    with store_lock(accounts):
+        # Names repeat across many customers, so every account shares one interned copy of each name
+        accounts[account_number] = {
+            "first_name": sys.intern(first_name),
+            "last_name": sys.intern(last_name),
+            "id_number": id_number,
+            "balance_cents": to_cents(balance),
+            "opening_balance_cents": to_cents(balance),
+            "transactions_to_execute": [],
+            "transaction_history": [],
+            "reserved_cents": 0,
+            "activity": empty_activity_view(),
+            "exposure": {"outgoing": 0, "incoming": 0, "daily": {}}
+        }
+        update_checksum(account_number, accounts[account_number], accounts=accounts);
+        if publish:
+            publish_event(accounts, {"type": "account_open", "account_number": account_number,
+                                     "first_name": first_name, "last_name": last_name, "id_number": id_number,
+                                     "balance": balance});
+    return accounts[account_number];
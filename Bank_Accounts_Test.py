@@ -1,11 +1,15 @@
 import Bank_Accounts as bk
+import Bank_History as bh
+import Bank_Identity as bid
 import pytest
 from datetime import datetime, timedelta
 import time
 import sys
 from io import StringIO
 import unittest
+import copy
 from unittest.mock import patch, call
+from concurrent.futures import Future
 
 
 # Tests for account_validation_check function
@@ -14,7 +18,7 @@ from unittest.mock import patch, call
 def test_account_validation_check_valid():
     # Arrange
     accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
-                                                 "balance": 1500.00, "transactions_to_execute": [],
+                                                 "balance_cents": 150000, "transactions_to_execute": [],
                                                  "transaction_history": []}};
     expected: int = 123;
 
@@ -28,7 +32,7 @@ def test_account_validation_check_valid():
 def test_account_validation_check_invalid():
     # Arrange
     accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
-                                                 "balance": 1500.00, "transactions_to_execute": [],
+                                                 "balance_cents": 150000, "transactions_to_execute": [],
                                                  "transaction_history": []}};
 
     with pytest.raises(ValueError) as ex:
@@ -41,7 +45,7 @@ def test_account_validation_check_invalid():
 def test_account_validation_check_non_numeric():
     # Arrange
     accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
-                                                 "balance": 1500.00, "transactions_to_execute": [],
+                                                 "balance_cents": 150000, "transactions_to_execute": [],
                                                  "transaction_history": []}};
 
     with pytest.raises(ValueError) as ex:
@@ -51,7 +55,7 @@ def test_account_validation_check_non_numeric():
 def test_account_validation_check_exit():
     # Arrange
     accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
-                                                 "balance": 1500.00, "transactions_to_execute": [],
+                                                 "balance_cents": 150000, "transactions_to_execute": [],
                                                  "transaction_history": []}};
     expected: any = None;
 
@@ -70,7 +74,7 @@ def test_amount_validation_check_valid():
     amount: str = "100";
     account_number: int = 123;
     accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
-                                                 "balance": 1500.00, "transactions_to_execute": [],
+                                                 "balance_cents": 150000, "transactions_to_execute": [],
                                                  "transaction_history": []}};
     expected: float = 100;
 
@@ -86,7 +90,7 @@ def test_amount_validation_check_invalid_non_numeric():
     amount: str = "abc";
     account_number: int = 123;
     accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
-                                                 "balance": 1500.00, "transactions_to_execute": [],
+                                                 "balance_cents": 150000, "transactions_to_execute": [],
                                                  "transaction_history": []}};
 
     with pytest.raises(ValueError) as ex:
@@ -98,7 +102,7 @@ def test_amount_validation_check_invalid_negative():
     amount: str = "-500";
     account_number: int = 123;
     accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
-                                                 "balance": 1500.00, "transactions_to_execute": [],
+                                                 "balance_cents": 150000, "transactions_to_execute": [],
                                                  "transaction_history": []}};
 
     with pytest.raises(ValueError) as ex:
@@ -113,7 +117,7 @@ def test_amount_validation_check_invalid_exceeds_balance():
     amount: str = "2000";
     account_number: int = 123;
     accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
-                                                 "balance": 1500.00, "transactions_to_execute": [],
+                                                 "balance_cents": 150000, "transactions_to_execute": [],
                                                  "transaction_history": []}};
 
     with pytest.raises(ValueError) as ex:
@@ -128,7 +132,7 @@ def test_amount_validation_check_exit():
     amount: str = "ex";
     account_number: int = 123;
     accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
-                                                 "balance": 1500.00, "transactions_to_execute": [],
+                                                 "balance_cents": 150000, "transactions_to_execute": [],
                                                  "transaction_history": []}};
     expected: any = None;
 
@@ -188,6 +192,20 @@ def test_date_validation_check_invalid():
     assert str(ex.value) == "The time entered must be in the future.";
 
 
+def test_date_validation_check_uses_injected_clock():
+    # Arrange
+    clock: bk.FixedClock = bk.FixedClock(datetime(2024, 8, 1, 12, 0, 0));
+
+    # Act
+    actual: datetime = bk.date_validation_check("2024-08-01 12:00:01", clock);
+    with pytest.raises(ValueError) as ex:
+        bk.date_validation_check("2024-08-01 11:59:59", clock);
+
+    # Assert
+    assert actual == datetime(2024, 8, 1, 12, 0, 1);
+    assert str(ex.value) == "The time entered must be in the future.";
+
+
 def test_date_validation_check_exit():
     # Arrange
     date: str = "ex";
@@ -210,7 +228,7 @@ def test_add_transaction_to_existing_account():
             "first_name": "Bob",
             "last_name": "Johnson",
             "id_number": "987654321",
-            "balance": 1500.00,
+            "balance_cents": 150000,
             "transactions_to_execute": [],
             "transaction_history": []
         },
@@ -218,7 +236,7 @@ def test_add_transaction_to_existing_account():
             "first_name": "Charlie",
             "last_name": "Brown",
             "id_number": "555555555",
-            "balance": 3500.75,
+            "balance_cents": 350075,
             "transactions_to_execute": [],
             "transaction_history": []
         }
@@ -256,7 +274,7 @@ def test_add_transaction_exit_on_source_account():
             "first_name": "Bob",
             "last_name": "Johnson",
             "id_number": "987654321",
-            "balance": 1500.00,
+            "balance_cents": 150000,
             "transactions_to_execute": [],
             "transaction_history": []
         },
@@ -264,7 +282,7 @@ def test_add_transaction_exit_on_source_account():
             "first_name": "Charlie",
             "last_name": "Brown",
             "id_number": "555555555",
-            "balance": 3500.75,
+            "balance_cents": 350075,
             "transactions_to_execute": [],
             "transaction_history": []
         }
@@ -286,7 +304,7 @@ def test_add_transaction_after_multiple_invalid_inputs():
             "first_name": "Bob",
             "last_name": "Johnson",
             "id_number": "987654321",
-            "balance": 1500.00,
+            "balance_cents": 150000,
             "transactions_to_execute": [],
             "transaction_history": []
         },
@@ -294,7 +312,7 @@ def test_add_transaction_after_multiple_invalid_inputs():
             "first_name": "Charlie",
             "last_name": "Brown",
             "id_number": "555555555",
-            "balance": 3500.75,
+            "balance_cents": 350075,
             "transactions_to_execute": [],
             "transaction_history": []
         }
@@ -328,6 +346,28 @@ def test_add_transaction_after_multiple_invalid_inputs():
     assert accounts[1002]["transactions_to_execute"] == [expected];
 
 
+@patch("Bank_Accounts.INGEST_TIMEOUT_SECONDS", 0.01)
+def test_add_transaction_times_out_waiting_for_ingest():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = {
+        1002: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321", "balance_cents": 150000,
+               "transactions_to_execute": [], "transaction_history": []},
+        1003: {"first_name": "Charlie", "last_name": "Brown", "id_number": "555555555", "balance_cents": 350075,
+               "transactions_to_execute": [], "transaction_history": []}
+    };
+    transaction_input: list[str] = ["1002", "1003", "100", "2099-12-31 23:59:59"];
+    ingest: unittest.mock.Mock = unittest.mock.Mock();
+    ingest.submit.return_value = Future();
+
+    # Act
+    with patch('builtins.input', side_effect=transaction_input), patch('builtins.print') as mock_print:
+        bk.add_transaction(accounts, ingest=ingest);
+
+    # Assert
+    mock_print.assert_called_with("The transaction was not committed within 0.01 seconds. It may still be added, so "
+                                  "check the pending transactions before submitting it again.");
+
+
 # Tests for execute_transactions function
 
 
@@ -338,7 +378,7 @@ def test_execute_transactions_basic_execution():
             "first_name": "Bob",
             "last_name": "Johnson",
             "id_number": "987654321",
-            "balance": 1500.00,
+            "balance_cents": 150000,
             "transactions_to_execute": [("2024-08-01 12:00:00", "2024-08-30 12:00:00", 1002, 1003, 100.00)],
             "transaction_history": []
         },
@@ -346,7 +386,7 @@ def test_execute_transactions_basic_execution():
             "first_name": "Charlie",
             "last_name": "Brown",
             "id_number": "555555555",
-            "balance": 3500.75,
+            "balance_cents": 350075,
             "transactions_to_execute": [],
             "transaction_history": []
         }
@@ -358,8 +398,8 @@ def test_execute_transactions_basic_execution():
         accounts: dict[int, dict[str, any]] = bk.execute_transactions(accounts);
 
     # Assert
-    assert accounts[1002]["balance"] == 1400.00;
-    assert accounts[1003]["balance"] == 3600.75;
+    assert accounts[1002]["balance_cents"] == 140000;
+    assert accounts[1003]["balance_cents"] == 360075;
     assert len(accounts[1002]["transaction_history"]) == 1;
     assert accounts[1002]["transactions_to_execute"] == [];
 
@@ -371,7 +411,7 @@ def test_execute_transactions_due_only():
             "first_name": "Bob",
             "last_name": "Johnson",
             "id_number": "987654321",
-            "balance": 1500.00,
+            "balance_cents": 150000,
             "transactions_to_execute": [("2024-08-01 12:00:00", "2024-11-20 12:00:00", 1002, 1003, 100.00)],
             "transaction_history": []
         },
@@ -379,7 +419,7 @@ def test_execute_transactions_due_only():
             "first_name": "Charlie",
             "last_name": "Brown",
             "id_number": "555555555",
-            "balance": 3500.75,
+            "balance_cents": 350075,
             "transactions_to_execute": [],
             "transaction_history": []
         }
@@ -391,8 +431,8 @@ def test_execute_transactions_due_only():
         accounts: dict[int, dict[str, any]] = bk.execute_transactions(accounts, due_only=True);
 
     # Assert
-    assert accounts[1002]["balance"] == 1500.00;  # Balance should remain the same
-    assert accounts[1003]["balance"] == 3500.75;  # Balance should remain the same
+    assert accounts[1002]["balance_cents"] == 150000;  # Balance should remain the same
+    assert accounts[1003]["balance_cents"] == 350075;  # Balance should remain the same
     assert len(accounts[1002]["transaction_history"]) == 0;  # No transactions should be executed
     assert len(accounts[1002]["transactions_to_execute"]) == 1;  # Transaction should remain in queue
 
@@ -404,7 +444,7 @@ def test_execute_transactions_invalid_account_number_no_transactions_to_execute(
             "first_name": "Bob",
             "last_name": "Johnson",
             "id_number": "987654321",
-            "balance": 1500.00,
+            "balance_cents": 150000,
             "transactions_to_execute": [],
             "transaction_history": []
         },
@@ -412,7 +452,7 @@ def test_execute_transactions_invalid_account_number_no_transactions_to_execute(
             "first_name": "Charlie",
             "last_name": "Brown",
             "id_number": "555555555",
-            "balance": 3500.75,
+            "balance_cents": 350075,
             "transactions_to_execute": [],
             "transaction_history": []
         }
@@ -425,7 +465,7 @@ def test_execute_transactions_invalid_account_number_no_transactions_to_execute(
 
     # Assert
     # No changes should be made to the account since no transactions were present
-    assert accounts[1002]["balance"] == 1500.00;
+    assert accounts[1002]["balance_cents"] == 150000;
     assert accounts[1002]["transactions_to_execute"] == [];
     assert len(accounts[1002]["transaction_history"]) == 0;
 
@@ -438,7 +478,7 @@ def test_execute_transactions_future_transactions_due():
             "first_name": "Bob",
             "last_name": "Johnson",
             "id_number": "987654321",
-            "balance": 1500.00,
+            "balance_cents": 150000,
             "transactions_to_execute": [(datetime.now().strftime("%Y-%m-%d %H:%M:%S"), future_time, 1002, 1003, 100.00)],
             "transaction_history": []
         },
@@ -446,7 +486,7 @@ def test_execute_transactions_future_transactions_due():
             "first_name": "Charlie",
             "last_name": "Brown",
             "id_number": "555555555",
-            "balance": 3500.75,
+            "balance_cents": 350075,
             "transactions_to_execute": [],
             "transaction_history": []
         }
@@ -465,8 +505,8 @@ def test_execute_transactions_future_transactions_due():
     with patch('builtins.input', side_effect=transaction_input):
         accounts: dict[int, dict[str, any]] = bk.execute_transactions(accounts, due_only=True);
 
-    assert accounts[1002]["balance"] == 1400.00;
-    assert accounts[1003]["balance"] == 3600.75;
+    assert accounts[1002]["balance_cents"] == 140000;
+    assert accounts[1003]["balance_cents"] == 360075;
     assert len(accounts[1002]["transaction_history"]) == 1;
     assert accounts[1002]["transactions_to_execute"] == [];
 
@@ -478,7 +518,7 @@ def test_execute_transactions_exit():
             "first_name": "Bob",
             "last_name": "Johnson",
             "id_number": "987654321",
-            "balance": 1500.00,
+            "balance_cents": 150000,
             "transactions_to_execute": [("2024-08-01 12:00:00", "2024-11-20 12:00:00", 1002, 1003, 100.00)],
             "transaction_history": []
         },
@@ -486,7 +526,7 @@ def test_execute_transactions_exit():
             "first_name": "Charlie",
             "last_name": "Brown",
             "id_number": "555555555",
-            "balance": 3500.75,
+            "balance_cents": 350075,
             "transactions_to_execute": [],
             "transaction_history": []
         }
@@ -498,8 +538,8 @@ def test_execute_transactions_exit():
         accounts: dict[int, dict[str, any]] = bk.execute_transactions(accounts, due_only=True);
 
     # Assert
-    assert accounts[1002]["balance"] == 1500.00;  # Balance should remain the same
-    assert accounts[1003]["balance"] == 3500.75;  # Balance should remain the same
+    assert accounts[1002]["balance_cents"] == 150000;  # Balance should remain the same
+    assert accounts[1003]["balance_cents"] == 350075;  # Balance should remain the same
     assert len(accounts[1002]["transaction_history"]) == 0;  # No transactions should be executed
     assert len(accounts[1002]["transactions_to_execute"]) == 1;  # Transaction should remain in queue
 
@@ -510,7 +550,7 @@ def test_execute_transactions_exit():
 def test_print_account_details_non_existing_account():
     # Arrange
     accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
-                                                 "balance": 1500.00, "transactions_to_execute": [],
+                                                 "balance_cents": 150000, "transactions_to_execute": [],
                                                  "transaction_history": []}};
     non_existing_account: int = 999;
     expected: str = "No account found with account number 999.\n";
@@ -532,7 +572,7 @@ def test_print_account_details_non_existing_account():
 def test_print_account_details_negative_balance():
     # Arrange
     accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
-                                                 "balance": -500.00, "transactions_to_execute": [],
+                                                 "balance_cents": -50000, "transactions_to_execute": [],
                                                  "transaction_history": []}};
     expected: str = "\nAccount 123 details:\n" \
                     "first_name: Bob\n" \
@@ -556,6 +596,30 @@ def test_print_account_details_negative_balance():
     assert actual.getvalue() == expected;
 
 
+
+def test_format_account_details_includes_archived_history(tmp_path):
+    # Arrange
+    history: list[tuple] = [("2024-01-01 10:00:00", "2024-01-01 10:00:00", 123, 456, 10.0, "2024-01-01 10:00:01"),
+                            ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 123, 456, 20.0, "2024-08-01 10:00:01")];
+    account: dict[str, any] = {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
+                               "balance_cents": 50000, "transactions_to_execute": [],
+                               "transaction_history": list(history)};
+    expected: str = "\nAccount 123 details:\n" \
+                    "first_name: Bob\n" \
+                    "last_name: Johnson\n" \
+                    "id_number: 987654321\n" \
+                    "balance: 500.00\n" \
+                    "transactions_to_execute: []\n" \
+                    f"transaction_history: {history}";
+    bh.archive_history(123, account, str(tmp_path), "2024-06-01 00:00:00");
+
+    # Act
+    actual: str = bk.format_account_details(123, account);
+
+    # Assert
+    assert len(account["transaction_history"]) == 1;
+    assert actual == expected;
+
 # Tests for reports_interface function
 
 
@@ -565,7 +629,7 @@ def create_mock_accounts():
             "first_name": "Alice",
             "last_name": "Smith",
             "id_number": "123456789",
-            "balance": 2500.00,
+            "balance_cents": 250000,
             "transactions_to_execute": [],
             "transaction_history": [
                 ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 100.00, "2024-08-01 10:00:01")
@@ -575,7 +639,7 @@ def create_mock_accounts():
             "first_name": "Bob",
             "last_name": "Johnson",
             "id_number": "987654321",
-            "balance": 1500.00,
+            "balance_cents": 150000,
             "transactions_to_execute": [],
             "transaction_history": []
         }
@@ -701,7 +765,7 @@ def test_print_today_transactions(mock_print, mock_input):
 @patch('builtins.print')
 def test_print_accounts_with_negative_balance(mock_print, mock_input):
     accounts: dict[int, dict[str, any]] = create_mock_accounts();
-    accounts[1002]["balance"] = -50.00;
+    accounts[1002]["balance_cents"] = -5000;
     bk.reports_interface(accounts);
 
     # Check that accounts with negative balance were printed
@@ -737,7 +801,7 @@ def create_new_mock_accounts():
             "first_name": "Alice",
             "last_name": "Smith",
             "id_number": "123456789",
-            "balance": 2500.00,
+            "balance_cents": 250000,
             "transactions_to_execute": [],
             "transaction_history": []
         },
@@ -745,7 +809,7 @@ def create_new_mock_accounts():
             "first_name": "Bob",
             "last_name": "Johnson",
             "id_number": "987654321",
-            "balance": 1500.00,
+            "balance_cents": 150000,
             "transactions_to_execute": [],
             "transaction_history": []
         }
@@ -762,7 +826,7 @@ def test_open_new_account_valid_input(mock_input):
     assert updated_accounts[1003]['first_name'] == "John";
     assert updated_accounts[1003]['last_name'] == "Doe";
     assert updated_accounts[1003]['id_number'] == "123456789";
-    assert updated_accounts[1003]['balance'] == 1000.00;
+    assert updated_accounts[1003]['balance_cents'] == 100000;
 
 
 @patch('builtins.input', side_effect=["John123", "John", "Doe", "123456789", "1000.00"])
@@ -795,6 +859,21 @@ def test_open_new_account_invalid_id_number_then_valid(mock_input):
     assert updated_accounts[1003]['id_number'] == "123456789";
 
 
+@patch('builtins.input', side_effect=["John", "Doe", "\u00b2", "\u0661\u0662\u0663", "123", "1000.00"])
+def test_open_new_account_rejects_non_ascii_id_digits(mock_input):
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    identities: bid.IdentityTable = bid.build_identity_table(accounts);
+    try:
+        updated_accounts: dict[int, dict[str, any]] = bk.open_new_account(accounts);
+    finally:
+        bk.event_listeners.remove(identities.record);
+
+    # Check that superscript and Arabic-Indic digits are rejected before the account is added
+    assert updated_accounts[1003]['id_number'] == "123";
+    assert identities.find_by_id_number("123") == [1003];
+    assert identities.find_by_id_number("\u0661\u0662\u0663") == [];
+
+
 @patch('builtins.input', side_effect=["John", "Doe", "123456789", "-1000.00", "1000.00"])
 def test_open_new_account_invalid_balance_then_valid(mock_input):
     accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
@@ -802,9 +881,19 @@ def test_open_new_account_invalid_balance_then_valid(mock_input):
 
     # Check that the new account was created after correcting the balance
     assert 1003 in updated_accounts;
-    assert updated_accounts[1003]['balance'] == 1000.00;
+    assert updated_accounts[1003]['balance_cents'] == 100000;
 
 
+
+@patch('builtins.input', side_effect=["John", "Doe", "123456789", "100.005", "abc", "100.10"])
+def test_open_new_account_balance_in_whole_cents(mock_input):
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    updated_accounts: dict[int, dict[str, any]] = bk.open_new_account(accounts);
+
+    # Check that fractions of a cent and non-numbers are rejected, and the balance is stored in whole cents
+    assert updated_accounts[1003]['balance_cents'] == 10010;
+    assert updated_accounts[1003]['opening_balance_cents'] == 10010;
+
 @patch('builtins.input', side_effect=[
     "EX",                         # Exit on first name
     "John", "EX",                 # Exit on last name
@@ -821,5 +910,407 @@ def test_open_new_account_exit_scenarios(mock_input):
         assert 1003 not in updated_accounts;
 
 
+# Tests for SystemClock and FixedClock classes
+
+
+def test_fixed_clock_timestamps():
+    # Arrange
+    clock: bk.FixedClock = bk.FixedClock(datetime(2030, 1, 1, 12, 0, 0));
+
+    # Act
+    first: str = clock.timestamp();
+    clock.advance(61.5);
+    second: str = clock.timestamp();
+
+    # Assert
+    assert first == "2030-01-01 12:00:00";
+    assert second == "2030-01-01 12:01:01";
+
+
+def test_system_clock_reuses_formatted_second():
+    # Arrange
+    clock: bk.SystemClock = bk.SystemClock();
+    seconds: float = datetime(2030, 1, 1, 12, 0, 0).timestamp();
+
+    # Act
+    first: str = clock.format(seconds + 0.1);
+    second: str = clock.format(seconds + 0.9);
+
+    # Assert
+    assert first == "2030-01-01 12:00:00";
+    assert second is first;
+
+
+def test_execute_transactions_due_only_with_fixed_clock():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    accounts[1002]["transactions_to_execute"] = [
+        ("2030-01-01 10:00:00", "2030-01-01 11:00:00", 1002, 1001, 100.00),
+        ("2030-01-01 10:00:00", "2030-01-01 13:00:00", 1002, 1001, 200.00)
+    ];
+    clock: bk.FixedClock = bk.FixedClock(datetime(2030, 1, 1, 12, 0, 0));
+
+    # Act
+    with patch('builtins.input', side_effect=["1002"]):
+        bk.execute_transactions(accounts, due_only=True, clock=clock);
+
+    # Assert
+    assert accounts[1002]["balance_cents"] == 140000;
+    assert accounts[1002]["transaction_history"] == [
+        ("2030-01-01 10:00:00", "2030-01-01 11:00:00", 1002, 1001, 100.00, "2030-01-01 12:00:00")
+    ];
+    assert len(accounts[1002]["transactions_to_execute"]) == 1;
+
+
+# Tests for reserved_amount function
+
+
+def test_amount_validation_check_exceeds_available_balance():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = {123: {"first_name": "Bob", "last_name": "Johnson", "id_number": "987654321",
+                                                 "balance_cents": 150000,
+                                                 "transactions_to_execute": [
+                                                     ("2024-08-01 12:00:00", "2030-08-30 12:00:00", 123, 456, 1000.00)
+                                                 ],
+                                                 "transaction_history": []}};
+
+    with pytest.raises(ValueError) as ex:
+        bk.amount_validation_check("600", 123, accounts);
+
+    # Assert
+    assert str(ex.value) == "The amount exceeds the available balance. You can transfer up to 500.00.";
+
+
+def test_reserved_amount_follows_enqueue_and_settlement():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    first: tuple[str, str, int, int, float] = ("2024-08-01 12:00:00", "2030-08-30 12:00:00", 1002, 1001, 100.00);
+    second: tuple[str, str, int, int, float] = ("2024-08-01 12:00:01", "2030-08-30 12:00:00", 1002, 1001, 250.00);
+
+    # Act
+    bk.enqueue_transaction(accounts, first);
+    bk.enqueue_transaction(accounts, second);
+    reserved_after_enqueue: int = bk.reserved_amount(accounts[1002]);
+    bk.settle_transaction(accounts, first, "2030-08-30 12:00:00");
+
+    # Assert
+    assert reserved_after_enqueue == 35000;
+    assert bk.reserved_amount(accounts[1002]) == 25000;
+    assert bk.reserved_amount(accounts[1001]) == 0;
+
+
+def test_reserved_amount_does_not_change_account():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    accounts[1002]["transactions_to_execute"].append(("2024-08-01 12:00:00", "2030-08-30 12:00:00", 1002, 1001, 40.00));
+
+    # Act
+    reserved: int = bk.reserved_amount(accounts[1002]);
+
+    # Assert
+    assert reserved == 4000;
+    assert "reserved_cents" not in accounts[1002];
+
+
+def test_reserved_views_are_set_up_front():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = bk.init_interface();
+
+    # Act
+    account: dict[str, any] = bk.create_account(accounts, 2001, "Dana", "White", "111111111", 10.00, publish=False);
+
+    # Assert
+    assert account["reserved_cents"] == 0;
+    assert all("reserved_cents" in existing for existing in accounts.values());
+
+
+# Tests for enqueue_transaction function and DedupIndex class
+
+
+def test_enqueue_transaction_rejects_duplicate_key():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    dedup_index: bk.DedupIndex = bk.DedupIndex();
+    transaction: tuple[str, str, int, int, float] = ("2024-08-01 12:00:00", "2030-08-30 12:00:00", 1002, 1001, 100.00);
+    bk.enqueue_transaction(accounts, transaction, "request-1", dedup_index);
+
+    with pytest.raises(ValueError) as ex:
+        bk.enqueue_transaction(accounts, transaction, "request-1", dedup_index);
+
+    # Assert
+    assert str(ex.value) == "Duplicate submission: idempotency key 'request-1' was already used.";
+    assert accounts[1002]["transactions_to_execute"] == [transaction];
+
+
+def test_enqueue_transaction_without_key_allows_repeats():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    transaction: tuple[str, str, int, int, float] = ("2024-08-01 12:00:00", "2030-08-30 12:00:00", 1002, 1001, 100.00);
+
+    # Act
+    bk.enqueue_transaction(accounts, transaction);
+    bk.enqueue_transaction(accounts, transaction);
+
+    # Assert
+    assert accounts[1002]["transactions_to_execute"] == [transaction, transaction];
+
+
+def test_dedup_index_expires_keys():
+    # Arrange
+    dedup_index: bk.DedupIndex = bk.DedupIndex(ttl_seconds=10);
+
+    # Act
+    first: bool = dedup_index.add("request-1", now=0);
+    duplicate: bool = dedup_index.add("request-1", now=5);
+    after_expiry: bool = dedup_index.add("request-1", now=11);
+
+    # Assert
+    assert (first, duplicate, after_expiry) == (True, False, True);
+    assert len(dedup_index) == 1;
+
+
+def test_dedup_index_is_bounded():
+    # Arrange
+    dedup_index: bk.DedupIndex = bk.DedupIndex(capacity=3);
+
+    # Act
+    for key in ["a", "b", "c", "d"]:
+        dedup_index.add(key, now=0);
+
+    # Assert
+    assert len(dedup_index) == 3;
+    assert dedup_index.add("a", now=1);
+    assert not dedup_index.add("d", now=1);
+
+
+
+def test_dedup_index_uses_injected_clock():
+    # Arrange
+    clock: bk.FixedClock = bk.FixedClock(datetime(2024, 8, 1, 12, 0, 0));
+    dedup_index: bk.DedupIndex = bk.DedupIndex(ttl_seconds=10, clock=clock.time);
+    dedup_index.add("request-1");
+
+    # Act
+    remembered: bool = "request-1" in dedup_index;
+    clock.advance(11);
+    expired: bool = "request-1" in dedup_index;
+
+    # Assert
+    assert (remembered, expired) == (True, False);
+    assert dedup_index.add("request-1");
+
+
+def test_enqueue_transaction_key_without_index():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    transaction: tuple[str, str, int, int, float] = ("2024-08-01 12:00:00", "2030-08-30 12:00:00", 1002, 1001, 100.00);
+
+    # Act
+    with pytest.raises(ValueError) as ex:
+        bk.enqueue_transaction(accounts, transaction, "request-1");
+
+    # Assert
+    assert str(ex.value) == "An idempotency key requires a dedup index to check it against.";
+    assert accounts[1002]["transactions_to_execute"] == [];
+
+
+# Tests for integer cents
+
+
+def test_parse_and_format_cents():
+    # Act
+    parsed: list[int] = [bk.parse_cents(amount) for amount in ["100", "12.34", "0.1", " 7.50 "]];
+    formatted: list[str] = [bk.format_cents(cents) for cents in [10000, 1234, 5, -1205, 0]];
+
+    # Assert
+    assert parsed == [10000, 1234, 10, 750];
+    assert formatted == ["100.00", "12.34", "0.05", "-12.05", "0.00"];
+
+
+def test_amount_validation_check_rejects_fractions_of_a_cent():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+
+    # Act
+    with pytest.raises(ValueError) as ex:
+        bk.amount_validation_check("10.005", 1001, accounts);
+
+    # Assert
+    assert str(ex.value) == "The amount cannot include fractions of a cent.";
+
+
+def test_settlement_does_not_drift():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = bk.build_activity_views(create_new_mock_accounts());
+    accounts[1001]["balance_cents"] = 30;
+    transactions: list[tuple] = [("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 0.10) for _ in range(3)];
+    for transaction in transactions:
+        bk.enqueue_transaction(accounts, transaction);
+
+    # Act
+    for transaction in transactions:
+        bk.settle_transaction(accounts, transaction, "2024-08-01 10:00:01");
+
+    # Assert
+    assert accounts[1001]["balance_cents"] == 0;
+    assert accounts[1001]["reserved_cents"] == 0;
+    assert accounts[1002]["balance_cents"] == 150030;
+    assert accounts[1001]["activity"]["sent"] == 30;
+
+
+
+def test_settlement_keeps_history_in_execution_order():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    transactions: list[tuple] = [("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 10.00 + i)
+                                 for i in range(3)];
+    for transaction in transactions:
+        bk.enqueue_transaction(accounts, transaction);
+
+    # Act
+    bk.settle_transaction(accounts, transactions[0], "2024-08-01 10:00:05");
+    late: tuple = bk.settle_transaction(accounts, transactions[1], "2024-08-01 10:00:03");
+    bk.settle_transaction(accounts, transactions[2], "2024-08-01 10:00:06");
+
+    # Assert
+    history: list[tuple] = accounts[1001]["transaction_history"];
+    assert late[5] == "2024-08-01 10:00:05";
+    assert [row[5] for row in history] == sorted(row[5] for row in history);
+    assert list(bh.history_between(history, "2024-08-01 10:00:05", "2024-08-01 10:00:06")) == history[:2];
+
+# Tests for ReadSnapshot class
+
+
+def test_read_snapshot_is_isolated_from_writers():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    transaction: tuple = ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 100.00);
+    bk.enqueue_transaction(accounts, transaction);
+    untouched: dict[str, any] = accounts[1002];
+
+    # Act
+    with bk.ReadSnapshot(accounts) as snapshot:
+        bk.settle_transaction(accounts, transaction, "2024-08-01 10:00:01");
+        bk.create_account(accounts, 1003, "John", "Doe", "123456789", 100.00);
+        seen: list = [(n, account["balance_cents"], len(account["transactions_to_execute"]))
+                      for n, account in snapshot.items()];
+
+    # Assert
+    assert seen == [(1001, 250000, 1), (1002, 150000, 0)];
+    assert accounts[1001]["balance_cents"] == 240000;
+    assert accounts[1002]["balance_cents"] == 160000;
+    assert accounts[1002] is not untouched;
+    assert bk.snapshot_states == {};
+
+
+def test_writers_change_accounts_in_place_without_snapshots():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    account: dict[str, any] = accounts[1001];
+    with bk.ReadSnapshot(accounts):
+        pass;
+
+    # Act
+    bk.enqueue_transaction(accounts, ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 100.00));
+
+    # Assert
+    assert accounts[1001] is account;
+    assert len(account["transactions_to_execute"]) == 1;
+
+
+# Tests for settle_batch function
+
+
+def test_settle_batch_rolls_back_on_failure():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_new_mock_accounts();
+    valid: tuple = ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 100.00);
+    missing_target: tuple = ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 9999, 50.00);
+    bk.enqueue_transaction(accounts, valid);
+    bk.enqueue_transaction(accounts, missing_target);
+    for account_number, account in accounts.items():
+        bk.account_checksum(account_number, account);
+    before: dict[int, dict[str, any]] = copy.deepcopy(accounts);
+
+    # Act
+    with pytest.raises(KeyError):
+        bk.settle_batch(accounts, [valid, valid, missing_target], "2024-08-01 10:00:01");
+
+    # Assert
+    assert accounts == before;
+
+
+def test_settle_batch_commits_all():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = bk.build_activity_views(create_new_mock_accounts());
+    transactions: list[tuple] = [("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 10.00 * i)
+                                 for i in range(1, 4)];
+    for transaction in transactions:
+        bk.enqueue_transaction(accounts, transaction);
+
+    # Act
+    executed: list = bk.settle_batch(accounts, transactions, "2024-08-01 10:00:01");
+
+    # Assert
+    assert executed == [transaction + ("2024-08-01 10:00:01",) for transaction in transactions];
+    assert accounts[1001]["balance_cents"] == 244000;
+    assert accounts[1002]["activity"]["received_count"] == 3;
+
+
+# Tests for update_exposure and build_exposure_views functions
+
+
+def test_exposure_views_follow_enqueue_and_settlement():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = bk.build_exposure_views(create_new_mock_accounts());
+    first: tuple = ("2024-08-01 10:00:00", "2024-08-05 10:00:00", 1001, 1002, 100.10);
+    second: tuple = ("2024-08-01 11:00:00", "2024-08-06 10:00:00", 1001, 1002, 50.00);
+
+    # Act
+    bk.enqueue_transaction(accounts, first);
+    bk.enqueue_transaction(accounts, second);
+    bk.settle_transaction(accounts, first, "2024-08-05 10:00:01");
+
+    # Assert
+    assert accounts[1001]["exposure"] == {"outgoing": 5000, "incoming": 0, "daily": {
+        "2024-08-06": {"outgoing": 5000, "incoming": 0, "count": 1}}};
+    assert accounts[1002]["exposure"] == {"outgoing": 0, "incoming": 5000, "daily": {
+        "2024-08-06": {"outgoing": 0, "incoming": 5000, "count": 1}}};
+
+
+def test_build_exposure_views_matches_incremental_updates():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = bk.build_exposure_views(create_new_mock_accounts());
+    for day in range(1, 4):
+        bk.enqueue_transaction(accounts, ("2024-08-01 10:00:00", f"2024-08-0{day} 10:00:00", 1001, 1002, 10.00));
+        bk.enqueue_transaction(accounts, ("2024-08-01 10:00:00", f"2024-08-0{day} 12:00:00", 1002, 1001, 5.00));
+    incremental: dict[int, dict[str, any]] = copy.deepcopy({n: account["exposure"] for n, account in accounts.items()});
+
+    # Act
+    bk.build_exposure_views(accounts);
+
+    # Assert
+    assert {n: account["exposure"] for n, account in accounts.items()} == incremental;
+    assert accounts[1001]["exposure"]["daily"]["2024-08-02"] == {"outgoing": 1000, "incoming": 500, "count": 2};
+
+
+def test_settle_batch_rolls_back_exposure():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = bk.build_exposure_views(create_new_mock_accounts());
+    valid: tuple = ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 100.00);
+    missing_target: tuple = ("2024-08-01 10:00:00", "2024-08-02 10:00:00", 1001, 9999, 50.00);
+    bk.enqueue_transaction(accounts, valid);
+    bk.enqueue_transaction(accounts, missing_target);
+    before: dict[int, dict[str, any]] = copy.deepcopy({n: account["exposure"] for n, account in accounts.items()});
+
+    # Act
+    with pytest.raises(KeyError):
+        bk.settle_batch(accounts, [valid, missing_target], "2024-08-02 10:00:01");
+
+    # Assert
+    assert {n: account["exposure"] for n, account in accounts.items()} == before;
+    assert accounts[1001]["exposure"]["outgoing"] == 15000;
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,180 @@
+import sys
+import tracemalloc
+
+import Bank_Accounts as bk
+
+# Number of allocation sites listed in a report
+TOP_ALLOCATIONS: int = 10;
+
+# Account fields measured as the identity component; every other field that is not a queue or history is a view
+IDENTITY_FIELDS: tuple[str, ...] = ("first_name", "last_name", "id_number", "balance_cents");
+PENDING_FIELDS: tuple[str, ...] = ("transactions_to_execute",);
+HISTORY_FIELDS: tuple[str, ...] = ("transaction_history", "history_segments");
+
+
+# Function to measure an object together with everything it contains
+def deep_sizeof(value: any, seen: set[int]) -> int:
+    """
+        Adds up sys.getsizeof of an object and of every object reachable through its dicts, lists, tuples and
+        sets. Objects whose id is already in seen are not counted again, so shared objects such as interned keys
+        are counted once, by the first component that reaches them.
+
+        Args:
+            value (any): The object to measure.
+            seen (set[int]): The ids of the objects already counted. It is updated.
+
+        Returns:
+            int: The size in bytes.
+    """
+
+    size: int = 0;
+    stack: list[any] = [value];
+    while stack:
+        item: any = stack.pop();
+        if id(item) in seen:
+            continue;
+        seen.add(id(item));
+        size += sys.getsizeof(item);
+        if isinstance(item, dict):
+            stack.extend(item.keys());
+            stack.extend(item.values());
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item);
+    return size;
+
+
+# Function to measure the memory of the accounts by component
+def measure_accounts(accounts: dict[int, dict[str, any]]) -> dict[str, dict[str, int]]:
+    """
+        Measures the deep size of the accounts, split into the account dicts themselves, the identity fields, the
+        pending queues, the transaction history and the derived views (reserved amounts, activity, exposure, checksums).
+
+        The accounts are measured through a ReadSnapshot, so the figures describe one consistent state while
+        transfers keep settling; only the accounts they change during the walk are copied.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+
+        Returns:
+            dict: For every component, its size in 'bytes' and the number of 'objects' it holds: accounts,
+                  pending transactions, history rows in memory, or accounts with the fields.
+    """
+
+    components: dict[str, dict[str, int]] = {name: {"bytes": 0, "objects": 0}
+                                             for name in ("accounts", "identity", "pending", "history", "views")};
+    seen: set[int] = set();
+    with bk.ReadSnapshot(accounts) as snapshot:
+        components["accounts"]["bytes"] += sys.getsizeof(snapshot.accounts);
+        seen.add(id(snapshot.accounts));
+        for account_number, account in snapshot.items():
+            components["accounts"]["bytes"] += deep_sizeof(account_number, seen) + sys.getsizeof(account);
+            components["accounts"]["objects"] += 1;
+            components["identity"]["objects"] += 1;
+            seen.add(id(account));
+            for key, value in account.items():
+                components["accounts"]["bytes"] += deep_sizeof(key, seen);
+                if key in IDENTITY_FIELDS:
+                    component: str = "identity";
+                elif key in PENDING_FIELDS:
+                    component = "pending";
+                    components[component]["objects"] += len(value);
+                elif key in HISTORY_FIELDS:
+                    component = "history";
+                    if key == "transaction_history":
+                        components[component]["objects"] += len(value);
+                else:
+                    component = "views";
+                components[component]["bytes"] += deep_sizeof(value, seen);
+            if any(key not in IDENTITY_FIELDS + PENDING_FIELDS + HISTORY_FIELDS for key in account):
+                components["views"]["objects"] += 1;
+    return components;
+
+
+class MemoryProfiler:
+    """
+        Reports the memory of a live account store and how it grew since the previous report.
+
+        The first report starts tracemalloc, so allocation sites and traced totals appear from the second report
+        on. Tracing costs memory and time of its own; stop it with stop when the investigation is over.
+    """
+
+    def __init__(self, frames: int = 1) -> None:
+        """
+            Args:
+                frames (int): The number of stack frames tracemalloc records per allocation (default is 1).
+        """
+
+        self.frames: int = frames;
+        self.previous: dict[str, dict[str, int]] | None = None;
+        self.previous_snapshot: tracemalloc.Snapshot | None = None;
+
+    def report(self, accounts: dict[int, dict[str, any]]) -> dict[str, any]:
+        """
+            Args:
+                accounts (dict): The dictionary containing all accounts.
+
+            Returns:
+                dict: The 'components' measured by measure_accounts, their 'total' bytes, the 'growth' in bytes of
+                      every component since the previous report (None for the first report), the 'traced' current
+                      and peak bytes of tracemalloc, and the 'top_allocations' as (site, bytes, growth) tuples.
+        """
+
+        components: dict[str, dict[str, int]] = measure_accounts(accounts);
+        growth: dict[str, int] | None = None;
+        if self.previous is not None:
+            growth = {name: component["bytes"] - self.previous[name]["bytes"]
+                      for name, component in components.items()};
+        self.previous = components;
+
+        traced: tuple[int, int] | None = None;
+        top_allocations: list[tuple[str, int, int]] = [];
+        if tracemalloc.is_tracing():
+            traced = tracemalloc.get_traced_memory();
+            snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]);
+            if self.previous_snapshot is not None:
+                statistics: list = snapshot.compare_to(self.previous_snapshot, "lineno");
+                top_allocations = [(str(stat.traceback), stat.size, stat.size_diff)
+                                   for stat in statistics[:TOP_ALLOCATIONS]];
+            else:
+                top_allocations = [(str(stat.traceback), stat.size, stat.size)
+                                   for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]];
+            self.previous_snapshot = snapshot;
+        else:
+            tracemalloc.start(self.frames);
+
+        return {"components": components, "total": sum(component["bytes"] for component in components.values()),
+                "growth": growth, "traced": traced, "top_allocations": top_allocations};
+
+    def stop(self) -> None:
+        """
+            Stops tracemalloc and forgets the previous allocation snapshot.
+        """
+
+        tracemalloc.stop();
+        self.previous_snapshot = None;
+
+
+# Function to format a memory report for the menu
+def format_report(report: dict[str, any]) -> str:
+    """
+        Args:
+            report (dict): A report returned by MemoryProfiler.report.
+
+        Returns:
+            str: The report as text, with the bytes per object of every component.
+    """
+
+    lines: list[str] = ["\n--- Memory Diagnostics ---", f"Total: {report['total']:,} bytes"];
+    for name, component in report["components"].items():
+        per_object: str = (f", {component['bytes'] / component['objects']:,.0f} bytes each"
+                           if component["objects"] else "");
+        change: str = f", {report['growth'][name]:+,} since last report" if report["growth"] is not None else "";
+        lines.append(f"{name}: {component['bytes']:,} bytes for {component['objects']:,} objects{per_object}{change}");
+    if report["traced"] is None:
+        lines.append("Allocation tracing started; allocation sites are shown from the next report on.");
+    else:
+        lines.append(f"Traced: {report['traced'][0]:,} bytes now, {report['traced'][1]:,} bytes at peak");
+        lines.extend(f"  {site}: {size:,} bytes ({size_diff:+,})"
+                     for site, size, size_diff in report["top_allocations"]);
+    return "\n".join(lines);
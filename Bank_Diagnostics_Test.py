@@ -0,0 +1,120 @@
+import sys
+import threading
+import tracemalloc
+from unittest.mock import patch
+
+import Bank_Accounts as bk
+import Bank_Diagnostics as bd
+
+
+def create_mock_accounts():
+    return {
+        1001: {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "id_number": "123456789",
+            "balance_cents": 250000,
+            "transactions_to_execute": [("2024-08-01 10:00:00", "2030-01-01 10:00:00", 1001, 1002, 100.00)],
+            "transaction_history": [
+                ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 50.00, "2024-08-01 10:00:01"),
+                ("2024-08-01 11:00:00", "2024-08-01 11:00:00", 1001, 1002, 20.00, "2024-08-01 11:00:01")
+            ],
+            "reserved_cents": 10000
+        },
+        1002: {
+            "first_name": "Bob",
+            "last_name": "Johnson",
+            "id_number": "987654321",
+            "balance_cents": 150000,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+    };
+
+
+# Tests for deep_sizeof function
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    # Arrange
+    shared: str = "x" * 1000;
+    value: list = [shared, shared, (shared,)];
+
+    # Act
+    size: int = bd.deep_sizeof(value, set());
+
+    # Assert
+    assert size == sys.getsizeof(value) + sys.getsizeof(shared) + sys.getsizeof((shared,));
+
+
+# Tests for measure_accounts function
+
+
+def test_measure_accounts_splits_components():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+
+    # Act
+    components: dict = bd.measure_accounts(accounts);
+
+    # Assert
+    assert [components[name]["objects"] for name in ("accounts", "identity", "pending", "history", "views")] == \
+        [2, 2, 1, 2, 1];
+    assert all(components[name]["bytes"] > 0 for name in ("accounts", "identity", "pending", "history"));
+    assert components["history"]["bytes"] > components["pending"]["bytes"];
+
+
+
+def test_measure_accounts_does_not_block_settlements():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    transaction: tuple = accounts[1001]["transactions_to_execute"][0];
+    settled: list = [];
+    deep_sizeof = bd.deep_sizeof;
+
+    def settle_while_measuring(value: any, seen: set[int]) -> int:
+        if not settled:
+            settler: threading.Thread = threading.Thread(
+                target=lambda: settled.append(bk.settle_transaction(accounts, transaction, "2024-08-02 10:00:00")));
+            settler.start();
+            settler.join(timeout=5);
+            settled.append(settler.is_alive());
+        return deep_sizeof(value, seen);
+
+    # Act
+    with patch("Bank_Diagnostics.deep_sizeof", side_effect=settle_while_measuring):
+        components: dict = bd.measure_accounts(accounts);
+
+    # Assert
+    assert settled[1] is False;
+    assert accounts[1001]["transactions_to_execute"] == [];
+    assert components["pending"]["objects"] == 1;
+    assert components["history"]["objects"] == 2;
+
+# Tests for MemoryProfiler class
+
+
+def test_profiler_reports_growth():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    profiler: bd.MemoryProfiler = bd.MemoryProfiler();
+    was_tracing: bool = tracemalloc.is_tracing();
+    try:
+        first: dict = profiler.report(accounts);
+        accounts[1002]["transaction_history"].extend(
+            ("2024-08-02 10:00:00", "2024-08-02 10:00:00", 1002, 1001, float(i), f"2024-08-02 10:00:{i:02d}")
+            for i in range(50));
+
+        # Act
+        second: dict = profiler.report(accounts);
+        text: str = bd.format_report(second);
+    finally:
+        if not was_tracing:
+            profiler.stop();
+
+    # Assert
+    assert first["growth"] is None;
+    assert second["growth"]["history"] > 0;
+    assert second["growth"]["pending"] == 0;
+    assert second["traced"] is not None;
+    assert "history: " in text and "since last report" in text;
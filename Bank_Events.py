@@ -0,0 +1,415 @@
+import bisect
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator
+
+import Bank_Accounts as bk
+import Bank_Replication as brp
+
+
+class Projection(ABC):
+    """
+        A read model derived from the event stream alone.
+
+        apply updates the projection with one event, so a live projection follows the store as events are
+        published. A projection can also be folded from a slice of the stream and merged with the projection of
+        the following slice, which is how rebuild_projections rebuilds it in parallel.
+
+        An 'accounts_import' event opens every imported account, adds its history rows through on_history (they
+        were settled before the stream started, so their amounts are already in the imported balances) and
+        submits its pending transactions.
+    """
+
+    def apply(self, event: dict[str, any]) -> None:
+        """
+            Args:
+                event (dict): A 'transfer', 'settlement', 'account_open' or 'accounts_import' event or journal
+                              entry. Other events are ignored.
+        """
+
+        match event["type"]:
+            case "account_open":
+                self.on_open(event);
+            case "accounts_import":
+                for account_number, account in event["accounts"].items():
+                    self.on_open({"account_number": int(account_number), "id_number": account["id_number"],
+                                  "balance": bk.from_cents(account["balance_cents"])});
+                    for executed_transaction in account["transaction_history"]:
+                        self.on_history(tuple(executed_transaction));
+                    for transaction in account["transactions_to_execute"]:
+                        self.on_transfer(tuple(transaction));
+            case "transfer":
+                self.on_transfer(tuple(event["transaction"]));
+            case "settlement":
+                self.on_settlement(tuple(event["transaction"]) + (event["execution_time"],));
+
+    def on_open(self, event: dict[str, any]) -> None:
+        pass;
+
+    def on_transfer(self, transaction: tuple[str, str, int, int, float]) -> None:
+        pass;
+
+    def on_settlement(self, executed_transaction: tuple[str, str, int, int, float, str]) -> None:
+        pass;
+
+    def on_history(self, executed_transaction: tuple[str, str, int, int, float, str]) -> None:
+        pass;
+
+    @abstractmethod
+    def merge(self, later: "Projection") -> None:
+        """
+            Adds the projection of the slice of the stream that follows this projection's slice.
+
+            Args:
+                later (Projection): A projection of the same type.
+        """
+
+
+class BalanceProjection(Projection):
+    """
+        The balance of every account and the total of all balances, in integer cents.
+
+        A projection folded from a slice of the stream holds the change of every balance within the slice; the
+        opening balance counts as a change, so merging the slices adds them up. Settlements only move money between
+        accounts, so the total changes only when an account is opened.
+    """
+
+    def __init__(self) -> None:
+        self.balances: dict[int, int] = {};
+        self.total_cents: int = 0;
+
+    def on_open(self, event: dict[str, any]) -> None:
+        self.change(event["account_number"], bk.to_cents(event["balance"]));
+
+    def on_settlement(self, executed_transaction: tuple[str, str, int, int, float, str]) -> None:
+        source, target, amount = executed_transaction[2:5];
+        cents: int = bk.to_cents(amount);
+        self.change(source, -cents);
+        self.change(target, cents);
+
+    def change(self, account_number: int, cents: int) -> None:
+        self.balances[account_number] = self.balances.get(account_number, 0) + cents;
+        self.total_cents += cents;
+
+    def merge(self, later: "BalanceProjection") -> None:
+        for account_number, cents in later.balances.items():
+            self.change(account_number, cents);
+
+    def balance(self, account_number: int) -> float:
+        """
+            Raises:
+                KeyError: If the account was never opened or used.
+        """
+
+        return bk.from_cents(self.balances[account_number]);
+
+
+class SortedBalanceProjection(BalanceProjection):
+    """
+        The balances together with the accounts sorted by balance, kept sorted with bisect as balances change.
+    """
+
+    def __init__(self) -> None:
+        super().__init__();
+        self.ordered: list[tuple[int, int]] = [];
+
+    def change(self, account_number: int, cents: int) -> None:
+        old: int | None = self.balances.get(account_number);
+        if old is not None:
+            del self.ordered[bisect.bisect_left(self.ordered, (old, account_number))];
+        super().change(account_number, cents);
+        bisect.insort(self.ordered, (self.balances[account_number], account_number));
+
+    def merge(self, later: "SortedBalanceProjection") -> None:
+        # The balances are added up first and sorted once, instead of moving every account one change at a time
+        for account_number, cents in later.balances.items():
+            self.balances[account_number] = self.balances.get(account_number, 0) + cents;
+        self.total_cents += later.total_cents;
+        self.ordered = sorted((cents, account_number) for account_number, cents in self.balances.items());
+
+    def lowest(self, count: int) -> list[tuple[int, float]]:
+        """
+            Args:
+                count (int): The number of accounts.
+
+            Returns:
+                list: (account_number, balance) pairs, lowest balance first.
+        """
+
+        return [(account_number, bk.from_cents(cents)) for cents, account_number in self.ordered[:count]];
+
+    def highest(self, count: int) -> list[tuple[int, float]]:
+        """
+            Args:
+                count (int): The number of accounts.
+
+            Returns:
+                list: (account_number, balance) pairs, highest balance first.
+        """
+
+        return [(account_number, bk.from_cents(cents))
+                for cents, account_number in reversed(self.ordered[-count:] if count > 0 else [])];
+
+
+class IdNumberProjection(Projection):
+    """
+        The account numbers of every ID number, in the order the accounts were opened.
+    """
+
+    def __init__(self) -> None:
+        self.accounts_by_id: dict[str, list[int]] = {};
+
+    def on_open(self, event: dict[str, any]) -> None:
+        self.accounts_by_id.setdefault(event["id_number"], []).append(event["account_number"]);
+
+    def merge(self, later: "IdNumberProjection") -> None:
+        for id_number, account_numbers in later.accounts_by_id.items():
+            self.accounts_by_id.setdefault(id_number, []).extend(account_numbers);
+
+    def find(self, id_number: str) -> list[int]:
+        return list(self.accounts_by_id.get(id_number, []));
+
+
+class DailyVolumeProjection(Projection):
+    """
+        The number and the total amount of the transactions settled on every execution day.
+
+        Only one pair of counters is kept per day, so the projection stays small however long the history grows.
+    """
+
+    def __init__(self) -> None:
+        self.days: dict[str, list[int]] = {};
+
+    def on_settlement(self, executed_transaction: tuple[str, str, int, int, float, str]) -> None:
+        self.add(executed_transaction[5][:10], 1, bk.to_cents(executed_transaction[4]));
+
+    def on_history(self, executed_transaction: tuple[str, str, int, int, float, str]) -> None:
+        self.on_settlement(executed_transaction);
+
+    def add(self, day: str, count: int, cents: int) -> None:
+        volume: list[int] = self.days.setdefault(day, [0, 0]);
+        volume[0] += count;
+        volume[1] += cents;
+
+    def merge(self, later: "DailyVolumeProjection") -> None:
+        for day, (count, cents) in later.days.items():
+            self.add(day, count, cents);
+
+    def on_day(self, day: str) -> tuple[int, float]:
+        """
+            Args:
+                day (str): The execution day (YYYY-MM-DD).
+
+            Returns:
+                tuple: The number of transactions settled on the day and their total amount.
+        """
+
+        count, cents = self.days.get(day, (0, 0));
+        return count, bk.from_cents(cents);
+
+
+# Projections an event store can maintain, by name
+PROJECTIONS: dict[str, type[Projection]] = {
+    "balances": BalanceProjection,
+    "sorted_balances": SortedBalanceProjection,
+    "id_numbers": IdNumberProjection,
+    "daily_volume": DailyVolumeProjection
+};
+
+
+# Function to start a journal with the accounts it is started from
+def seed_journal(journal: brp.Journal, accounts: dict[int, dict[str, any]]) -> bool:
+    """
+        Records an 'accounts_import' event of the accounts as the first entry of an empty journal, so the journal
+        alone recreates the store from an empty one. Journals that already have entries are left alone.
+
+        Args:
+            journal (Journal): The journal of Bank_Replication.
+            accounts (dict): The accounts the journal is started from.
+
+        Returns:
+            bool: True if the event was recorded.
+    """
+
+    with bk.settlement_lock:
+        if journal.seq > 0:
+            return False;
+        journal.record(accounts, bk.accounts_import_event(accounts));
+    return True;
+
+
+# Function to fold a slice of the event stream into a projection
+def fold_events(name: str, events: list[dict[str, any]]) -> Projection:
+    """
+        Args:
+            name (str): The name of the projection in PROJECTIONS.
+            events (list): A slice of the event stream.
+
+        Returns:
+            Projection: The projection of the slice.
+    """
+
+    projection: Projection = PROJECTIONS[name]();
+    for event in events:
+        projection.apply(event);
+    return projection;
+
+
+# Function to rebuild projections from the event stream in parallel
+def rebuild_projections(events: Iterable[dict[str, any]], names: tuple[str, ...] = tuple(PROJECTIONS),
+                        workers: int | None = None, chunk_size: int = 10_000) -> dict[str, Projection]:
+    """
+        Splits the stream into slices of chunk_size events, folds every slice of every projection in a process
+        pool, and merges the folded slices of each projection in stream order.
+
+        Args:
+            events (Iterable): The event stream, such as the entries of a journal.
+            names (tuple): The names of the projections in PROJECTIONS (default is every projection).
+            workers (int | None): The number of worker processes; 1 folds in this process, one slice at a time,
+                                  and None uses one per CPU (default is None).
+            chunk_size (int): The number of events per slice (default is 10,000).
+
+        Returns:
+            dict: The rebuilt projections, by name.
+
+        Raises:
+            ValueError: If a projection name is unknown.
+    """
+
+    for name in names:
+        if name not in PROJECTIONS:
+            raise ValueError(f"Unknown projection '{name}'.");
+    stream: Iterator[dict[str, any]] = iter(events);
+    chunks: Iterator[list[dict[str, any]]] = iter(lambda: list(islice(stream, chunk_size)), []);
+    projections: dict[str, Projection] = {name: PROJECTIONS[name]() for name in names};
+
+    if workers == 1:
+        for chunk in chunks:
+            for name in names:
+                projections[name].merge(fold_events(name, chunk));
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [{name: pool.submit(fold_events, name, chunk) for name in names} for chunk in chunks];
+            for folded in futures:
+                for name in names:
+                    projections[name].merge(folded[name].result());
+    return projections;
+
+
+class EventStore:
+    """
+        Projections of the event log of one account store, kept up to date as events are published.
+
+        The log is the journal of the store (see Bank_Replication.Journal). It starts with the 'accounts_import'
+        event of the accounts it was started from (see seed_journal) and records every later transfer, settlement
+        and account opening as it was applied, so the log alone recreates the store: the projections are rebuilt
+        and the accounts replayed from it, never from the accounts. Register journal.record and record as event
+        listeners of Bank_Accounts, so every published event is both written to the log and applied to the
+        projections.
+    """
+
+    def __init__(self, accounts: dict[int, dict[str, any]], journal: brp.Journal,
+                 names: tuple[str, ...] = tuple(PROJECTIONS), workers: int | None = 1) -> None:
+        """
+            Args:
+                accounts (dict): The dictionary containing all accounts.
+                journal (Journal): The journal of the accounts. An empty journal is seeded with the accounts.
+                names (tuple): The names of the projections to maintain (default is every projection).
+                workers (int | None): The number of worker processes that build the projections; see
+                                      rebuild_projections (default is 1).
+        """
+
+        self.accounts: dict[int, dict[str, any]] = accounts;
+        self.journal: brp.Journal = journal;
+        self.names: tuple[str, ...] = names;
+        # Events recorded while a rebuild is running, applied to the rebuilt projections before they are swapped in
+        self.recorded: list[dict[str, any]] | None = None;
+        with bk.settlement_lock:
+            seed_journal(journal, accounts);
+            self.projections: dict[str, Projection] = rebuild_projections(self.events(), names, workers);
+
+    def record(self, accounts: dict[int, dict[str, any]], event: dict[str, any]) -> None:
+        # Event listener that applies the events of the store's accounts to the projections
+        if accounts is self.accounts:
+            for projection in self.projections.values():
+                projection.apply(event);
+            if self.recorded is not None:
+                self.recorded.append(event);
+
+    def events(self, end: int | None = None) -> Iterator[dict[str, any]]:
+        """
+            Reads the log from its first entry.
+
+            Args:
+                end (int | None): The sequence number to stop before, or None for every entry recorded so far
+                                  (default is None).
+
+            Returns:
+                Iterator: The journal entries, in the order they were applied.
+        """
+
+        return islice(self.journal.read_from(0), self.journal.seq if end is None else end);
+
+    def rebuild(self, workers: int | None = None, chunk_size: int = 10_000) -> dict[str, Projection]:
+        """
+            Rebuilds every projection from the log, for example after a new projection type was added.
+
+            Args:
+                workers (int | None): The number of worker processes; see rebuild_projections (default is None).
+                chunk_size (int): The number of events per slice (default is 10,000).
+
+            Returns:
+                dict: The rebuilt projections, by name.
+        """
+
+        # The entries up to end are folded; the events published from then on are recorded and applied after
+        with bk.settlement_lock:
+            end: int = self.journal.seq;
+            self.recorded = [];
+        try:
+            projections: dict[str, Projection] = rebuild_projections(self.events(end), self.names, workers,
+                                                                     chunk_size);
+        except BaseException:
+            with bk.settlement_lock:
+                self.recorded = None;
+            raise;
+        with bk.settlement_lock:
+            for event in self.recorded:
+                for projection in projections.values():
+                    projection.apply(event);
+            self.recorded = None;
+            self.projections = projections;
+        return projections;
+
+    def replay(self) -> dict[int, dict[str, any]]:
+        """
+            Returns:
+                dict: A new account store rebuilt by applying every entry of the log to an empty store.
+        """
+
+        accounts: dict[int, dict[str, any]] = {};
+        for event in self.events():
+            bk.apply_event(accounts, event);
+        return accounts;
+
+
+# Function to build the event store of the accounts and keep it up to date
+def build_event_store(accounts: dict[int, dict[str, any]], journal: brp.Journal,
+                      names: tuple[str, ...] = tuple(PROJECTIONS), workers: int | None = 1) -> EventStore:
+    """
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            journal (Journal): The journal of the accounts, registered as an event listener by the caller.
+            names (tuple): The names of the projections to maintain (default is every projection).
+            workers (int | None): The number of worker processes that build the projections (default is 1).
+
+        Returns:
+            EventStore: The store, registered as an event listener so later changes are recorded too. Remove
+                        store.record from the event listeners when the store is no longer used.
+    """
+
+    with bk.settlement_lock:
+        store: EventStore = EventStore(accounts, journal, names, workers);
+        bk.event_listeners.append(store.record);
+    return store;
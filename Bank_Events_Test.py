@@ -0,0 +1,197 @@
+from unittest.mock import patch
+
+import pytest
+
+import Bank_Accounts as bk
+import Bank_Events as bev
+import Bank_Replication as brp
+
+
+def create_mock_accounts():
+    return {
+        1001: {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "id_number": "123456789",
+            "balance_cents": 240000,
+            "transactions_to_execute": [
+                ("2024-08-17 14:00:00", "2024-08-18 14:00:00", 1001, 1003, 200.00)
+            ],
+            "transaction_history": [
+                ("2024-08-15 09:00:00", "2024-08-15 09:30:00", 1001, 1002, 100.00, "2024-08-15 09:30:00")
+            ]
+        },
+        1002: {
+            "first_name": "Bob",
+            "last_name": "Johnson",
+            "id_number": "987654321",
+            "balance_cents": 160000,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        },
+        1003: {
+            "first_name": "Charlie",
+            "last_name": "Brown",
+            "id_number": "123456789",
+            "balance_cents": -5025,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+    };
+
+
+def open_journal(tmp_path, accounts: dict[int, dict[str, any]]) -> brp.Journal:
+    journal: brp.Journal = brp.Journal(str(tmp_path / "journal.log"));
+    bev.seed_journal(journal, accounts);
+    return journal;
+
+
+# Tests for seed_journal function
+
+
+def test_seeded_journal_replays_to_the_same_accounts(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    journal: brp.Journal = open_journal(tmp_path, accounts);
+
+    # Act
+    store: bev.EventStore = bev.EventStore(accounts, journal);
+    replayed: dict[int, dict[str, any]] = store.replay();
+
+    # Assert
+    assert [event["type"] for event in store.events()] == ["accounts_import"];
+    assert bev.seed_journal(journal, accounts) is False;
+    for account_number, account in accounts.items():
+        for field in ("first_name", "id_number", "balance_cents", "transactions_to_execute", "transaction_history"):
+            assert replayed[account_number][field] == account[field];
+    assert replayed[1003]["exposure"]["incoming"] == 20000;
+    journal.close();
+
+
+def test_replay_follows_the_log_not_the_accounts(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    journal: brp.Journal = open_journal(tmp_path, accounts);
+    store: bev.EventStore = bev.EventStore(accounts, journal);
+    transaction: tuple = ("2024-08-18 10:00:00", "2024-08-18 10:00:00", 1002, 1003, 60.25);
+    bk.event_listeners.append(journal.record);
+    try:
+        bk.enqueue_transaction(accounts, transaction);
+        bk.settle_transaction(accounts, transaction, "2024-08-18 10:00:01");
+    finally:
+        bk.event_listeners.remove(journal.record);
+
+    # Act
+    accounts[1002]["balance_cents"] = 0;
+    replayed: dict[int, dict[str, any]] = store.replay();
+
+    # Assert
+    assert [event["seq"] for event in store.events()] == [0, 1, 2];
+    assert replayed[1002]["balance_cents"] == 153975;
+    assert replayed[1003]["balance_cents"] == 1000;
+    assert replayed[1002]["transaction_history"] == [transaction + ("2024-08-18 10:00:01",)];
+    journal.close();
+
+
+# Tests for projections
+
+
+def test_projections_follow_published_events(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    journal: brp.Journal = open_journal(tmp_path, accounts);
+    bk.event_listeners.append(journal.record);
+    store: bev.EventStore = bev.build_event_store(accounts, journal);
+    transaction: tuple = ("2024-08-18 10:00:00", "2024-08-18 10:00:00", 1002, 1003, 60.25);
+
+    # Act
+    try:
+        bk.create_account(accounts, 1004, "Dana", "White", "987654321", 10.00);
+        bk.enqueue_transaction(accounts, transaction);
+        bk.settle_transaction(accounts, transaction, "2024-08-18 10:00:01");
+        bk.enqueue_transaction(create_mock_accounts(), transaction);
+    finally:
+        bk.event_listeners.remove(store.record);
+        bk.event_listeners.remove(journal.record);
+
+    # Assert
+    projections: dict[str, bev.Projection] = store.projections;
+    assert projections["balances"].balance(1003) == 10.00;
+    assert projections["balances"].balance(1004) == 10.00;
+    assert projections["balances"].total_cents == sum(account["balance_cents"] for account in accounts.values());
+    assert projections["sorted_balances"].lowest(2) == [(1003, 10.00), (1004, 10.00)];
+    assert projections["sorted_balances"].highest(1) == [(1001, 2400.00)];
+    assert projections["id_numbers"].find("987654321") == [1002, 1004];
+    assert projections["id_numbers"].find("123456789") == [1001, 1003];
+    assert projections["daily_volume"].on_day("2024-08-15") == (1, 100.00);
+    assert projections["daily_volume"].on_day("2024-08-18") == (1, 60.25);
+    assert projections["daily_volume"].on_day("2024-08-19") == (0, 0.00);
+    rebuilt: dict[str, bev.Projection] = bev.rebuild_projections(store.events(), workers=1);
+    assert rebuilt["sorted_balances"].ordered == projections["sorted_balances"].ordered;
+    assert rebuilt["id_numbers"].accounts_by_id == projections["id_numbers"].accounts_by_id;
+    journal.close();
+
+def test_reports_interface_totals_from_balance_projection(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    journal: brp.Journal = open_journal(tmp_path, accounts);
+    store: bev.EventStore = bev.EventStore(accounts, journal, ("balances",));
+    store.projections["balances"].total_cents += 100;
+
+    # Act
+    with patch("builtins.input", side_effect=["9", "10"]), patch("builtins.print") as mock_print:
+        bk.reports_interface(accounts, events=store);
+
+    # Assert
+    total_cents: int = sum(account["balance_cents"] for account in accounts.values()) + 100;
+    mock_print.assert_any_call(f"\nTotal balance of all accounts: {bk.format_cents(total_cents)}");
+    journal.close();
+
+def test_rebuild_projections_in_parallel_matches_sequential(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    journal: brp.Journal = open_journal(tmp_path, accounts);
+    store: bev.EventStore = bev.EventStore(accounts, journal);
+    bk.event_listeners.append(journal.record);
+    try:
+        for i in range(50):
+            transaction: tuple = ("2024-08-19 10:00:00", "2024-08-19 10:00:00", 1001 + i % 3, 1001 + (i + 1) % 3,
+                                  i + 0.5);
+            bk.enqueue_transaction(accounts, transaction);
+            bk.settle_transaction(accounts, transaction, f"2024-08-{19 + i // 25} 10:00:01");
+    finally:
+        bk.event_listeners.remove(journal.record);
+
+    # Act
+    parallel: dict[str, bev.Projection] = store.rebuild(workers=2, chunk_size=7);
+
+    # Assert
+    sequential: dict[str, bev.Projection] = bev.rebuild_projections(store.events(), workers=1);
+    assert parallel["balances"].balances == sequential["balances"].balances == {
+        account_number: account["balance_cents"] for account_number, account in accounts.items()};
+    assert parallel["balances"].total_cents == sequential["balances"].total_cents;
+    assert parallel["sorted_balances"].ordered == sequential["sorted_balances"].ordered;
+    assert parallel["id_numbers"].accounts_by_id == sequential["id_numbers"].accounts_by_id;
+    assert parallel["daily_volume"].days == sequential["daily_volume"].days;
+    assert parallel["daily_volume"].on_day("2024-08-20")[0] == 25;
+    assert store.projections is parallel;
+    journal.close();
+
+def test_rebuild_projections_unknown_name():
+    # Act
+    with pytest.raises(ValueError) as ex:
+        bev.rebuild_projections([], ("balances", "owners"), workers=1);
+
+    # Assert
+    assert str(ex.value) == "Unknown projection 'owners'.";
+
+
+def test_projection_requires_merge():
+    # Arrange
+    class OpenCounter(bev.Projection):
+        def on_open(self, event: dict[str, any]) -> None:
+            pass;
+
+    # Act
+    with pytest.raises(TypeError):
+        OpenCounter();
@@ -0,0 +1,257 @@
+import json
+import os
+import uuid
+import zlib
+from bisect import bisect_left
+from collections.abc import Sequence
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
+from typing import ContextManager, Iterator
+
+# Positions of the creation and execution times in a transaction history tuple
+CREATION_TIME: int = 0;
+EXECUTION_TIME: int = 5;
+
+
+class HistoryRange(Sequence):
+    """
+        A read-only view of a contiguous range of history rows that does not copy them.
+    """
+
+    def __init__(self, rows: Sequence, start: int, stop: int) -> None:
+        """
+            Args:
+                rows (Sequence): The history rows.
+                start (int): The position of the first row in the view.
+                stop (int): The position after the last row in the view.
+        """
+
+        self.rows: Sequence = rows;
+        self.start: int = start;
+        self.stop: int = max(start, stop);
+
+    def __len__(self) -> int:
+        return self.stop - self.start;
+
+    def __getitem__(self, index: int | slice) -> any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self));
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)];
+            return HistoryRange(self.rows, self.start + start, self.start + stop);
+        if index < 0:
+            index += len(self);
+        if not 0 <= index < len(self):
+            raise IndexError("History range index out of range.");
+        return self.rows[self.start + index];
+
+    def __iter__(self) -> Iterator[tuple[str, str, int, int, float, str]]:
+        rows: Sequence = self.rows;
+        for position in range(self.start, self.stop):
+            yield rows[position];
+
+    def __repr__(self) -> str:
+        return repr(list(self));
+
+
+# Function to find the rows executed in a time range by binary search
+def history_between(rows: Sequence, start: str | None = None, end: str | None = None) -> HistoryRange:
+    """
+        Returns the rows whose execution time lies in [start, end) as a lazy view, in O(log n).
+
+        History is appended in execution order, so the execution times are sorted and the range is found with two
+        binary searches instead of a scan.
+
+        Args:
+            rows (Sequence): History rows sorted by execution time, such as an account's transaction_history.
+            start (str | None): The inclusive lower bound, or None for no bound (default is None).
+            end (str | None): The exclusive upper bound, or None for no bound (default is None).
+
+        Returns:
+            HistoryRange: A view of the matching rows.
+    """
+
+    execution_time: itemgetter = itemgetter(EXECUTION_TIME);
+    low: int = 0 if start is None else bisect_left(rows, start, key=execution_time);
+    high: int = len(rows) if end is None else bisect_left(rows, end, lo=low, key=execution_time);
+    return HistoryRange(rows, low, high);
+
+
+# Function to write cold history rows to an immutable compressed segment
+def write_segment(path: str, rows: list[tuple[str, str, int, int, float, str]]) -> dict[str, any]:
+    """
+        Writes history rows to a new zlib-compressed segment file and summarizes them.
+
+        Args:
+            path (str): The path of the segment file. The file must not exist yet.
+            rows (list): The history rows to write, at least one.
+
+        Returns:
+            dict: The in-memory summary of the segment: its path, row count, total amount and the first and last
+                  creation and execution times.
+    """
+
+    with open(path, "xb") as segment:
+        segment.write(zlib.compress(json.dumps(rows).encode("utf-8")));
+    creation_times: list[str] = [row[CREATION_TIME] for row in rows];
+    execution_times: list[str] = [row[EXECUTION_TIME] for row in rows];
+    return {
+        "path": path,
+        "count": len(rows),
+        "total": sum(row[4] for row in rows),
+        "first_created": min(creation_times),
+        "last_created": max(creation_times),
+        "first_executed": min(execution_times),
+        "last_executed": max(execution_times)
+    };
+
+
+# Function to read the rows of a segment, decompressing it at most once while it is cached
+@lru_cache(maxsize=32)
+def load_segment(path: str) -> tuple[tuple[str, str, int, int, float, str], ...]:
+    """
+        Reads and decompresses a segment file. Segments are immutable, so recently read ones are cached.
+
+        Args:
+            path (str): The path of the segment file.
+
+        Returns:
+            tuple: The history rows of the segment.
+    """
+
+    with open(path, "rb") as segment:
+        rows: list[list[any]] = json.loads(zlib.decompress(segment.read()).decode("utf-8"));
+    return tuple(tuple(row) for row in rows);
+
+
+# Function to move an account's old history rows to a compressed segment
+def archive_history(account_number: int, account: dict[str, any], directory: str,
+                    cutoff: str) -> dict[str, any] | None:
+    """
+        Moves the history rows executed before the cutoff into a new segment and records its summary in the
+        account's 'history_segments' list.
+
+        Args:
+            account_number (int): The account number, used in the segment file name.
+            account (dict): The account details.
+            directory (str): The directory the segment files are written to.
+            cutoff (str): Rows executed before this time (YYYY-MM-DD HH:MM:SS) are archived.
+
+        Returns:
+            dict | None: The summary of the new segment, or None if there was nothing to archive.
+    """
+
+    history: list[tuple[str, str, int, int, float, str]] = account["transaction_history"];
+    cold: list[tuple[str, str, int, int, float, str]] = [row for row in history if row[EXECUTION_TIME] < cutoff];
+    if not cold:
+        return;
+
+    segments: list[dict[str, any]] = account.setdefault("history_segments", []);
+    path: str = os.path.join(directory, f"{account_number}-{len(segments):06d}-{uuid.uuid4().hex}.seg");
+    summary: dict[str, any] = write_segment(path, cold);
+    history[:] = [row for row in history if row[EXECUTION_TIME] >= cutoff];
+    segments.append(summary);
+    return summary;
+
+
+# Function to archive old history rows of every account
+def archive_all(accounts: dict[int, dict[str, any]], directory: str, older_than: timedelta,
+                now: datetime | None = None, lock: ContextManager | None = None) -> int:
+    """
+        Archives the history rows of all accounts that were executed more than older_than ago.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            directory (str): The directory the segment files are written to. It is created if needed.
+            older_than (timedelta): The age after which rows are archived.
+            now (datetime | None): The current time, or None for datetime.now() (default is None).
+            lock (ContextManager | None): A lock held while each account is archived, such as the
+                                          settlement lock (default is None).
+
+        Returns:
+            int: The number of archived rows.
+    """
+
+    os.makedirs(directory, exist_ok=True);
+    cutoff: str = ((now or datetime.now()) - older_than).strftime("%Y-%m-%d %H:%M:%S");
+    archived: int = 0;
+    for account_number in list(accounts):
+        with lock or nullcontext():
+            account: dict[str, any] = accounts[account_number];
+            summary: dict[str, any] | None = archive_history(account_number, account, directory, cutoff);
+            if summary is None:
+                continue;
+            # Stores that keep their own copy of the account, such as a disk-backed cache, are given the change
+            accounts[account_number] = account;
+        archived += summary["count"];
+    return archived;
+
+
+# Function to iterate over an account's history, reading only the segments that overlap the time range
+def iter_history(account: dict[str, any], start: str | None = None, end: str | None = None,
+                 field: int = CREATION_TIME) -> Iterator[tuple[str, str, int, int, float, str]]:
+    """
+        Yields the archived and in-memory history rows of an account whose time lies in [start, end).
+
+        Segments whose summary does not overlap the range are skipped without being read.
+
+        Args:
+            account (dict): The account details.
+            start (str | None): The inclusive lower bound, or None for no bound (default is None).
+            end (str | None): The exclusive upper bound, or None for no bound (default is None).
+            field (int): CREATION_TIME or EXECUTION_TIME, the time the range applies to (default is CREATION_TIME).
+
+        Returns:
+            Iterator: The matching history rows, archived rows first.
+    """
+
+    first_key, last_key = ("first_created", "last_created") if field == CREATION_TIME else \
+        ("first_executed", "last_executed");
+    for summary in account.get("history_segments", []):
+        if start is not None and summary[last_key] < start:
+            continue;
+        if end is not None and summary[first_key] >= end:
+            continue;
+        yield from select_rows(load_segment(summary["path"]), start, end, field);
+    yield from select_rows(account["transaction_history"], start, end, field);
+
+
+# Function to select the rows of one tier whose time lies in a range
+def select_rows(rows: Sequence, start: str | None, end: str | None, field: int) -> Iterator[tuple]:
+    """
+        Selects rows by binary search on the execution time, or by a scan on the creation time.
+
+        Args:
+            rows (Sequence): The rows of a segment or of the in-memory history, in execution order.
+            start (str | None): The inclusive lower bound.
+            end (str | None): The exclusive upper bound.
+            field (int): CREATION_TIME or EXECUTION_TIME.
+
+        Returns:
+            Iterator: The matching rows.
+    """
+
+    if field == EXECUTION_TIME:
+        return iter(history_between(rows, start, end));
+    if start is None and end is None:
+        return iter(rows);
+    return (row for row in rows if in_range(row[field], start, end));
+
+
+# Function to check whether a timestamp lies in a half-open range
+def in_range(value: str, start: str | None, end: str | None) -> bool:
+    """
+        Checks whether start <= value < end, where a missing bound is unbounded.
+
+        Args:
+            value (str): The timestamp to check.
+            start (str | None): The inclusive lower bound.
+            end (str | None): The exclusive upper bound.
+
+        Returns:
+            bool: True if the value lies in the range.
+    """
+
+    return (start is None or value >= start) and (end is None or value < end);
@@ -0,0 +1,140 @@
+import Bank_History as bh
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+
+def create_mock_account():
+    return {
+        "first_name": "Alice",
+        "last_name": "Smith",
+        "id_number": "123456789",
+        "balance_cents": 250000,
+        "transactions_to_execute": [],
+        "transaction_history": [
+            ("2024-01-01 10:00:00", "2024-01-02 10:00:00", 1001, 1002, 100.00, "2024-01-02 10:00:01"),
+            ("2024-03-01 10:00:00", "2024-03-02 10:00:00", 1001, 1002, 200.00, "2024-03-02 10:00:01"),
+            ("2024-08-01 10:00:00", "2024-08-01 11:00:00", 1001, 1002, 300.00, "2024-08-01 11:00:01")
+        ]
+    };
+
+
+# Tests for archive_history function
+
+
+def test_archive_history_moves_old_rows_to_segment(tmp_path):
+    # Arrange
+    account: dict[str, any] = create_mock_account();
+
+    # Act
+    summary: dict[str, any] = bh.archive_history(1001, account, str(tmp_path), "2024-06-01 00:00:00");
+
+    # Assert
+    assert summary["count"] == 2;
+    assert summary["total"] == 300.00;
+    assert summary["first_created"] == "2024-01-01 10:00:00";
+    assert summary["last_executed"] == "2024-03-02 10:00:01";
+    assert account["history_segments"] == [summary];
+    assert [row[4] for row in account["transaction_history"]] == [300.00];
+    assert [row[4] for row in bh.load_segment(summary["path"])] == [100.00, 200.00];
+
+
+def test_archive_history_nothing_to_archive(tmp_path):
+    # Arrange
+    account: dict[str, any] = create_mock_account();
+
+    # Act
+    summary: any = bh.archive_history(1001, account, str(tmp_path), "2023-01-01 00:00:00");
+
+    # Assert
+    assert summary is None;
+    assert "history_segments" not in account;
+    assert len(account["transaction_history"]) == 3;
+
+
+def test_archive_all_uses_age(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = {1001: create_mock_account()};
+
+    # Act
+    archived: int = bh.archive_all(accounts, str(tmp_path / "segments"), timedelta(days=30),
+                                   now=datetime(2024, 8, 15));
+
+    # Assert
+    assert archived == 2;
+    assert len(accounts[1001]["transaction_history"]) == 1;
+
+
+# Tests for iter_history function
+
+
+def test_iter_history_reads_all_tiers_in_order(tmp_path):
+    # Arrange
+    account: dict[str, any] = create_mock_account();
+    bh.archive_history(1001, account, str(tmp_path), "2024-06-01 00:00:00");
+
+    # Act
+    rows: list[tuple] = list(bh.iter_history(account));
+
+    # Assert
+    assert rows == create_mock_account()["transaction_history"];
+
+
+def test_iter_history_skips_segments_outside_range(tmp_path):
+    # Arrange
+    account: dict[str, any] = create_mock_account();
+    bh.archive_history(1001, account, str(tmp_path), "2024-06-01 00:00:00");
+
+    # Act
+    with patch('Bank_History.load_segment') as mock_load_segment:
+        rows: list[tuple] = list(bh.iter_history(account, "2024-08-01", "2024-08-02"));
+
+    # Assert
+    assert not mock_load_segment.called;
+    assert [row[4] for row in rows] == [300.00];
+
+
+def test_iter_history_by_execution_time(tmp_path):
+    # Arrange
+    account: dict[str, any] = create_mock_account();
+    bh.archive_history(1001, account, str(tmp_path), "2024-06-01 00:00:00");
+
+    # Act
+    rows: list[tuple] = list(bh.iter_history(account, "2024-03-02", "2024-03-03", field=bh.EXECUTION_TIME));
+
+    # Assert
+    assert [row[4] for row in rows] == [200.00];
+
+
+# Tests for history_between function and HistoryRange class
+
+
+def test_history_between_finds_range_without_copying():
+    # Arrange
+    account: dict[str, any] = create_mock_account();
+    history: list[tuple] = account["transaction_history"];
+
+    # Act
+    view: bh.HistoryRange = bh.history_between(history, "2024-03-01", "2024-09-01");
+    history.append(("2024-09-01 10:00:00", "2024-09-01 11:00:00", 1001, 1002, 400.00, "2024-09-01 11:00:01"));
+
+    # Assert
+    assert (view.start, view.stop) == (1, 3);
+    assert view.rows is history;
+    assert [row[4] for row in view] == [200.00, 300.00];
+    assert view[-1][4] == 300.00;
+    assert [row[4] for row in view[1:]] == [300.00];
+
+
+def test_history_between_open_bounds():
+    # Arrange
+    history: list[tuple] = create_mock_account()["transaction_history"];
+
+    # Act
+    before: bh.HistoryRange = bh.history_between(history, end="2024-03-02 10:00:01");
+    after: bh.HistoryRange = bh.history_between(history, start="2024-03-02 10:00:01");
+    empty: bh.HistoryRange = bh.history_between(history, "2025-01-01", "2024-01-01");
+
+    # Assert
+    assert len(before) == 1;
+    assert len(after) == 2;
+    assert len(empty) == 0;
@@ -0,0 +1,123 @@
+import sys
+
+import Bank_Accounts as bk
+
+
+# Function to pack an ID number into an integer
+def pack_id_number(id_number: str) -> int | str:
+    """
+        Packs an ID number of ASCII digits into an integer. A leading 1 keeps leading zeros apart, so '012' and '12'
+        get different integers. Other Unicode digits, such as '²' or '١٢٣', are kept as text: int() rejects some of
+        them and would map others onto the ASCII ID number with the same value.
+
+        Args:
+            id_number (str): The ID number.
+
+        Returns:
+            int | str: The packed ID number, or the ID number itself if it is not numeric.
+    """
+
+    return int("1" + id_number) if id_number.isascii() and id_number.isdecimal() else id_number;
+
+
+class IdentityTable:
+    """
+        A dictionary encoding of the identity fields of the accounts.
+
+        Every distinct name is stored once, interned, and gets an integer code; the account dicts keep their
+        string fields for compatibility, but they share the interned name objects. Accounts are indexed by the
+        code of their first name and by their packed ID number, so report 3 is one integer-keyed lookup and
+        report 4 scans the distinct first names instead of every account.
+
+        Register record as an event listener of Bank_Accounts to index accounts as they are opened.
+    """
+
+    def __init__(self, accounts: dict[int, dict[str, any]]) -> None:
+        """
+            Args:
+                accounts (dict): The dictionary containing all accounts. Its accounts are indexed at once.
+        """
+
+        self.accounts: dict[int, dict[str, any]] = accounts;
+        self.names: list[str] = [];
+        self.codes: dict[str, int] = {};
+        self.by_first_name: dict[int, list[int]] = {};
+        self.by_id_number: dict[int | str, list[int]] = {};
+        for account_number, account in list(accounts.items()):
+            self.add(account_number, account);
+
+    def encode(self, name: str) -> int:
+        """
+            Args:
+                name (str): A first or last name.
+
+            Returns:
+                int: The code of the name, assigned when the name is first seen.
+        """
+
+        code: int | None = self.codes.get(name);
+        if code is None:
+            code = self.codes[name] = len(self.names);
+            self.names.append(sys.intern(name));
+        return code;
+
+    def add(self, account_number: int, account: dict[str, any]) -> None:
+        """
+            Indexes an account and makes its name fields share the interned names of the table.
+
+            Args:
+                account_number (int): The account number.
+                account (dict): The account details.
+        """
+
+        first_code: int = self.encode(account["first_name"]);
+        last_code: int = self.encode(account["last_name"]);
+        account["first_name"] = self.names[first_code];
+        account["last_name"] = self.names[last_code];
+        self.by_first_name.setdefault(first_code, []).append(account_number);
+        self.by_id_number.setdefault(pack_id_number(account["id_number"]), []).append(account_number);
+
+    def record(self, accounts: dict[int, dict[str, any]], event: dict[str, any]) -> None:
+        # Event listener that indexes the accounts opened in the table's store
+        if accounts is self.accounts and event["type"] == "account_open":
+            self.add(event["account_number"], accounts[event["account_number"]]);
+
+    def find_by_id_number(self, id_number: str) -> list[int]:
+        """
+            Args:
+                id_number (str): The ID number.
+
+            Returns:
+                list[int]: The account numbers of the ID number, in the order the accounts were indexed.
+        """
+
+        return list(self.by_id_number.get(pack_id_number(id_number), []));
+
+    def find_by_first_name(self, part: str) -> list[int]:
+        """
+            Args:
+                part (str): A part of the first name, matched without regard to case.
+
+            Returns:
+                list[int]: The account numbers whose first name contains the part, in account number order.
+        """
+
+        part = part.lower();
+        return sorted(account_number for code, name in enumerate(self.names) if part in name.lower()
+                      for account_number in self.by_first_name.get(code, []));
+
+
+# Function to build the identity table of the accounts and keep it up to date
+def build_identity_table(accounts: dict[int, dict[str, any]]) -> IdentityTable:
+    """
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+
+        Returns:
+            IdentityTable: The table, registered as an event listener so accounts opened later are indexed too.
+    """
+
+    with bk.settlement_lock:
+        identities: IdentityTable = IdentityTable(accounts);
+        bk.event_listeners.append(identities.record);
+    return identities;
@@ -0,0 +1,131 @@
+from unittest.mock import patch
+
+import Bank_Accounts as bk
+import Bank_Identity as bid
+
+
+def create_mock_accounts():
+    return {
+        1001: {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "id_number": "012345678",
+            "balance_cents": 250000,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        },
+        1002: {
+            "first_name": "".join(["Ali", "ce"]),
+            "last_name": "Johnson",
+            "id_number": "12345678",
+            "balance_cents": 150000,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        },
+        1003: {
+            "first_name": "Bob",
+            "last_name": "".join(["Smi", "th"]),
+            "id_number": "A1234",
+            "balance_cents": 10000,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+    };
+
+
+# Tests for pack_id_number function
+
+
+def test_pack_id_number_keeps_leading_zeros_apart():
+    # Act
+    packed: list = [bid.pack_id_number(id_number) for id_number in ["012345678", "12345678", "A1234"]];
+
+    # Assert
+    assert packed == [1012345678, 112345678, "A1234"];
+
+
+def test_pack_id_number_keeps_non_ascii_digits_as_text():
+    # Act
+    packed: list = [bid.pack_id_number(id_number) for id_number in ["\u00b2", "\u0661\u0662\u0663", "123"]];
+
+    # Assert
+    assert packed == ["\u00b2", "\u0661\u0662\u0663", 1123];
+
+
+# Tests for IdentityTable class
+
+
+def test_identity_table_shares_interned_names():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+
+    # Act
+    identities: bid.IdentityTable = bid.IdentityTable(accounts);
+
+    # Assert
+    assert identities.names == ["Alice", "Smith", "Johnson", "Bob"];
+    assert accounts[1001]["first_name"] is accounts[1002]["first_name"];
+    assert accounts[1001]["last_name"] is accounts[1003]["last_name"];
+
+
+def test_identity_table_lookups():
+    # Arrange
+    identities: bid.IdentityTable = bid.IdentityTable(create_mock_accounts());
+
+    # Act
+    by_id: list[int] = identities.find_by_id_number("12345678");
+    by_name: list[int] = identities.find_by_first_name("LIC");
+    missing: list[int] = identities.find_by_id_number("999");
+
+    # Assert
+    assert (by_id, by_name, missing) == ([1002], [1001, 1002], []);
+
+
+def test_identity_table_indexes_opened_accounts():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    identities: bid.IdentityTable = bid.build_identity_table(accounts);
+
+    # Act
+    try:
+        bk.create_account(accounts, 1004, "Bob", "Brown", "555555555", 10.00);
+        bk.create_account(create_mock_accounts(), 1004, "Carol", "Brown", "555555555", 10.00);
+    finally:
+        bk.event_listeners.remove(identities.record);
+
+    # Assert
+    assert identities.find_by_id_number("555555555") == [1004];
+    assert identities.find_by_first_name("bob") == [1003, 1004];
+    assert "Carol" not in identities.codes;
+
+
+def test_identity_table_indexes_non_ascii_id_number():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    identities: bid.IdentityTable = bid.build_identity_table(accounts);
+
+    # Act
+    try:
+        bk.create_account(accounts, 1004, "Dana", "White", "\u00b2", 10.00);
+    finally:
+        bk.event_listeners.remove(identities.record);
+
+    # Assert
+    assert identities.find_by_id_number("\u00b2") == [1004];
+
+
+@patch('builtins.input', side_effect=["3", "12345678", "4", "bob", "10"])
+@patch('builtins.print')
+def test_reports_use_identity_table(mock_print, mock_input):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    identities: bid.IdentityTable = bid.IdentityTable(accounts);
+
+    # Act
+    bk.reports_interface(accounts, identities);
+
+    # Assert
+    printed: list[str] = [str(c) for c in mock_print.call_args_list];
+    assert any("Account 1002 details" in line for line in printed);
+    assert any("Account 1003 details" in line for line in printed);
+    assert not any("Account 1001 details" in line for line in printed);
@@ -0,0 +1,143 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import Bank_Accounts as bk
+
+
+class IngestPipeline(threading.Thread):
+    """
+        A bounded ingest queue in front of the account store, drained by a single writer thread.
+
+        Producers submit transfers without touching the accounts. When the queue is full, submit returns None
+        instead of queueing without limit, so producers see backpressure at once and can retry or shed load. The
+        writer commits the queued submissions in batches, taking the settlement lock once per batch.
+    """
+
+    def __init__(self, accounts: dict[int, dict[str, any]], capacity: int = 10_000, batch_size: int = 256,
+                 dedup_index: bk.DedupIndex | None = None, scheduler: any = None) -> None:
+        """
+            Args:
+                accounts (dict): The dictionary containing all accounts.
+                capacity (int): The maximum number of queued submissions (default is 10,000).
+                batch_size (int): The maximum number of submissions committed under one lock (default is 256).
+                dedup_index (DedupIndex | None): The index that rejects repeated idempotency keys, or None for a
+                                                 new one (default is None).
+                scheduler (any): An optional background executor whose schedule method is called with every
+                                 committed transaction (default is None).
+        """
+
+        super().__init__(name="ingest-writer", daemon=True);
+        self.accounts: dict[int, dict[str, any]] = accounts;
+        self.queue: queue.Queue = queue.Queue(maxsize=capacity);
+        self.batch_size: int = batch_size;
+        self.dedup_index: bk.DedupIndex = dedup_index or bk.DedupIndex();
+        self.scheduler: any = scheduler;
+        self.stop_event: threading.Event = threading.Event();
+        self.submitted: int = 0;
+        self.rejected: int = 0;
+        self.committed: int = 0;
+        self.failed: int = 0;
+        self.batches: int = 0;
+        self.max_latency: float = 0.0;
+
+    def submit(self, transaction: tuple[str, str, int, int, float], idempotency_key: str | None = None,
+               timeout: float | None = 0.0) -> Future | None:
+        """
+            Queues a transfer for the writer.
+
+            Args:
+                transaction (tuple): The transaction to add.
+                idempotency_key (str | None): A client-supplied key identifying the submission (default is None).
+                timeout (float | None): How long to wait for room in a full queue; 0 does not wait and None waits
+                                        until there is room (default is 0).
+
+            Returns:
+                Future | None: A future that resolves to the transaction once it is committed, or to the
+                               ValueError that rejected it. None if the queue is full, which is the signal for
+                               the producer to back off.
+        """
+
+        future: Future = Future();
+        try:
+            self.queue.put((transaction, idempotency_key, future, time.monotonic()), timeout != 0, timeout);
+        except queue.Full:
+            self.rejected += 1;
+            return;
+        self.submitted += 1;
+        return future;
+
+    def commit_batch(self, first: tuple | None = None) -> int:
+        """
+            Commits up to batch_size queued submissions under one acquisition of the settlement lock.
+
+            Args:
+                first (tuple | None): A submission already taken from the queue (default is None).
+
+            Returns:
+                int: The number of submissions processed.
+        """
+
+        batch: list[tuple] = [] if first is None else [first];
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait());
+            except queue.Empty:
+                break;
+        if not batch:
+            return 0;
+
+        committed: list[tuple[str, str, int, int, float]] = [];
+        with bk.store_lock(self.accounts):
+            for transaction, idempotency_key, future, submitted_at in batch:
+                try:
+                    source, target, amount = transaction[2], transaction[3], transaction[4];
+                    bk.account_validation_check(str(source), self.accounts);
+                    bk.account_validation_check(str(target), self.accounts);
+                    bk.amount_validation_check(str(amount), source, self.accounts);
+                    bk.enqueue_transaction(self.accounts, transaction, idempotency_key, self.dedup_index);
+                except Exception as e:
+                    # Any failure is reported to its own submitter, so the writer keeps serving the rest of the batch
+                    self.failed += 1;
+                    future.set_exception(e);
+                    continue;
+                committed.append(transaction);
+                self.max_latency = max(self.max_latency, time.monotonic() - submitted_at);
+                future.set_result(transaction);
+
+        if self.scheduler is not None:
+            for transaction in committed:
+                self.scheduler.schedule(transaction);
+        self.committed += len(committed);
+        self.batches += 1;
+        return len(batch);
+
+    def metrics(self) -> dict[str, any]:
+        """
+            Returns:
+                dict: The queue depth and capacity, the submission counters, the mean batch size and the longest
+                      time a committed submission waited in the queue, in seconds.
+        """
+
+        processed: int = self.committed + self.failed;
+        return {"queued": self.queue.qsize(), "capacity": self.queue.maxsize, "submitted": self.submitted,
+                "rejected": self.rejected, "committed": self.committed, "failed": self.failed,
+                "mean_batch": processed / self.batches if self.batches else 0.0, "max_latency": self.max_latency};
+
+    def run(self) -> None:
+        while not self.stop_event.is_set() or not self.queue.empty():
+            try:
+                first: tuple = self.queue.get(timeout=0.1);
+            except queue.Empty:
+                continue;
+            self.commit_batch(first);
+
+    def stop(self) -> None:
+        """
+            Stops the writer after it has committed every queued submission, and waits for it to finish.
+        """
+
+        self.stop_event.set();
+        if self.is_alive():
+            self.join();
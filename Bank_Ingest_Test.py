@@ -0,0 +1,129 @@
+import pytest
+
+import Bank_Ingest as bip
+
+
+def create_mock_accounts():
+    return {
+        1001: {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "id_number": "123456789",
+            "balance_cents": 100000,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        },
+        1002: {
+            "first_name": "Bob",
+            "last_name": "Johnson",
+            "id_number": "987654321",
+            "balance_cents": 150000,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+    };
+
+
+def transfer(amount: float, source: int = 1001, target: int = 1002) -> tuple:
+    return "2024-08-01 10:00:00", "2030-01-01 10:00:00", source, target, amount;
+
+
+class RecordingScheduler:
+    def __init__(self) -> None:
+        self.scheduled: list = [];
+
+    def schedule(self, transaction: tuple) -> None:
+        self.scheduled.append(transaction);
+
+
+# Tests for IngestPipeline class
+
+
+def test_submit_signals_backpressure_when_full():
+    # Arrange
+    pipeline: bip.IngestPipeline = bip.IngestPipeline(create_mock_accounts(), capacity=2);
+
+    # Act
+    futures: list = [pipeline.submit(transfer(1.0)) for _ in range(3)];
+
+    # Assert
+    assert futures[0] is not None and futures[1] is not None;
+    assert futures[2] is None;
+    assert pipeline.metrics()["rejected"] == 1;
+    assert pipeline.metrics()["queued"] == 2;
+
+
+def test_commit_batch_commits_in_batches():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    scheduler: RecordingScheduler = RecordingScheduler();
+    pipeline: bip.IngestPipeline = bip.IngestPipeline(accounts, batch_size=4, scheduler=scheduler);
+    futures: list = [pipeline.submit(transfer(10.0 + i)) for i in range(10)];
+
+    # Act
+    sizes: list[int] = [pipeline.commit_batch() for _ in range(4)];
+
+    # Assert
+    assert sizes == [4, 4, 2, 0];
+    assert [future.result() for future in futures] == [transfer(10.0 + i) for i in range(10)];
+    assert accounts[1001]["transactions_to_execute"] == [transfer(10.0 + i) for i in range(10)];
+    assert scheduler.scheduled == accounts[1001]["transactions_to_execute"];
+    assert pipeline.metrics()["mean_batch"] == 10 / 3;
+
+
+def test_commit_batch_rejects_invalid_submissions():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    pipeline: bip.IngestPipeline = bip.IngestPipeline(accounts);
+    accepted = pipeline.submit(transfer(600.0), idempotency_key="a");
+    overdrawn = pipeline.submit(transfer(600.0), idempotency_key="b");
+    duplicate = pipeline.submit(transfer(1.0), idempotency_key="a");
+    missing = pipeline.submit(transfer(1.0, target=9999));
+
+    # Act
+    pipeline.commit_batch();
+
+    # Assert
+    assert accepted.result() == transfer(600.0);
+    with pytest.raises(ValueError) as ex:
+        overdrawn.result();
+    assert str(ex.value) == "The amount exceeds the available balance. You can transfer up to 400.00.";
+    with pytest.raises(ValueError) as ex:
+        duplicate.result();
+    assert str(ex.value) == "Duplicate submission: idempotency key 'a' was already used.";
+    with pytest.raises(ValueError):
+        missing.result();
+    assert accounts[1001]["transactions_to_execute"] == [transfer(600.0)];
+    assert pipeline.metrics()["failed"] == 3;
+
+
+def test_commit_batch_reports_unexpected_errors_to_submitter():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    pipeline: bip.IngestPipeline = bip.IngestPipeline(accounts);
+    malformed = pipeline.submit(("2024-08-01 10:00:00",));
+    accepted = pipeline.submit(transfer(5.0));
+
+    # Act
+    pipeline.commit_batch();
+
+    # Assert
+    with pytest.raises(IndexError):
+        malformed.result(timeout=0);
+    assert accepted.result(timeout=0) == transfer(5.0);
+    assert pipeline.metrics()["failed"] == 1;
+
+def test_writer_thread_commits_queue_before_stopping():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    pipeline: bip.IngestPipeline = bip.IngestPipeline(accounts, capacity=100, batch_size=8);
+    pipeline.start();
+
+    # Act
+    futures: list = [pipeline.submit(transfer(1.0), timeout=None) for _ in range(50)];
+    pipeline.stop();
+
+    # Assert
+    assert all(future.done() for future in futures);
+    assert len(accounts[1001]["transactions_to_execute"]) == 50;
+    assert pipeline.metrics()["committed"] == 50;
@@ -0,0 +1,427 @@
+import hashlib
+import json
+from array import array
+from itertools import islice
+from typing import Iterable, Iterator
+
+import Bank_Accounts as bk
+import Bank_History as bh
+
+try:
+    import numpy as np
+except ImportError:
+    # Without numpy the same array arithmetic runs as a Python loop
+    np = None;
+
+# Number of history rows replayed per vectorized chunk, which bounds the memory of a reconciliation
+CHUNK_ROWS: int = 1 << 20;
+
+
+# Function to take the opening snapshot a reconciliation starts from
+def take_snapshot(accounts: dict[int, dict[str, any]]) -> dict[str, any]:
+    """
+        Records every balance together with the number of history rows it already includes.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+
+        Returns:
+            dict: The snapshot, with 'balances' in cents and 'history_counts' keyed by account number.
+    """
+
+    with bk.settlement_lock:
+        return {
+            "balances": {account_number: account["balance_cents"] for account_number, account in accounts.items()},
+            "history_counts": {account_number: history_count(account) for account_number, account in accounts.items()}
+        };
+
+
+# Function to count the history rows of an account, archived segments included
+def history_count(account: dict[str, any]) -> int:
+    """
+        Args:
+            account (dict): The account details.
+
+        Returns:
+            int: The number of history rows.
+    """
+
+    return sum(summary["count"] for summary in account.get("history_segments", [])) + \
+        len(account["transaction_history"]);
+
+
+# Function to save a snapshot to a JSON file
+def save_snapshot(snapshot: dict[str, any], path: str) -> None:
+    """
+        Args:
+            snapshot (dict): The snapshot taken by take_snapshot.
+            path (str): The file to write.
+    """
+
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(snapshot, output);
+
+
+# Function to load a snapshot from a JSON file
+def load_snapshot(path: str) -> dict[str, any]:
+    """
+        Args:
+            path (str): The file written by save_snapshot.
+
+        Returns:
+            dict: The snapshot, keyed by integer account numbers again.
+    """
+
+    with open(path, encoding="utf-8") as source:
+        snapshot: dict[str, any] = json.load(source);
+    return {key: {int(account_number): value for account_number, value in values.items()}
+            for key, values in snapshot.items()};
+
+
+# Function to stream the history rows executed after a snapshot
+def rows_after_snapshot(accounts: dict[int, dict[str, any]],
+                        snapshot: dict[str, any]) -> Iterator[tuple[str, str, int, int, float, str]]:
+    """
+        Yields every history row that is not yet included in the snapshot balances. History is append-only per
+        source account, so these are the rows after the first history_counts rows of each account.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            snapshot (dict): The opening snapshot.
+
+        Returns:
+            Iterator: The history rows.
+    """
+
+    for account_number, account in accounts.items():
+        yield from islice(bh.iter_history(account), snapshot["history_counts"].get(account_number, 0), None);
+
+
+# Function to apply one chunk of transfers to the rebuilt balances
+def apply_chunk(balances: any, sources: array, targets: array, amounts: array) -> None:
+    """
+        Subtracts every amount from its source position and adds it to its target position.
+
+        Args:
+            balances (any): The rebuilt balances in cents, a numpy int64 array or an array('q').
+            sources (array): The positions of the source accounts.
+            targets (array): The positions of the target accounts.
+            amounts (array): The amounts in cents.
+    """
+
+    if np is not None:
+        amount_values = np.frombuffer(amounts, dtype=np.int64);
+        np.subtract.at(balances, np.frombuffer(sources, dtype=np.int64), amount_values);
+        np.add.at(balances, np.frombuffer(targets, dtype=np.int64), amount_values);
+        return;
+    for source, target, amount in zip(sources, targets, amounts):
+        balances[source] -= amount;
+        balances[target] += amount;
+
+
+# Function to rebuild every balance from a snapshot and the history, and compare it with the live balances
+def reconcile(accounts: dict[int, dict[str, any]], snapshot: dict[str, any],
+              chunk_rows: int = CHUNK_ROWS) -> list[tuple[int, float | None, float | None]]:
+    """
+        Replays the history executed after the snapshot onto the snapshot balances in chunks of int64 cents, then
+        reports every account whose rebuilt balance differs from its live balance.
+
+        Accounts opened after the snapshot are replayed from the opening balance create_account recorded for
+        them. Memory is bounded by one chunk of rows plus one balance per account.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            snapshot (dict): The opening snapshot taken by take_snapshot.
+            chunk_rows (int): The number of rows replayed per chunk (default is CHUNK_ROWS).
+
+        Returns:
+            list: (account_number, rebuilt_balance, live_balance) for every mismatch. The rebuilt balance is None
+                  for accounts that only appear in the history and the live balance is None for accounts that no
+                  longer exist.
+    """
+
+    account_numbers: list[int] = sorted(set(accounts) | set(snapshot["balances"]));
+    positions: dict[int, int] = {account_number: position for position, account_number in enumerate(account_numbers)};
+    opening: list[int] = [snapshot["balances"][account_number] if account_number in snapshot["balances"]
+                          else accounts[account_number].get("opening_balance_cents", 0)
+                          for account_number in account_numbers];
+    balances: any = np.array(opening, dtype=np.int64) if np is not None else array("q", opening);
+    unknown: set[int] = set();
+
+    rows: Iterable[tuple[str, str, int, int, float, str]] = rows_after_snapshot(accounts, snapshot);
+    while True:
+        sources: array = array("q");
+        targets: array = array("q");
+        amounts: array = array("q");
+        read: int = 0;
+        for row in islice(rows, chunk_rows):
+            read += 1;
+            _, _, source, target, amount, _ = row;
+            for account_number in (source, target):
+                if account_number not in positions:
+                    unknown.add(account_number);
+            if source in positions and target in positions:
+                sources.append(positions[source]);
+                targets.append(positions[target]);
+                amounts.append(bk.to_cents(amount));
+        if read == 0:
+            break;
+        apply_chunk(balances, sources, targets, amounts);
+
+    mismatches: list[tuple[int, float | None, float | None]] = [];
+    for account_number in account_numbers:
+        rebuilt: int = int(balances[positions[account_number]]);
+        live: int | None = accounts[account_number]["balance_cents"] if account_number in accounts else None;
+        if live is None or live != rebuilt:
+            mismatches.append((account_number, bk.from_cents(rebuilt), None if live is None else bk.from_cents(live)));
+    mismatches.extend((account_number, None, None) for account_number in sorted(unknown));
+    return mismatches;
+
+
+# Merkle trees kept up to date with their account stores by maintain_merkle_tree
+maintained_trees: list["MerkleTree"] = [];
+
+
+class MerkleTree:
+    """
+        A Merkle tree over the account checksums, with one leaf per account in account number order.
+
+        Changing one account's checksum rehashes only its path to the root, and two trees over the same accounts
+        find their differing accounts by descending only into subtrees whose hashes differ. A tree built for a
+        store by maintain_merkle_tree follows every checksum change of the store through its record listener.
+    """
+
+    # The account store a maintained tree follows
+    accounts: dict[int, dict[str, any]] | None = None;
+
+    def __init__(self, account_numbers: list[int], checksums: list[str]) -> None:
+        """
+            Args:
+                account_numbers (list[int]): The account numbers of the leaves, sorted.
+                checksums (list[str]): The checksum of every leaf account.
+        """
+
+        self.account_numbers: list[int] = account_numbers;
+        self.positions: dict[int, int] = {account_number: position
+                                          for position, account_number in enumerate(account_numbers)};
+        self.levels: list[list[str]] = [list(checksums)];
+        while len(self.levels[-1]) > 1:
+            below: list[str] = self.levels[-1];
+            self.levels.append([hash_pair(below[i], below[i + 1] if i + 1 < len(below) else "")
+                                for i in range(0, len(below), 2)]);
+
+    def root(self) -> str:
+        """
+            Returns:
+                str: The root hash, or an empty string for a tree without accounts.
+        """
+
+        return self.levels[-1][0] if self.levels[-1] else "";
+
+    def update(self, account_number: int, checksum: str) -> None:
+        """
+            Replaces the checksum of one account and rehashes its path to the root in O(log n).
+
+            Args:
+                account_number (int): The account number of the leaf.
+                checksum (str): The new checksum.
+        """
+
+        position: int = self.positions[account_number];
+        self.levels[0][position] = checksum;
+        for level in range(1, len(self.levels)):
+            below: list[str] = self.levels[level - 1];
+            left: int = position - position % 2;
+            position //= 2;
+            self.levels[level][position] = hash_pair(below[left], below[left + 1] if left + 1 < len(below) else "");
+
+    def append(self, account_number: int, checksum: str) -> None:
+        """
+            Adds a leaf for a newly opened account and hashes its path to the root in O(log n).
+
+            Args:
+                account_number (int): The account number, greater than every account number in the tree.
+                checksum (str): The checksum of the account.
+
+            Raises:
+                ValueError: If the account number would break the account number order.
+        """
+
+        if self.account_numbers and account_number <= self.account_numbers[-1]:
+            raise ValueError("New leaves must have the largest account number.");
+        self.positions[account_number] = len(self.account_numbers);
+        self.account_numbers.append(account_number);
+        self.levels[0].append(checksum);
+        position: int = len(self.levels[0]) - 1;
+        level: int = 0;
+        while len(self.levels[level]) > 1:
+            below: list[str] = self.levels[level];
+            left: int = position - position % 2;
+            position //= 2;
+            parent: str = hash_pair(below[left], below[left + 1] if left + 1 < len(below) else "");
+            if level + 1 == len(self.levels):
+                self.levels.append([]);
+            above: list[str] = self.levels[level + 1];
+            if position < len(above):
+                above[position] = parent;
+            else:
+                above.append(parent);
+            level += 1;
+
+    def record(self, accounts: dict[int, dict[str, any]], account_number: int, checksum: str | None) -> None:
+        # Checksum listener that updates the leaf of a changed account of the tree's store, or adds a new account
+        if accounts is not self.accounts:
+            return;
+        if account_number in self.positions:
+            self.update(account_number, checksum or "");
+        elif not self.account_numbers or account_number > self.account_numbers[-1]:
+            self.append(account_number, checksum or "");
+        else:
+            # An account opened below the largest account number shifts the leaves, so the tree is rebuilt
+            rebuilt: MerkleTree = build_merkle_tree(accounts);
+            self.account_numbers, self.positions, self.levels = \
+                rebuilt.account_numbers, rebuilt.positions, rebuilt.levels;
+
+
+# Function to hash two child hashes into their parent hash
+def hash_pair(left: str, right: str) -> str:
+    """
+        Args:
+            left (str): The left child hash.
+            right (str): The right child hash, empty if there is none.
+
+        Returns:
+            str: The parent hash.
+    """
+
+    return hashlib.blake2b(f"{left}|{right}".encode("utf-8"), digest_size=16).hexdigest();
+
+
+# Function to build the Merkle tree of the accounts
+def build_merkle_tree(accounts: dict[int, dict[str, any]], account_numbers: list[int] | None = None) -> MerkleTree:
+    """
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            account_numbers (list[int] | None): The leaf account numbers, or None for the sorted account numbers.
+                                                Account numbers missing from the accounts get an empty leaf.
+
+        Returns:
+            MerkleTree: The tree over the account checksums.
+    """
+
+    account_numbers = sorted(accounts) if account_numbers is None else account_numbers;
+    return MerkleTree(account_numbers, [bk.account_checksum(n, accounts[n]) if n in accounts else ""
+                                        for n in account_numbers]);
+
+
+# Function to build the Merkle tree of an account store and keep it up to date
+def maintain_merkle_tree(accounts: dict[int, dict[str, any]]) -> MerkleTree:
+    """
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+
+        Returns:
+            MerkleTree: The store's maintained tree, built and registered as a checksum listener on the first call.
+    """
+
+    with bk.settlement_lock:
+        tree: MerkleTree | None = find_merkle_tree(accounts);
+        if tree is not None:
+            return tree;
+        tree = build_merkle_tree(accounts);
+        tree.accounts = accounts;
+        maintained_trees.append(tree);
+        bk.checksum_listeners.append(tree.record);
+    return tree;
+
+
+# Function to find the maintained Merkle tree of an account store
+def find_merkle_tree(accounts: dict[int, dict[str, any]]) -> MerkleTree | None:
+    """
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+
+        Returns:
+            MerkleTree | None: The store's maintained tree, or None if its tree is not maintained.
+    """
+
+    for tree in maintained_trees:
+        if tree.accounts is accounts:
+            return tree;
+    return;
+
+
+# Function to stop maintaining the Merkle tree of an account store
+def release_merkle_tree(accounts: dict[int, dict[str, any]]) -> None:
+    """
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+    """
+
+    with bk.settlement_lock:
+        for tree in [tree for tree in maintained_trees if tree.accounts is accounts]:
+            maintained_trees.remove(tree);
+            bk.checksum_listeners.remove(tree.record);
+
+
+# Function to find the accounts whose checksums differ between two trees
+def diff_trees(first: MerkleTree, second: MerkleTree) -> tuple[list[int], int]:
+    """
+        Descends from the roots into the subtrees whose hashes differ. Finding d differing accounts takes
+        O(d log n) hash comparisons.
+
+        Args:
+            first (MerkleTree): The first tree.
+            second (MerkleTree): The second tree.
+
+        Returns:
+            tuple: The differing account numbers and the number of hash comparisons made.
+
+        Raises:
+            ValueError: If the trees cover different accounts.
+    """
+
+    if first.account_numbers != second.account_numbers:
+        raise ValueError("The trees cover different accounts.");
+    if not first.account_numbers:
+        return [], 0;
+
+    differing: list[int] = [];
+    comparisons: int = 0;
+    stack: list[tuple[int, int]] = [(len(first.levels) - 1, 0)];
+    while stack:
+        level, position = stack.pop();
+        comparisons += 1;
+        if first.levels[level][position] == second.levels[level][position]:
+            continue;
+        if level == 0:
+            differing.append(first.account_numbers[position]);
+            continue;
+        for child in (2 * position + 1, 2 * position):
+            if child < len(first.levels[level - 1]):
+                stack.append((level - 1, child));
+    return differing, comparisons;
+
+
+# Function to find the accounts that differ between two copies of the account store
+def diff_stores(first: dict[int, dict[str, any]], second: dict[int, dict[str, any]]) -> list[int]:
+    """
+        Diffs the maintained trees of the two copies (see maintain_merkle_tree) in O(d log n) for d differing
+        accounts. A tree is built for the comparison only for a copy without a maintained tree, or over the union
+        of the accounts when the copies hold different account numbers.
+
+        Args:
+            first (dict): The first copy, for example the primary.
+            second (dict): The second copy, for example a backup.
+
+        Returns:
+            list[int]: The account numbers whose checksums differ or that exist in only one copy.
+    """
+
+    with bk.settlement_lock:
+        first_tree: MerkleTree = find_merkle_tree(first) or build_merkle_tree(first);
+        second_tree: MerkleTree = find_merkle_tree(second) or build_merkle_tree(second);
+        if first_tree.account_numbers == second_tree.account_numbers:
+            return diff_trees(first_tree, second_tree)[0];
+        account_numbers: list[int] = sorted(set(first) | set(second));
+        return diff_trees(build_merkle_tree(first, account_numbers), build_merkle_tree(second, account_numbers))[0];
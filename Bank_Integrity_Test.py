@@ -0,0 +1,237 @@
+import Bank_Accounts as bk
+import Bank_Integrity as bi
+
+
+def create_mock_accounts():
+    return {
+        1001: {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "id_number": "123456789",
+            "balance_cents": 250010,
+            "transactions_to_execute": [],
+            "transaction_history": [
+                ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 100.00, "2024-08-01 10:00:01")
+            ]
+        },
+        1002: {
+            "first_name": "Bob",
+            "last_name": "Johnson",
+            "id_number": "987654321",
+            "balance_cents": 150020,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        },
+        1003: {
+            "first_name": "Charlie",
+            "last_name": "Brown",
+            "id_number": "555555555",
+            "balance_cents": 350075,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+    };
+
+
+def settle(accounts: dict[int, dict[str, any]], source: int, target: int, amount: float) -> None:
+    transaction: tuple = ("2024-08-02 10:00:00", "2024-08-02 10:00:00", source, target, amount);
+    bk.enqueue_transaction(accounts, transaction);
+    bk.settle_transaction(accounts, transaction, "2024-08-02 10:00:01");
+
+
+# Tests for reconcile function
+
+
+def test_reconcile_consistent_store():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    snapshot: dict[str, any] = bi.take_snapshot(accounts);
+    for _ in range(10):
+        settle(accounts, 1001, 1002, 0.10);
+        settle(accounts, 1003, 1001, 0.20);
+
+    # Act
+    mismatches: list = bi.reconcile(accounts, snapshot, chunk_rows=3);
+
+    # Assert
+    assert mismatches == [];
+
+
+def test_reconcile_reports_mismatch():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    snapshot: dict[str, any] = bi.take_snapshot(accounts);
+    settle(accounts, 1001, 1002, 50.00);
+    accounts[1002]["balance_cents"] += 100;
+
+    # Act
+    mismatches: list = bi.reconcile(accounts, snapshot);
+
+    # Assert
+    assert mismatches == [(1002, 1550.20, 1551.20)];
+
+
+def test_reconcile_unknown_account_in_history():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    snapshot: dict[str, any] = bi.take_snapshot(accounts);
+    accounts[1003]["transaction_history"].append(
+        ("2024-08-02 10:00:00", "2024-08-02 10:00:00", 1003, 9999, 5.00, "2024-08-02 10:00:01"));
+
+    # Act
+    mismatches: list = bi.reconcile(accounts, snapshot);
+
+    # Assert
+    assert mismatches == [(9999, None, None)];
+
+
+def test_reconcile_account_opened_after_snapshot():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    snapshot: dict[str, any] = bi.take_snapshot(accounts);
+    bk.create_account(accounts, 1004, "Dana", "White", "444444444", 100.00);
+    settle(accounts, 1004, 1001, 30.00);
+
+    # Act
+    mismatches: list = bi.reconcile(accounts, snapshot);
+
+    # Assert
+    assert mismatches == [];
+
+
+def test_snapshot_round_trip(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    snapshot: dict[str, any] = bi.take_snapshot(accounts);
+    path: str = str(tmp_path / "snapshot.json");
+
+    # Act
+    bi.save_snapshot(snapshot, path);
+    loaded: dict[str, any] = bi.load_snapshot(path);
+
+    # Assert
+    assert loaded == snapshot;
+    assert loaded["history_counts"] == {1001: 1, 1002: 0, 1003: 0};
+
+
+# Tests for account checksums and Merkle trees
+
+
+def test_account_checksum_depends_on_state_not_on_path():
+    # Arrange
+    primary: dict[int, dict[str, any]] = create_mock_accounts();
+    backup: dict[int, dict[str, any]] = create_mock_accounts();
+    bk.account_checksum(1001, primary[1001]);
+
+    # Act
+    settle(primary, 1001, 1002, 10.00);
+    settle(backup, 1001, 1002, 10.00);
+
+    # Assert
+    assert primary[1001]["checksum"] == bk.account_checksum(1001, backup[1001]);
+    assert primary[1002]["checksum"] == bk.account_checksum(1002, backup[1002]);
+
+
+def test_merkle_tree_update_matches_rebuild():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    tree: bi.MerkleTree = bi.build_merkle_tree(accounts);
+
+    # Act
+    settle(accounts, 1003, 1001, 10.00);
+    tree.update(1003, accounts[1003]["checksum"]);
+    tree.update(1001, accounts[1001]["checksum"]);
+
+    # Assert
+    assert tree.root() == bi.build_merkle_tree(accounts).root();
+
+
+def test_merkle_tree_append_matches_rebuild():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    tree: bi.MerkleTree = bi.build_merkle_tree({1001: accounts[1001]});
+
+    # Act
+    tree.append(1002, bk.account_checksum(1002, accounts[1002]));
+    tree.append(1003, bk.account_checksum(1003, accounts[1003]));
+
+    # Assert
+    assert tree.root() == bi.build_merkle_tree(accounts).root();
+
+
+def test_diff_trees_locates_differing_account():
+    # Arrange
+    primary: dict[int, dict[str, any]] = {
+        n: {"first_name": "Alice", "last_name": "Smith", "id_number": str(n), "balance_cents": 10000,
+            "transactions_to_execute": [], "transaction_history": []} for n in range(1000, 1064)
+    };
+    backup: dict[int, dict[str, any]] = {
+        n: {"first_name": "Alice", "last_name": "Smith", "id_number": str(n), "balance_cents": 10000,
+            "transactions_to_execute": [], "transaction_history": []} for n in range(1000, 1064)
+    };
+    backup[1037]["balance_cents"] = 9900;
+
+    # Act
+    differing, comparisons = bi.diff_trees(bi.build_merkle_tree(primary), bi.build_merkle_tree(backup));
+
+    # Assert
+    assert differing == [1037];
+    assert comparisons <= 2 * 7;
+
+
+def test_diff_stores_reports_missing_accounts():
+    # Arrange
+    primary: dict[int, dict[str, any]] = create_mock_accounts();
+    backup: dict[int, dict[str, any]] = create_mock_accounts();
+    del backup[1003];
+
+    # Act
+    differing: list[int] = bi.diff_stores(primary, backup);
+
+    # Assert
+    assert differing == [1003];
+
+
+def test_maintained_merkle_tree_follows_settlements_and_new_accounts():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    tree: bi.MerkleTree = bi.maintain_merkle_tree(accounts);
+
+    # Act
+    try:
+        settle(accounts, 1003, 1001, 10.00);
+        bk.create_account(accounts, 1004, "Dana", "White", "111111111", 50.00);
+        root: str = tree.root();
+    finally:
+        bi.release_merkle_tree(accounts);
+
+    # Assert
+    assert root == bi.build_merkle_tree(accounts).root();
+    assert tree.account_numbers == [1001, 1002, 1003, 1004];
+    assert bi.find_merkle_tree(accounts) is None;
+
+
+def test_maintained_merkle_tree_rolls_back_with_failed_batch():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    tree: bi.MerkleTree = bi.maintain_merkle_tree(accounts);
+    root: str = tree.root();
+    valid: tuple = ("2024-08-02 10:00:00", "2024-08-02 10:00:00", 1001, 1002, 10.00);
+    invalid: tuple = ("2024-08-02 10:00:00", "2024-08-02 10:00:00", 1002, 9999, 5.00);
+    bk.enqueue_transaction(accounts, valid);
+    accounts[1002]["transactions_to_execute"].append(invalid);
+
+    # Act
+    try:
+        try:
+            bk.settle_batch(accounts, [valid, invalid], "2024-08-02 10:00:01");
+        except KeyError:
+            pass;
+        rolled_back_root: str = tree.root();
+    finally:
+        bi.release_merkle_tree(accounts);
+
+    # Assert
+    assert accounts[1001]["balance_cents"] == 250010;
+    assert rolled_back_root == root;
+    assert rolled_back_root == bi.build_merkle_tree(accounts).root();
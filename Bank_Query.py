@@ -0,0 +1,577 @@
+import heapq
+import operator
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+import Bank_Accounts as bk
+import Bank_History as bh
+
+# Comparison operators a predicate can use, besides 'prefix' and 'contains'
+OPERATORS: dict[str, Callable[[any, any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "prefix": lambda value, prefix: str(value).startswith(prefix),
+    "contains": lambda value, part: str(part).lower() in str(value).lower()
+};
+
+# Positions of the fields of a transaction history tuple
+HISTORY_FIELDS: dict[str, int] = {"created": 0, "due": 1, "source": 2, "target": 3, "amount": 4, "executed": 5};
+
+# Aggregate functions a query can apply to the values of one field
+AGGREGATES: dict[str, Callable[[list[any]], any]] = {
+    "count": len,
+    "sum": sum,
+    "min": lambda values: min(values, default=None),
+    "max": lambda values: max(values, default=None),
+    "avg": lambda values: sum(values) / len(values) if values else None
+};
+
+
+# Types of the account fields the range operators can compare, and of the keys of their sorted indexes
+ACCOUNT_FIELD_TYPES: dict[str, tuple[type, ...]] = {
+    "account_number": (int,),
+    "balance": (int, float),
+    "balance_cents": (int,),
+    "id_number": (str,),
+    "first_name": (str,),
+    "last_name": (str,)
+};
+
+# Operators that order their operands
+RANGE_OPERATORS: tuple[str, ...] = ("<", "<=", ">", ">=");
+
+
+class AccountIndexes:
+    """
+        Secondary indexes over the accounts that the query planner can use instead of a full scan.
+
+        Register record as a checksum listener of Bank_Accounts (build_indexes does this) to keep the indexes up
+        to date. Every change of an account's balance or identity changes its checksum, including settlements,
+        openings and replays that publish no event and the rollback of a failed batch, so record only notes the
+        changed account and refresh reindexes it once the change is complete, before the next query plan. Every
+        account the indexes return is checked again against the live accounts, and the planner does not use
+        indexes that miss accounts, so a query gives the same answer with or without them.
+    """
+
+    def __init__(self, accounts: dict[int, dict[str, any]]) -> None:
+        """
+            Args:
+                accounts (dict): The dictionary containing all accounts. Its accounts are indexed at once.
+        """
+
+        self.accounts: dict[int, dict[str, any]] = accounts;
+        self.by_id_number: dict[str, list[int]] = {};
+        for account_number, account in accounts.items():
+            self.by_id_number.setdefault(account["id_number"], []).append(account_number);
+        self.sorted_id_numbers: list[tuple[str, int]] = sorted((account["id_number"], account_number)
+                                                              for account_number, account in accounts.items());
+        self.balances: dict[int, float] = {account_number: bk.from_cents(account["balance_cents"])
+                                           for account_number, account in accounts.items()};
+        self.sorted_balances: list[tuple[float, int]] = sorted((balance, account_number)
+                                                               for account_number, balance in self.balances.items());
+        # Accounts whose checksum changed since the last refresh
+        self.changed: set[int] = set();
+
+    def add(self, account_number: int, account: dict[str, any]) -> None:
+        """
+            Args:
+                account_number (int): The account number of a new account.
+                account (dict): The account details.
+        """
+
+        self.by_id_number.setdefault(account["id_number"], []).append(account_number);
+        insort(self.sorted_id_numbers, (account["id_number"], account_number));
+        self.balances[account_number] = bk.from_cents(account["balance_cents"]);
+        insort(self.sorted_balances, (self.balances[account_number], account_number));
+
+    def update_balance(self, account_number: int) -> None:
+        """
+            Moves an account to its current balance in the balance index.
+
+            Args:
+                account_number (int): The account number.
+        """
+
+        old: float = self.balances[account_number];
+        del self.sorted_balances[bisect_left(self.sorted_balances, (old, account_number))];
+        self.balances[account_number] = bk.from_cents(self.accounts[account_number]["balance_cents"]);
+        insort(self.sorted_balances, (self.balances[account_number], account_number));
+
+    def record(self, accounts: dict[int, dict[str, any]], account_number: int, checksum: str | None) -> None:
+        # Checksum listener that notes the changed accounts of the indexed store
+        if accounts is self.accounts:
+            self.changed.add(account_number);
+
+    def refresh(self) -> None:
+        """
+            Indexes the accounts opened and moves the accounts whose balance changed since the last refresh.
+        """
+
+        with bk.settlement_lock:
+            for account_number in sorted(self.changed):
+                if account_number not in self.accounts:
+                    continue;
+                if account_number in self.balances:
+                    self.update_balance(account_number);
+                else:
+                    self.add(account_number, self.accounts[account_number]);
+            self.changed.clear();
+
+    def is_complete(self) -> bool:
+        """
+            Returns:
+                bool: False if accounts were added without a checksum change, so the indexes would miss them.
+        """
+
+        return len(self.balances) == len(self.accounts);
+
+
+# Function to build the secondary indexes of the accounts and keep them up to date
+def build_indexes(accounts: dict[int, dict[str, any]]) -> AccountIndexes:
+    """
+        Builds a hash index and a sorted index on id_number and a sorted index on balance.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+
+        Returns:
+            AccountIndexes: The built indexes, registered as a checksum listener so they follow later changes.
+                            Remove indexes.record from the checksum listeners when they are no longer used.
+    """
+
+    with bk.settlement_lock:
+        indexes: AccountIndexes = AccountIndexes(accounts);
+        bk.checksum_listeners.append(indexes.record);
+    return indexes;
+
+
+# Function to read a predicate given as text, such as on the command line
+def parse_predicate(field: str, op: str, value: str) -> tuple[str, str, any]:
+    """
+        Args:
+            field (str): The account field.
+            op (str): The predicate operator.
+            value (str): The value as text, converted to a number for account_number and balance.
+
+        Returns:
+            tuple: The predicate as a (field, operator, value) tuple.
+
+        Raises:
+            ValueError: If the value of a numeric field is not a number.
+    """
+
+    if field not in ("account_number", "balance"):
+        return field, op, value;
+    try:
+        return field, op, int(value) if field == "account_number" else float(value);
+    except ValueError:
+        raise ValueError(f"The value of {field} should be a number.") from None;
+
+
+# Function to check the predicates of an account query before it is planned
+def check_predicates(where: Iterable[tuple[str, str, any]]) -> None:
+    """
+        Args:
+            where (Iterable): The predicates as (field, operator, value) tuples.
+
+        Raises:
+            ValueError: If an operator is unknown, or a range operator compares a field with a value of another type.
+    """
+
+    for field, op, value in where:
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator '{op}'.");
+        if op in RANGE_OPERATORS and field in ACCOUNT_FIELD_TYPES and \
+                (isinstance(value, bool) or not isinstance(value, ACCOUNT_FIELD_TYPES[field])):
+            raise ValueError(f"The operator '{op}' cannot compare {field} with {type(value).__name__}.");
+
+
+# Function to find the positions of a predicate's matches in a sorted index
+def sorted_range(keys: list[tuple[any, int]], op: str, value: any) -> tuple[int, int] | None:
+    """
+        Returns the slice of a sorted (key, account_number) list whose keys satisfy the predicate.
+
+        Args:
+            keys (list): The sorted index.
+            op (str): The predicate operator.
+            value (any): The predicate value.
+
+        Returns:
+            tuple[int, int] | None: The start and end positions, or None if the operator cannot use the index.
+    """
+
+    match op:
+        case "==":
+            return bisect_left(keys, (value,)), bisect_right(keys, (value, float("inf")));
+        case "<":
+            return 0, bisect_left(keys, (value,));
+        case "<=":
+            return 0, bisect_right(keys, (value, float("inf")));
+        case ">":
+            return bisect_right(keys, (value, float("inf"))), len(keys);
+        case ">=":
+            return bisect_left(keys, (value,)), len(keys);
+        case "prefix":
+            return bisect_left(keys, (value,)), bisect_left(keys, (value + "\uffff",));
+    return;
+
+
+# Function to choose the cheapest access path for a query
+def plan_query(accounts: dict[int, dict[str, any]], where: Iterable[tuple[str, str, any]],
+               indexes: AccountIndexes | None = None) -> tuple[str, Callable[[], Iterable[int]], int]:
+    """
+        Chooses the access path that yields the fewest candidate accounts.
+
+        An equality on account_number is a direct lookup, an equality on id_number uses the hash index, and range or
+        prefix predicates on id_number or balance use the sorted indexes. Without a usable index the plan is a full
+        scan. Each candidate count is found in O(1) or O(log n) without reading the candidates. The indexes are
+        refreshed first, and indexes that miss accounts added without a checksum change are not used.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            where (Iterable): The predicates as (field, operator, value) tuples.
+            indexes (AccountIndexes | None): The available indexes (default is None).
+
+        Returns:
+            tuple: A description of the access path, a function returning the candidate account numbers, and the
+                   estimated number of candidates.
+
+        Raises:
+            ValueError: If a predicate is invalid; see check_predicates.
+    """
+
+    where = list(where);
+    check_predicates(where);
+    if indexes is not None:
+        indexes.refresh();
+        if not indexes.is_complete():
+            indexes = None;
+    best: tuple[str, Callable[[], Iterable[int]], int] = ("full scan", lambda: list(accounts), len(accounts));
+    for field, op, value in where:
+        if field == "account_number" and op == "==":
+            candidates: list[int] = [value] if value in accounts else [];
+            best = min(best, ("account number lookup", lambda found=candidates: found, len(candidates)),
+                       key=lambda path: path[2]);
+            continue;
+        if indexes is None:
+            continue;
+        if field == "id_number" and op == "==":
+            matches: list[int] = indexes.by_id_number.get(value, []);
+            best = min(best, ("id_number hash index", lambda found=matches: found, len(matches)),
+                       key=lambda path: path[2]);
+            continue;
+        sorted_keys: list[tuple[any, int]] | None = {"id_number": indexes.sorted_id_numbers,
+                                                     "balance": indexes.sorted_balances}.get(field);
+        # The sorted indexes only answer range operators on values of the field's type and prefixes of strings
+        if sorted_keys is None or op not in RANGE_OPERATORS + ("==", "prefix") or \
+                isinstance(value, bool) or not isinstance(value, ACCOUNT_FIELD_TYPES[field]) or \
+                (op == "prefix" and field != "id_number"):
+            continue;
+        positions: tuple[int, int] | None = sorted_range(sorted_keys, op, value);
+        if positions is None:
+            continue;
+        start, end = positions;
+        best = min(best, (f"{field} sorted index", lambda keys=sorted_keys, start=start, end=end:
+                          (account_number for _, account_number in keys[start:end]), max(end - start, 0)),
+                   key=lambda path: path[2]);
+    return best;
+
+
+# Function to describe the access path chosen for a query
+def explain_query(accounts: dict[int, dict[str, any]], where: Iterable[tuple[str, str, any]],
+                  indexes: AccountIndexes | None = None) -> str:
+    """
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            where (Iterable): The predicates as (field, operator, value) tuples.
+            indexes (AccountIndexes | None): The available indexes (default is None).
+
+        Returns:
+            str: The access path and the estimated number of candidate accounts.
+    """
+
+    description, _, estimate = plan_query(accounts, where, indexes);
+    return f"{description} ({estimate} candidates)";
+
+
+# Function to check an item against every predicate
+def matches_all(get: Callable[[str], any], where: Iterable[tuple[str, str, any]]) -> bool:
+    """
+        Checks whether an item satisfies every predicate.
+
+        Args:
+            get (Callable): Returns the value of a field of the item.
+            where (Iterable): The predicates as (field, operator, value) tuples.
+
+        Returns:
+            bool: True if every predicate holds.
+
+        Raises:
+            ValueError: If an operator is unknown.
+    """
+
+    for field, op, value in where:
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator '{op}'.");
+        if not OPERATORS[op](get(field), value):
+            return False;
+    return True;
+
+
+# Function to read a field of an account, including its account number
+def account_field(account_number: int, account: dict[str, any], field: str) -> any:
+    """
+        Args:
+            account_number (int): The account number.
+            account (dict): The account details.
+            field (str): 'account_number', 'balance' (in currency units) or a key of the account.
+
+        Returns:
+            any: The value of the field.
+    """
+
+    if field == "account_number":
+        return account_number;
+    return bk.from_cents(account["balance_cents"]) if field == "balance" else account[field];
+
+
+# Function to sort and limit query results
+def order_and_limit(rows: Iterable[any], key: Callable[[any], any] | None, descending: bool,
+                    limit: int | None) -> list[any]:
+    """
+        Args:
+            rows (Iterable): The matching rows.
+            key (Callable | None): The sort key, or None to keep the order (default is None).
+            descending (bool): Whether to sort in descending order.
+            limit (int | None): The maximum number of rows, or None for all.
+
+        Returns:
+            list: The ordered rows.
+    """
+
+    if key is None:
+        return list(rows) if limit is None else list(islice(rows, limit));
+    if limit is None:
+        return sorted(rows, key=key, reverse=descending);
+    # Selecting the first rows with a heap is O(n log limit) and keeps the order of sorted for equal keys
+    return heapq.nlargest(limit, rows, key=key) if descending else heapq.nsmallest(limit, rows, key=key);
+
+
+# Function to apply an aggregate to the values of one field
+def aggregate_values(values: Iterable[any], aggregate: str) -> any:
+    """
+        Args:
+            values (Iterable): The values of the field.
+            aggregate (str): 'count', 'sum', 'min', 'max' or 'avg'.
+
+        Returns:
+            any: The aggregated value.
+
+        Raises:
+            ValueError: If the aggregate is unknown.
+    """
+
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate '{aggregate}'.");
+    return AGGREGATES[aggregate](list(values));
+
+
+# Function to query the accounts
+def query_accounts(accounts: dict[int, dict[str, any]], where: Iterable[tuple[str, str, any]] = (),
+                   order_by: str | None = None, descending: bool = False, limit: int | None = None,
+                   aggregate: tuple[str, str] | None = None, indexes: AccountIndexes | None = None) -> any:
+    """
+        Filters, sorts, limits and aggregates the accounts, reading only the candidates of the cheapest access path.
+
+        For example, the accounts with a negative balance whose ID number starts with 55:
+            query_accounts(accounts, [("balance", "<", 0), ("id_number", "prefix", "55")], indexes=indexes)
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            where (Iterable): The predicates as (field, operator, value) tuples (default is no filter).
+            order_by (str | None): The field to sort by, or None to keep the access path order (default is None).
+            descending (bool): Whether to sort in descending order (default is False).
+            limit (int | None): The maximum number of accounts, or None for all (default is None).
+            aggregate (tuple | None): An (aggregate, field) pair such as ("sum", "balance") to aggregate instead of
+                                      returning accounts (default is None).
+            indexes (AccountIndexes | None): The indexes the planner may use (default is None).
+
+        Returns:
+            any: A list of (account_number, account) pairs, or the aggregated value.
+
+        Raises:
+            ValueError: If a predicate or the aggregate is invalid.
+    """
+
+    where = list(where);
+    _, candidates, _ = plan_query(accounts, where, indexes);
+    rows: Iterator[tuple[int, dict[str, any]]] = (
+        (account_number, accounts[account_number]) for account_number in candidates()
+        if account_number in accounts and matches_all(
+            lambda field, n=account_number: account_field(n, accounts[n], field), where));
+    if aggregate is not None:
+        function, field = aggregate;
+        return aggregate_values((account_field(n, account, field) for n, account in rows), function);
+    key: Callable[[tuple[int, dict[str, any]]], any] | None = None if order_by is None else \
+        lambda row: account_field(row[0], row[1], order_by);
+    return order_and_limit(rows, key, descending, limit);
+
+
+# Function to query the transaction history of all accounts
+def query_history(accounts: dict[int, dict[str, any]], where: Iterable[tuple[str, str, any]] = (),
+                  order_by: str | None = None, descending: bool = False, limit: int | None = None,
+                  aggregate: tuple[str, str] | None = None) -> any:
+    """
+        Filters, sorts, limits and aggregates the transaction history, archived segments included.
+
+        An equality on 'source' reads only the history of that account, since history is kept by the source
+        account, and a range on 'created' or 'executed' skips archived segments outside the range.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            where (Iterable): The predicates as (field, operator, value) tuples over the HISTORY_FIELDS.
+            order_by (str | None): The field to sort by, or None to keep the stored order (default is None).
+            descending (bool): Whether to sort in descending order (default is False).
+            limit (int | None): The maximum number of rows, or None for all (default is None).
+            aggregate (tuple | None): An (aggregate, field) pair such as ("sum", "amount") (default is None).
+
+        Returns:
+            any: A list of history tuples, or the aggregated value.
+    """
+
+    where = list(where);
+    sources: Iterable[int] = accounts;
+    start: str | None = None;
+    end: str | None = None;
+    time_field: str | None = None;
+    for field, op, value in where:
+        if field == "source" and op == "==":
+            sources = [value] if value in accounts else [];
+        elif field in ("created", "executed") and op in (">", ">=", "<", "<=") and time_field in (None, field):
+            # Narrow the segment range; the exact bounds are checked again by the predicates
+            time_field = field;
+            if op in (">", ">="):
+                start = value;
+            else:
+                end = value + "\uffff" if op == "<=" else value;
+
+    rows: Iterator[tuple[str, str, int, int, float, str]] = (
+        row for account_number in sources
+        for row in bh.iter_history(accounts[account_number], start, end, HISTORY_FIELDS[time_field or "created"])
+        if matches_all(lambda field, row=row: row[HISTORY_FIELDS[field]], where));
+    if aggregate is not None:
+        function, field = aggregate;
+        return aggregate_values((row[HISTORY_FIELDS[field]] for row in rows), function);
+    key: Callable[[tuple], any] | None = None if order_by is None else \
+        lambda row: row[HISTORY_FIELDS[order_by]];
+    return order_and_limit(rows, key, descending, limit);
+
+
+# Function to rank accounts by the amount sent or received in a period, using the activity views
+def top_accounts_by_activity(accounts: dict[int, dict[str, any]], direction: str = "sent",
+                             start_day: str | None = None, end_day: str | None = None,
+                             n: int = 10) -> list[tuple[int, float]]:
+    """
+        Ranks accounts by their daily rollups, such as the top senders of the week, without reading any history.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            direction (str): 'sent' or 'received' (default is 'sent').
+            start_day (str | None): The first day (YYYY-MM-DD), or None for no bound (default is None).
+            end_day (str | None): The last day (YYYY-MM-DD), or None for no bound (default is None).
+            n (int): The number of accounts to return (default is 10).
+
+        Returns:
+            list: (account_number, amount) pairs, largest amount first. Accounts without activity are left out.
+    """
+
+    totals: Iterator[tuple[int, int]] = (
+        (account_number, sum(rollup[direction] for day, rollup in account["activity"]["daily"].items()
+                             if (start_day is None or day >= start_day) and (end_day is None or day <= end_day)))
+        for account_number, account in accounts.items() if "activity" in account);
+    return [(account_number, bk.from_cents(cents)) for account_number, cents in
+            heapq.nlargest(n, (total for total in totals if total[1] > 0), key=lambda total: total[1])];
+
+
+# Function to read the daily volume of an account from its activity view
+def daily_volume(account: dict[str, any], start_day: str | None = None,
+                 end_day: str | None = None) -> list[tuple[str, float, float, int]]:
+    """
+        Args:
+            account (dict): The account details.
+            start_day (str | None): The first day (YYYY-MM-DD), or None for no bound (default is None).
+            end_day (str | None): The last day (YYYY-MM-DD), or None for no bound (default is None).
+
+        Returns:
+            list: (day, sent, received, count) tuples in day order.
+    """
+
+    daily: dict[str, dict[str, any]] = account.get("activity", {}).get("daily", {});
+    return [(day, bk.from_cents(rollup["sent"]), bk.from_cents(rollup["received"]), rollup["count"])
+            for day, rollup in sorted(daily.items())
+            if (start_day is None or day >= start_day) and (end_day is None or day <= end_day)];
+
+
+# Function to read the amounts scheduled to leave and reach an account from its exposure view
+def scheduled_exposure(account: dict[str, any], start_day: str | None = None,
+                       end_day: str | None = None) -> tuple[float, float]:
+    """
+        Without bounds the stored totals are returned in O(1); with bounds only the due days of the account are
+        summed, never the pending queues.
+
+        Args:
+            account (dict): The account details.
+            start_day (str | None): The first due day (YYYY-MM-DD), or None for no bound (default is None).
+            end_day (str | None): The last due day (YYYY-MM-DD), or None for no bound (default is None).
+
+        Returns:
+            tuple: The outgoing and incoming scheduled amounts.
+    """
+
+    exposure: dict[str, any] = account.get("exposure", {"outgoing": 0, "incoming": 0, "daily": {}});
+    if start_day is None and end_day is None:
+        return bk.from_cents(exposure["outgoing"]), bk.from_cents(exposure["incoming"]);
+    buckets: list[dict[str, int]] = [
+        bucket for day, bucket in exposure["daily"].items()
+        if (start_day is None or day >= start_day) and (end_day is None or day <= end_day)];
+    return bk.from_cents(sum(bucket["outgoing"] for bucket in buckets)), \
+        bk.from_cents(sum(bucket["incoming"] for bucket in buckets));
+
+
+# Function to list the amounts scheduled for an account per due day
+def exposure_schedule(account: dict[str, any], start_day: str | None = None,
+                      end_day: str | None = None) -> list[tuple[str, float, float, int]]:
+    """
+        Args:
+            account (dict): The account details.
+            start_day (str | None): The first due day (YYYY-MM-DD), or None for no bound (default is None).
+            end_day (str | None): The last due day (YYYY-MM-DD), or None for no bound (default is None).
+
+        Returns:
+            list: (day, outgoing, incoming, count) tuples in day order.
+    """
+
+    daily: dict[str, dict[str, any]] = account.get("exposure", {}).get("daily", {});
+    return [(day, bk.from_cents(bucket["outgoing"]), bk.from_cents(bucket["incoming"]), bucket["count"])
+            for day, bucket in sorted(daily.items())
+            if (start_day is None or day >= start_day) and (end_day is None or day <= end_day)];
+
+
+# Function to forecast the balance of an account at the end of a day
+def projected_balance(account: dict[str, any], day: str) -> float:
+    """
+        Args:
+            account (dict): The account details.
+            day (str): The day (YYYY-MM-DD).
+
+        Returns:
+            float: The balance after every pending transaction due by the end of the day is settled.
+    """
+
+    outgoing, incoming = scheduled_exposure(account, end_day=day);
+    return bk.from_cents(account["balance_cents"] - bk.to_cents(outgoing) + bk.to_cents(incoming));
@@ -0,0 +1,302 @@
+import Bank_Accounts as bk
+import Bank_Query as bq
+import pytest
+
+
+def create_mock_accounts():
+    return {
+        1001: {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "id_number": "551234567",
+            "balance_cents": -2000,
+            "transactions_to_execute": [],
+            "transaction_history": [
+                ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 100.00, "2024-08-01 10:00:01"),
+                ("2024-08-03 10:00:00", "2024-08-03 10:00:00", 1001, 1003, 50.00, "2024-08-03 10:00:01")
+            ]
+        },
+        1002: {
+            "first_name": "Bob",
+            "last_name": "Johnson",
+            "id_number": "987654321",
+            "balance_cents": 150000,
+            "transactions_to_execute": [],
+            "transaction_history": [
+                ("2024-08-02 10:00:00", "2024-08-02 10:00:00", 1002, 1001, 70.00, "2024-08-02 10:00:01")
+            ]
+        },
+        1003: {
+            "first_name": "Charlie",
+            "last_name": "Brown",
+            "id_number": "559999999",
+            "balance_cents": 350075,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        },
+        1004: {
+            "first_name": "Dana",
+            "last_name": "White",
+            "id_number": "123123123",
+            "balance_cents": -500,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+    };
+
+
+# Tests for query_accounts function
+
+
+def test_query_accounts_negative_balance_and_id_prefix():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    where: list[tuple[str, str, any]] = [("balance", "<", 0), ("id_number", "prefix", "55")];
+
+    # Act
+    without_indexes: list = bq.query_accounts(accounts, where);
+    with_indexes: list = bq.query_accounts(accounts, where, indexes=bq.AccountIndexes(accounts));
+
+    # Assert
+    assert [n for n, _ in without_indexes] == [1001];
+    assert [n for n, _ in with_indexes] == [1001];
+
+
+def test_query_accounts_order_limit_and_aggregate():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+
+    # Act
+    richest: list = bq.query_accounts(accounts, order_by="balance", descending=True, limit=2);
+    total: float = bq.query_accounts(accounts, [("balance", ">=", 0)], aggregate=("sum", "balance"));
+    names: list = bq.query_accounts(accounts, [("first_name", "contains", "AR")]);
+
+    # Assert
+    assert [n for n, _ in richest] == [1003, 1002];
+    assert total == 5000.75;
+    assert [n for n, _ in names] == [1003];
+
+
+def test_query_accounts_unknown_operator():
+    with pytest.raises(ValueError) as ex:
+        bq.query_accounts(create_mock_accounts(), [("balance", "~", 0)]);
+
+    # Assert
+    assert str(ex.value) == "Unknown operator '~'.";
+
+
+# Tests for plan_query and explain_query functions
+
+
+def test_explain_query_picks_cheapest_access_path():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    indexes: bq.AccountIndexes = bq.AccountIndexes(accounts);
+
+    # Act
+    no_index: str = bq.explain_query(accounts, [("balance", "<", 0)]);
+    prefix: str = bq.explain_query(accounts, [("balance", "<", 2000), ("id_number", "prefix", "55")], indexes);
+    balance: str = bq.explain_query(accounts, [("balance", ">", 3000), ("id_number", "prefix", "55")], indexes);
+    lookup: str = bq.explain_query(accounts, [("id_number", "==", "987654321")], indexes);
+
+    # Assert
+    assert no_index == "full scan (4 candidates)";
+    assert prefix == "id_number sorted index (2 candidates)";
+    assert balance == "balance sorted index (1 candidates)";
+    assert lookup == "id_number hash index (1 candidates)";
+
+
+def test_query_accounts_stale_index_is_checked_against_live_accounts():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    indexes: bq.AccountIndexes = bq.AccountIndexes(accounts);
+    accounts[1001]["balance_cents"] = 10000;
+
+    # Act
+    actual: list = bq.query_accounts(accounts, [("balance", "<", 0)], indexes=indexes);
+
+    # Assert
+    assert [n for n, _ in actual] == [1004];
+
+
+# Tests for query_history function
+
+
+def test_query_history_by_source_and_time():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+
+    # Act
+    rows: list = bq.query_history(accounts, [("source", "==", 1001), ("created", ">=", "2024-08-02")]);
+    volume: float = bq.query_history(accounts, [("target", "==", 1001)], aggregate=("sum", "amount"));
+    latest: list = bq.query_history(accounts, order_by="created", descending=True, limit=1);
+
+    # Assert
+    assert [row[4] for row in rows] == [50.00];
+    assert volume == 70.00;
+    assert latest[0][0] == "2024-08-03 10:00:00";
+
+
+# Tests for top_accounts_by_activity and daily_volume functions
+
+
+def test_top_accounts_by_activity_reads_views():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = bk.build_activity_views(create_mock_accounts());
+
+    # Act
+    senders: list = bq.top_accounts_by_activity(accounts, "sent", n=1);
+    receivers: list = bq.top_accounts_by_activity(accounts, "received", start_day="2024-08-02");
+
+    # Assert
+    assert senders == [(1001, 150.00)];
+    assert receivers == [(1001, 70.00), (1003, 50.00)];
+
+
+def test_daily_volume_follows_settlement():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = bk.build_activity_views(create_mock_accounts());
+    transaction: tuple = ("2024-08-03 11:00:00", "2024-08-03 11:00:00", 1003, 1001, 25.00);
+    bk.enqueue_transaction(accounts, transaction);
+
+    # Act
+    bk.settle_transaction(accounts, transaction, "2024-08-03 11:00:01");
+
+    # Assert
+    assert bq.daily_volume(accounts[1001]) == [("2024-08-01", 100.00, 0, 1), ("2024-08-02", 0, 70.00, 1),
+                                               ("2024-08-03", 50.00, 25.00, 2)];
+    assert accounts[1003]["activity"]["sent_count"] == 1;
+    assert accounts[1003]["activity"]["last_activity"] == "2024-08-03 11:00:01";
+
+
+def test_settlement_does_not_start_partial_activity_views():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    transaction: tuple = ("2024-08-03 11:00:00", "2024-08-03 11:00:00", 1003, 1001, 25.00);
+    bk.enqueue_transaction(accounts, transaction);
+
+    # Act
+    bk.settle_transaction(accounts, transaction, "2024-08-03 11:00:01");
+
+    # Assert
+    assert all("activity" not in account for account in accounts.values());
+    assert bq.top_accounts_by_activity(accounts, "sent") == [];
+
+
+# Tests for scheduled_exposure, exposure_schedule and projected_balance functions
+
+
+def test_scheduled_exposure_reads_views():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = bk.build_exposure_views(create_mock_accounts());
+    bk.enqueue_transaction(accounts, ("2024-08-03 11:00:00", "2024-08-05 11:00:00", 1002, 1001, 25.00));
+    bk.enqueue_transaction(accounts, ("2024-08-03 11:00:00", "2024-08-07 11:00:00", 1002, 1003, 30.00));
+    bk.enqueue_transaction(accounts, ("2024-08-03 11:00:00", "2024-08-07 12:00:00", 1003, 1002, 10.00));
+
+    # Act
+    totals: tuple = bq.scheduled_exposure(accounts[1002]);
+    first_week: tuple = bq.scheduled_exposure(accounts[1002], end_day="2024-08-06");
+    schedule: list = bq.exposure_schedule(accounts[1002], start_day="2024-08-06");
+
+    # Assert
+    assert totals == (55.00, 10.00);
+    assert first_week == (25.00, 0);
+    assert schedule == [("2024-08-07", 30.00, 10.00, 2)];
+    assert bq.scheduled_exposure(accounts[1004]) == (0, 0);
+
+
+def test_projected_balance_settles_due_days():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = bk.build_exposure_views(create_mock_accounts());
+    bk.enqueue_transaction(accounts, ("2024-08-03 11:00:00", "2024-08-05 11:00:00", 1002, 1001, 25.00));
+    bk.enqueue_transaction(accounts, ("2024-08-03 11:00:00", "2024-08-07 11:00:00", 1001, 1003, 10.00));
+
+    # Act
+    projected: list[float] = [bq.projected_balance(accounts[1001], day)
+                              for day in ("2024-08-04", "2024-08-05", "2024-08-07")];
+
+    # Assert
+    assert projected == [-20.00, 5.00, -5.00];
+
+
+def test_indexes_follow_settlements_and_new_accounts():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    indexes: bq.AccountIndexes = bq.build_indexes(accounts);
+    transaction: tuple = ("2024-08-05 10:00:00", "2024-08-05 10:00:00", 1003, 1004, 3600.00);
+
+    # Act
+    try:
+        bk.enqueue_transaction(accounts, transaction);
+        bk.settle_transaction(accounts, transaction, "2024-08-05 10:00:01");
+        bk.create_account(accounts, 1005, "Eve", "Green", "550000000", -3.00);
+    finally:
+        bk.checksum_listeners.remove(indexes.record);
+
+    # Assert
+    where: list[tuple[str, str, any]] = [("balance", "<", 0)];
+    indexed: list = bq.query_accounts(accounts, where, order_by="account_number", indexes=indexes);
+    assert [n for n, _ in indexed] == [1001, 1003, 1005];
+    assert indexed == bq.query_accounts(accounts, where);
+    assert bq.explain_query(accounts, [("id_number", "prefix", "55")], indexes) == \
+        "id_number sorted index (3 candidates)";
+
+
+def test_indexes_follow_unpublished_and_rolled_back_changes():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    indexes: bq.AccountIndexes = bq.build_indexes(accounts);
+    settled: tuple = ("2024-08-05 10:00:00", "2024-08-05 10:00:00", 1002, 1003, 2000.00);
+    failed: list[tuple] = [("2024-08-05 11:00:00", "2024-08-05 11:00:00", 1003, 1002, 10.00),
+                           ("2024-08-05 11:00:00", "2024-08-05 11:00:00", 1003, 9999, 10.00)];
+
+    # Act
+    try:
+        bk.apply_event(accounts, {"type": "transfer", "transaction": settled});
+        bk.apply_event(accounts, {"type": "settlement", "transaction": settled,
+                                  "execution_time": "2024-08-05 10:00:01"});
+        bk.apply_event(accounts, {"type": "account_open", "account_number": 1005, "first_name": "Eve",
+                                  "last_name": "Green", "id_number": "550000000", "balance": -3.00});
+        for transaction in failed:
+            bk.enqueue_transaction(accounts, transaction);
+        with pytest.raises(KeyError):
+            bk.settle_batch(accounts, failed, "2024-08-05 11:00:01");
+    finally:
+        bk.checksum_listeners.remove(indexes.record);
+
+    # Assert
+    for where in ([("balance", "<", 0)], [("balance", ">=", 1500)], [("id_number", "prefix", "55")]):
+        assert bq.query_accounts(accounts, where, order_by="account_number", indexes=indexes) == \
+            bq.query_accounts(accounts, where, order_by="account_number");
+    assert bq.explain_query(accounts, [("balance", "<", 0)], indexes) == "balance sorted index (4 candidates)";
+
+
+def test_query_accounts_ignores_incomplete_indexes():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    indexes: bq.AccountIndexes = bq.AccountIndexes(accounts);
+    accounts[1005] = dict(accounts[1004], id_number="555555555");
+
+    # Act
+    actual: list = bq.query_accounts(accounts, [("balance", "<", 0)], indexes=indexes);
+
+    # Assert
+    assert [n for n, _ in actual] == [1001, 1004, 1005];
+    assert bq.explain_query(accounts, [("id_number", "==", "555555555")], indexes) == "full scan (5 candidates)";
+
+
+def test_query_accounts_index_never_changes_mismatched_predicates():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    indexes: bq.AccountIndexes = bq.AccountIndexes(accounts);
+
+    # Act
+    prefix: list = bq.query_accounts(accounts, [("balance", "prefix", "15")], indexes=indexes);
+    equal: list = bq.query_accounts(accounts, [("balance", "==", "1500")], indexes=indexes);
+    with pytest.raises(ValueError) as ex:
+        bq.query_accounts(accounts, [("id_number", "<", 100)], indexes=indexes);
+
+    # Assert
+    assert [n for n, _ in prefix] == [1002];
+    assert equal == [];
+    assert str(ex.value) == "The operator '<' cannot compare id_number with int.";
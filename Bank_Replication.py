@@ -0,0 +1,392 @@
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from typing import Iterator
+
+import Bank_Accounts as bk
+import Bank_Integrity as bi
+
+# Seconds between two heartbeats sent to an idle follower
+HEARTBEAT_SECONDS: float = 1.0;
+
+
+# Function to remove a partial last entry from a journal file
+def truncate_torn_entry(path: str, block_size: int = 4096) -> int:
+    """
+        Cuts the journal back to its last complete line. A crash while an entry was written leaves a line without
+        its newline; entries appended after it would be joined to it and could never be read.
+
+        Args:
+            path (str): The journal file. A missing file is left alone.
+            block_size (int): The number of bytes read at a time while looking for the last newline
+                              (default is 4096).
+
+        Returns:
+            int: The number of bytes removed.
+    """
+
+    if not os.path.exists(path):
+        return 0;
+    with open(path, "rb+") as journal:
+        size: int = journal.seek(0, os.SEEK_END);
+        end: int = size;
+        while end > 0:
+            start: int = max(0, end - block_size);
+            journal.seek(start);
+            newline: int = journal.read(end - start).rfind(b"\n");
+            if newline >= 0:
+                end = start + newline + 1;
+                break;
+            end = start;
+        if end < size:
+            journal.truncate(end);
+    return size - end;
+
+
+class Journal:
+    """
+        An append-only journal of transfer, settlement and account-open events, one JSON line per event.
+
+        Register Journal.record as an event listener of Bank_Accounts to make every change durable. Every entry
+        gets a sequence number and the time it was recorded, and is handed to the live subscribers, such as the
+        connections of followers.
+    """
+
+    def __init__(self, path: str, fsync: bool = False) -> None:
+        """
+            Args:
+                path (str): The journal file. Existing entries are kept and new entries are appended. A partial
+                            last entry left by a crash is removed first (see truncate_torn_entry).
+                fsync (bool): Whether to fsync the file after every entry (default is False, flush only).
+        """
+
+        self.path: str = path;
+        self.fsync: bool = fsync;
+        self.lock: threading.Lock = threading.Lock();
+        truncate_torn_entry(path);
+        self.seq: int = sum(1 for _ in self.read_from(0)) if os.path.exists(path) else 0;
+        self.output = open(path, "a", encoding="utf-8");
+        self.subscribers: list[queue.Queue] = [];
+
+    def record(self, accounts: dict[int, dict[str, any]], event: dict[str, any]) -> dict[str, any]:
+        """
+            Appends an event to the journal. The signature matches Bank_Accounts.event_listeners.
+
+            Args:
+                accounts (dict): The accounts the event was applied to.
+                event (dict): The event.
+
+            Returns:
+                dict: The journal entry, the event with its 'seq' and 'time'.
+        """
+
+        with self.lock:
+            entry: dict[str, any] = {"seq": self.seq, "time": time.time(), **event};
+            self.output.write(json.dumps(entry) + "\n");
+            self.output.flush();
+            if self.fsync:
+                os.fsync(self.output.fileno());
+            self.seq += 1;
+            for subscriber in self.subscribers:
+                subscriber.put(entry);
+        return entry;
+
+    def read_from(self, seq: int) -> Iterator[dict[str, any]]:
+        """
+            Reads the complete entries of the journal file from a sequence number on.
+
+            Args:
+                seq (int): The first sequence number to return.
+
+            Returns:
+                Iterator: The journal entries.
+        """
+
+        with open(self.path, encoding="utf-8") as source:
+            for line in source:
+                if not line.endswith("\n"):
+                    # An entry that is still being written
+                    return;
+                entry: dict[str, any] = json.loads(line);
+                if entry["seq"] >= seq:
+                    yield entry;
+
+    def subscribe(self) -> tuple[queue.Queue, int]:
+        """
+            Returns:
+                tuple: A queue that receives every entry recorded from now on, and the sequence number of the first
+                       such entry.
+        """
+
+        with self.lock:
+            subscriber: queue.Queue = queue.Queue();
+            self.subscribers.append(subscriber);
+            return subscriber, self.seq;
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        with self.lock:
+            self.subscribers.remove(subscriber);
+
+    def close(self) -> None:
+        with self.lock:
+            self.output.close();
+
+
+# Function to apply a journal event to an account store
+def apply_event(accounts: dict[int, dict[str, any]], event: dict[str, any]) -> None:
+    """
+        Applies an event or journal entry without publishing it again; see Bank_Accounts.apply_event.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            event (dict): A 'transfer', 'settlement' or 'account_open' event or journal entry.
+
+        Raises:
+            ValueError: If the event type is unknown.
+    """
+
+    bk.apply_event(accounts, event);
+
+
+# Function to rebuild an account store from its journal
+def replay_journal(accounts: dict[int, dict[str, any]], path: str, from_seq: int = 0) -> int:
+    """
+        Applies the entries of a journal file to the accounts, for example after a restart.
+
+        Args:
+            accounts (dict): The accounts the journal was started from, with the entries before from_seq applied.
+            path (str): The journal file. A missing file is an empty journal.
+            from_seq (int): The sequence number of the first entry to apply (default is 0, every entry).
+
+        Returns:
+            int: The number of applied entries.
+    """
+
+    if not os.path.exists(path):
+        return 0;
+    with open(path, encoding="utf-8") as source:
+        count: int = 0;
+        for line in source:
+            if line.endswith("\n"):
+                entry: dict[str, any] = json.loads(line);
+                if entry["seq"] >= from_seq:
+                    apply_event(accounts, entry);
+                    count += 1;
+    return count;
+
+
+class ReplicationHandler(socketserver.StreamRequestHandler):
+    """
+        Streams the journal to one follower: first the entries it has not seen yet, then every new entry, with a
+        heartbeat whenever the journal is idle.
+    """
+
+    def handle(self) -> None:
+        request: dict[str, any] = json.loads(self.rfile.readline() or "{}");
+        next_seq: int = request.get("from_seq", 0);
+        journal: Journal = self.server.journal;
+        live, live_from = journal.subscribe();
+        try:
+            for entry in journal.read_from(next_seq):
+                if entry["seq"] >= live_from:
+                    break;
+                self.send(entry);
+                next_seq = entry["seq"] + 1;
+            while not self.server.stopping.is_set():
+                try:
+                    entry = live.get(timeout=HEARTBEAT_SECONDS);
+                except queue.Empty:
+                    self.send(self.heartbeat());
+                    continue;
+                if entry["seq"] >= next_seq:
+                    self.send(entry);
+                    next_seq = entry["seq"] + 1;
+        except OSError:
+            # The follower disconnected
+            pass;
+        finally:
+            journal.unsubscribe(live);
+
+    def heartbeat(self) -> dict[str, any]:
+        # The root of the primary's Merkle tree describes the state after the last journal entry
+        with bk.settlement_lock:
+            heartbeat: dict[str, any] = {"type": "heartbeat", "next_seq": self.server.journal.seq, "time": time.time()};
+            if self.server.tree is not None:
+                heartbeat["root"] = self.server.tree.root();
+        return heartbeat;
+
+    def send(self, entry: dict[str, any]) -> None:
+        self.wfile.write((json.dumps(entry) + "\n").encode("utf-8"));
+        self.wfile.flush();
+
+
+class ReplicationServer(socketserver.ThreadingTCPServer):
+    """
+        Serves the journal of the primary to followers over a local socket.
+    """
+
+    daemon_threads: bool = True;
+    allow_reuse_address: bool = True;
+
+    def __init__(self, journal: Journal, host: str = "127.0.0.1", port: int = 0,
+                 tree: bi.MerkleTree | None = None) -> None:
+        """
+            Args:
+                journal (Journal): The journal of the primary.
+                host (str): The address to listen on (default is 127.0.0.1).
+                port (int): The port to listen on, or 0 for any free port (default is 0).
+                tree (MerkleTree | None): The maintained Merkle tree of the primary's accounts, whose root is sent
+                                          with every heartbeat so followers can verify their state (default is None).
+        """
+
+        super().__init__((host, port), ReplicationHandler);
+        self.journal: Journal = journal;
+        self.tree: bi.MerkleTree | None = tree;
+        self.stopping: threading.Event = threading.Event();
+        self.thread: threading.Thread = threading.Thread(target=self.serve_forever, name="replication-server",
+                                                         daemon=True);
+
+    def start(self) -> int:
+        """
+            Starts serving in a background thread.
+
+            Returns:
+                int: The port the server listens on.
+        """
+
+        self.thread.start();
+        return self.server_address[1];
+
+    def stop(self) -> None:
+        self.stopping.set();
+        self.shutdown();
+        self.server_close();
+
+
+class Follower:
+    """
+        A hot standby that applies the primary's journal to its own accounts and serves read-only reports.
+    """
+
+    def __init__(self, accounts: dict[int, dict[str, any]], host: str, port: int, from_seq: int = 0) -> None:
+        """
+            Args:
+                accounts (dict): The follower's accounts, in the state the primary's journal started from.
+                host (str): The address of the primary's replication server.
+                port (int): The port of the primary's replication server.
+                from_seq (int): The first journal entry the accounts do not include yet (default is 0).
+        """
+
+        self.accounts: dict[int, dict[str, any]] = accounts;
+        self.address: tuple[str, int] = (host, port);
+        self.applied_seq: int = from_seq - 1;
+        self.primary_seq: int = from_seq - 1;
+        self.last_applied_time: float | None = None;
+        self.in_sync: bool | None = None;
+        self.tree: bi.MerkleTree | None = None;
+        self.applied_event: threading.Condition = threading.Condition();
+        self.connection: socket.socket | None = None;
+        self.thread: threading.Thread = threading.Thread(target=self.run, name="replication-follower", daemon=True);
+
+    def start(self) -> None:
+        """
+            Connects to the primary and starts applying its journal in a background thread.
+        """
+
+        self.tree = bi.maintain_merkle_tree(self.accounts);
+        self.connection = socket.create_connection(self.address);
+        self.connection.sendall((json.dumps({"from_seq": self.applied_seq + 1}) + "\n").encode("utf-8"));
+        self.thread.start();
+
+    def run(self) -> None:
+        try:
+            with self.connection.makefile("r", encoding="utf-8") as stream:
+                for line in stream:
+                    entry: dict[str, any] = json.loads(line);
+                    if entry["type"] == "heartbeat":
+                        self.primary_seq = max(self.primary_seq, entry["next_seq"] - 1);
+                        # Once caught up, the replica must have the primary's root
+                        if "root" in entry and self.applied_seq == entry["next_seq"] - 1:
+                            self.in_sync = self.tree.root() == entry["root"];
+                        continue;
+                    apply_event(self.accounts, entry);
+                    with self.applied_event:
+                        self.applied_seq = entry["seq"];
+                        self.primary_seq = max(self.primary_seq, entry["seq"]);
+                        self.last_applied_time = entry["time"];
+                        self.applied_event.notify_all();
+        except (OSError, ValueError):
+            # The connection was closed
+            pass;
+
+    def wait_for(self, seq: int, timeout: float | None = None) -> bool:
+        """
+            Waits until the journal entry with the given sequence number has been applied.
+
+            Args:
+                seq (int): The sequence number.
+                timeout (float | None): The maximum time to wait in seconds, or None to wait forever.
+
+            Returns:
+                bool: True if the entry has been applied.
+        """
+
+        with self.applied_event:
+            return self.applied_event.wait_for(lambda: self.applied_seq >= seq, timeout);
+
+    def metrics(self) -> dict[str, any]:
+        """
+            Returns:
+                dict: The last applied and the last known primary sequence numbers, the number of entries the follower
+                      is behind, and how many seconds ago the last applied entry was recorded on the primary when the
+                      follower is behind (0 when it is caught up), and whether the replica's Merkle root matched the
+                      primary's at the last heartbeat it was caught up at (None before any such heartbeat).
+        """
+
+        lag_events: int = self.primary_seq - self.applied_seq;
+        lag_seconds: float = 0.0;
+        if lag_events > 0 and self.last_applied_time is not None:
+            lag_seconds = time.time() - self.last_applied_time;
+        return {"applied_seq": self.applied_seq, "primary_seq": self.primary_seq, "lag_events": lag_events,
+                "lag_seconds": lag_seconds, "in_sync": self.in_sync};
+
+    def stop(self) -> None:
+        if self.connection is not None:
+            self.connection.shutdown(socket.SHUT_RDWR);
+            self.connection.close();
+        if self.thread.is_alive():
+            self.thread.join();
+        bi.release_merkle_tree(self.accounts);
+
+
+def main(argv: list[str] | None = None) -> None:
+    # Run a follower process that serves read-only reports from a replica of the primary
+    parser = argparse.ArgumentParser(description="Read-only follower of a bank accounts primary");
+    parser.add_argument("--follow", required=True, help="the replication address of the primary, HOST:PORT");
+    arguments: argparse.Namespace = parser.parse_args(argv);
+    host, port = arguments.follow.rsplit(":", 1);
+
+    follower: Follower = Follower(bk.init_interface(), host, int(port));
+    follower.start();
+    try:
+        while True:
+            metrics: dict[str, any] = follower.metrics();
+            print(f"\nReplica at entry {metrics['applied_seq']} of {metrics['primary_seq']} "
+                  f"({metrics['lag_events']} behind, {metrics['lag_seconds']:.1f} s lag"
+                  f"{'' if metrics['in_sync'] is None else ', in sync' if metrics['in_sync'] else ', DIVERGED'}).");
+            bk.reports_interface(follower.accounts);
+            if input("Press Enter for the reports menu or type 'EX' to exit: ").upper() == 'EX':
+                break;
+    except KeyboardInterrupt:
+        print("\nProgram interrupted by user. Exiting.");
+    finally:
+        follower.stop();
+
+
+if __name__ == "__main__":
+    main();
@@ -0,0 +1,188 @@
+import copy
+import os
+
+import pytest
+
+import Bank_Accounts as bk
+import Bank_Integrity as bi
+import Bank_Replication as brp
+
+
+def create_mock_accounts():
+    return {
+        1001: {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "id_number": "123456789",
+            "balance_cents": 250010,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        },
+        1002: {
+            "first_name": "Bob",
+            "last_name": "Johnson",
+            "id_number": "987654321",
+            "balance_cents": 150020,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+    };
+
+
+def make_changes(accounts: dict[int, dict[str, any]]) -> None:
+    transaction: tuple = ("2024-08-02 10:00:00", "2024-08-02 10:00:00", 1001, 1002, 100.0);
+    bk.enqueue_transaction(accounts, transaction);
+    bk.settle_transaction(accounts, transaction, "2024-08-02 10:00:01");
+    bk.create_account(accounts, 1003, "Charlie", "Brown", "555555555", 300.0);
+    bk.enqueue_transaction(accounts, ("2024-08-02 11:00:00", "2024-08-03 10:00:00", 1003, 1001, 50.0));
+
+
+# Tests for Journal class
+
+
+def test_journal_replay_rebuilds_accounts(tmp_path):
+    # Arrange
+    path: str = str(tmp_path / "journal.log");
+    primary: dict[int, dict[str, any]] = create_mock_accounts();
+    replica: dict[int, dict[str, any]] = create_mock_accounts();
+    journal: brp.Journal = brp.Journal(path);
+    bk.event_listeners.append(journal.record);
+    try:
+        make_changes(primary);
+    finally:
+        bk.event_listeners.remove(journal.record);
+        journal.close();
+
+    # Act
+    count: int = brp.replay_journal(replica, path);
+
+    # Assert
+    assert count == 4;
+    assert bi.diff_stores(primary, replica) == [];
+    assert replica[1003]["transactions_to_execute"] == primary[1003]["transactions_to_execute"];
+
+
+def test_journal_replay_from_sequence_number(tmp_path):
+    # Arrange
+    path: str = str(tmp_path / "journal.log");
+    primary: dict[int, dict[str, any]] = create_mock_accounts();
+    journal: brp.Journal = brp.Journal(path);
+    bk.event_listeners.append(journal.record);
+    try:
+        make_changes(primary);
+    finally:
+        bk.event_listeners.remove(journal.record);
+        journal.close();
+    replica: dict[int, dict[str, any]] = create_mock_accounts();
+    brp.replay_journal(replica, path);
+    bk.create_account(primary, 1004, "Dana", "White", "444444444", 400.0);
+    journal = brp.Journal(path);
+    journal.record(primary, {"type": "account_open", "account_number": 1004, "first_name": "Dana",
+                             "last_name": "White", "id_number": "444444444", "balance": 400.0});
+    journal.close();
+
+    # Act
+    count: int = brp.replay_journal(replica, path, 4);
+
+    # Assert
+    assert count == 1;
+    assert bi.diff_stores(primary, replica) == [];
+
+
+def test_journal_continues_sequence_numbers(tmp_path):
+    # Arrange
+    path: str = str(tmp_path / "journal.log");
+    journal: brp.Journal = brp.Journal(path);
+    journal.record({}, {"type": "transfer", "transaction": ["a", "b", 1, 2, 1.0]});
+    journal.close();
+
+    # Act
+    reopened: brp.Journal = brp.Journal(path);
+    entry: dict = reopened.record({}, {"type": "transfer", "transaction": ["c", "d", 1, 2, 2.0]});
+    reopened.close();
+
+    # Assert
+    assert entry["seq"] == 1;
+    assert [entry["seq"] for entry in reopened.read_from(1)] == [1];
+
+
+def test_journal_removes_torn_last_entry(tmp_path):
+    # Arrange
+    path: str = str(tmp_path / "journal.log");
+    journal: brp.Journal = brp.Journal(path);
+    journal.record({}, {"type": "transfer", "transaction": ["a", "b", 1, 2, 1.0]});
+    journal.close();
+    with open(path, "a", encoding="utf-8") as output:
+        output.write('{"seq": 1, "type": "tra');
+
+    # Act
+    reopened: brp.Journal = brp.Journal(path);
+    entry: dict = reopened.record({}, {"type": "transfer", "transaction": ["c", "d", 1, 2, 2.0]});
+    reopened.close();
+
+    # Assert
+    assert entry["seq"] == 1;
+    assert [entry["transaction"][0] for entry in reopened.read_from(0)] == ["a", "c"];
+
+
+def test_truncate_torn_entry_without_any_newline(tmp_path):
+    # Arrange
+    path: str = str(tmp_path / "journal.log");
+    with open(path, "w", encoding="utf-8") as output:
+        output.write('{"seq": 0, "ty');
+
+    # Act
+    removed: int = brp.truncate_torn_entry(path, block_size=4);
+
+    # Assert
+    assert removed == 14;
+    assert os.path.getsize(path) == 0;
+
+
+# Tests for replication
+
+
+def test_follower_catches_up_and_streams(tmp_path):
+    # Arrange
+    primary: dict[int, dict[str, any]] = create_mock_accounts();
+    replica: dict[int, dict[str, any]] = copy.deepcopy(primary);
+    journal: brp.Journal = brp.Journal(str(tmp_path / "journal.log"));
+    bk.event_listeners.append(journal.record);
+    server: brp.ReplicationServer = brp.ReplicationServer(journal);
+    follower: brp.Follower | None = None;
+    try:
+        bk.create_account(primary, 1003, "Charlie", "Brown", "555555555", 300.0);
+        port: int = server.start();
+        follower = brp.Follower(replica, "127.0.0.1", port);
+
+        # Act
+        follower.start();
+        caught_up: bool = follower.wait_for(0, timeout=5);
+        transaction: tuple = ("2024-08-02 10:00:00", "2024-08-02 10:00:00", 1003, 1002, 25.0);
+        bk.enqueue_transaction(primary, transaction);
+        bk.settle_transaction(primary, transaction, "2024-08-02 10:00:01");
+        streamed: bool = follower.wait_for(2, timeout=5);
+    finally:
+        bk.event_listeners.remove(journal.record);
+        if follower is not None:
+            follower.stop();
+        server.stop();
+        journal.close();
+
+    # Assert
+    assert caught_up and streamed;
+    assert bi.diff_stores(primary, replica) == [];
+    assert follower.metrics()["applied_seq"] == 2;
+    assert follower.metrics()["lag_events"] == 0;
+
+
+def test_apply_event_rejects_unknown_type():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+
+    # Act
+    with pytest.raises(ValueError) as ex:
+        brp.apply_event(accounts, {"type": "unknown"});
+
+    # Assert
+    assert str(ex.value) == "Unknown event type 'unknown'.";
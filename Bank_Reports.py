@@ -0,0 +1,235 @@
+import csv
+import heapq
+import json
+import sys
+from io import StringIO
+from itertools import islice
+from typing import Iterable, TextIO
+
+import Bank_Accounts as bk
+import Bank_History as bh
+
+# Number of characters collected before a buffered chunk is written out
+CHUNK_SIZE: int = 1 << 16;
+
+# Columns written for every account when exporting a report as CSV
+CSV_COLUMNS: tuple[str, ...] = ("account_number", "first_name", "last_name", "id_number", "balance",
+                                "transactions_to_execute", "transaction_history");
+
+
+# Function to list the account numbers of a report in display order
+def report_account_numbers(accounts: dict[int, dict[str, any]], report: str, count: int | None = None,
+                           after: int | None = None) -> Iterable[int]:
+    """
+        Returns the account numbers of an account report in the order the report shows them.
+
+        When only the first count accounts are needed, the sorted reports select them with a heap in
+        O(n log count) instead of sorting every account. Ties keep the order of the accounts dictionary.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            report (str): 'accounts' for all accounts (report 1), 'balance' for accounts sorted by balance
+                          (report 5), 'richest' for the largest balances first, or 'overdrawn' for the accounts with
+                          a negative balance, most negative first.
+            count (int | None): The number of leading accounts needed, or None for all (default is None).
+            after (int | None): A cursor for the 'accounts' report: only the accounts with a larger account number
+                                are listed, in account number order (default is None).
+
+        Returns:
+            Iterable[int]: The account numbers in report order.
+
+        Raises:
+            ValueError: If the report name is unknown, or a cursor is given for a sorted report.
+    """
+
+    if after is not None and report != "accounts":
+        raise ValueError("A cursor can only be used with the accounts report.");
+
+    def balance(account_number: int) -> int:
+        return accounts[account_number]["balance_cents"];
+
+    if report == "accounts":
+        if after is None:
+            return iter(accounts);
+        following: Iterable[int] = (account_number for account_number in accounts if account_number > after);
+        return heapq.nsmallest(count, following) if count is not None else sorted(following);
+    if report == "balance":
+        return heapq.nsmallest(count, accounts, key=balance) if count is not None else sorted(accounts, key=balance);
+    if report == "richest":
+        return heapq.nlargest(count, accounts, key=balance) if count is not None else \
+            sorted(accounts, key=balance, reverse=True);
+    if report == "overdrawn":
+        overdrawn: Iterable[int] = (account_number for account_number in accounts if balance(account_number) < 0);
+        return heapq.nsmallest(count, overdrawn, key=balance) if count is not None else sorted(overdrawn, key=balance);
+    raise ValueError(f"Unknown report '{report}'.");
+
+
+# Function to select one page of a report
+def paginate(items: Iterable[any], page: int = 1, limit: int | None = None) -> Iterable[any]:
+    """
+        Selects one page of items without materializing the pages before it.
+
+        Args:
+            items (Iterable): The items of the whole report.
+            page (int): The 1-based page number (default is 1).
+            limit (int | None): The page size, or None for everything (default is None).
+
+        Returns:
+            Iterable: The items of the requested page.
+
+        Raises:
+            ValueError: If the page or the limit is not positive.
+    """
+
+    if page < 1:
+        raise ValueError("The page number must be a positive number.");
+    if limit is None:
+        return items;
+    if limit < 1:
+        raise ValueError("The limit must be a positive number.");
+    start: int = (page - 1) * limit;
+    return islice(items, start, start + limit);
+
+
+# Function to write text in large buffered chunks
+def write_chunked(blocks: Iterable[str], stream: TextIO, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+        Joins text blocks into chunks of about chunk_size characters and writes each chunk at once.
+
+        Args:
+            blocks (Iterable[str]): The text blocks to write, each ending with a newline.
+            stream (TextIO): The stream to write to.
+            chunk_size (int): The number of characters buffered before a write (default is CHUNK_SIZE).
+
+        Returns:
+            int: The number of blocks written.
+    """
+
+    buffer: list[str] = [];
+    buffered: int = 0;
+    count: int = 0;
+    for block in blocks:
+        buffer.append(block);
+        buffered += len(block);
+        count += 1;
+        if buffered >= chunk_size:
+            stream.write("".join(buffer));
+            buffer.clear();
+            buffered = 0;
+    if buffer:
+        stream.write("".join(buffer));
+    stream.flush();
+    return count;
+
+
+# Function to convert an account to a JSON/CSV friendly row
+def account_row(account_number: int, account: dict[str, any]) -> dict[str, any]:
+    """
+        Converts an account to a flat row with the balance in currency units. The transaction history
+        includes the rows archived to history segments.
+
+        Args:
+            account_number (int): The account number.
+            account (dict): The account details.
+
+        Returns:
+            dict: The account row.
+    """
+
+    return {
+        "account_number": account_number,
+        "first_name": account["first_name"],
+        "last_name": account["last_name"],
+        "id_number": account["id_number"],
+        "balance": bk.from_cents(account["balance_cents"]),
+        "transactions_to_execute": account["transactions_to_execute"],
+        "transaction_history": list(bh.iter_history(account))
+    };
+
+
+# Function to render account reports as text, CSV or JSON
+def render_accounts(accounts: dict[int, dict[str, any]], account_numbers: Iterable[int], stream: TextIO,
+                    output_format: str = "text", chunk_size: int = CHUNK_SIZE) -> int:
+    """
+        Renders the given accounts to a stream in buffered chunks.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            account_numbers (Iterable[int]): The account numbers to render, in order.
+            stream (TextIO): The stream to write to.
+            output_format (str): 'text', 'csv' or 'json' (default is 'text').
+            chunk_size (int): The number of characters buffered before a write (default is CHUNK_SIZE).
+
+        Returns:
+            int: The number of accounts rendered.
+
+        Raises:
+            ValueError: If the output format is unknown.
+    """
+
+    if output_format == "text":
+        blocks: Iterable[str] = (bk.format_account_details(account_number, accounts[account_number]) + "\n"
+                                 for account_number in account_numbers);
+        return write_chunked(blocks, stream, chunk_size);
+
+    if output_format == "csv":
+        row_buffer: StringIO = StringIO();
+        writer = csv.writer(row_buffer);
+
+        def take_row(values: Iterable[any]) -> str:
+            writer.writerow(values);
+            text: str = row_buffer.getvalue();
+            row_buffer.seek(0);
+            row_buffer.truncate();
+            return text;
+
+        stream.write(take_row(CSV_COLUMNS));
+        rows: Iterable[str] = (take_row(account_row(account_number, accounts[account_number]).values())
+                               for account_number in account_numbers);
+        return write_chunked(rows, stream, chunk_size);
+
+    if output_format == "json":
+        def json_blocks() -> Iterable[str]:
+            separator: str = "\n";
+            for account_number in account_numbers:
+                yield separator + json.dumps(account_row(account_number, accounts[account_number]));
+                separator = ",\n";
+
+        stream.write("[");
+        count: int = write_chunked(json_blocks(), stream, chunk_size);
+        stream.write("\n]\n" if count else "]\n");
+        stream.flush();
+        return count;
+
+    raise ValueError(f"Unknown output format '{output_format}'.");
+
+
+# Function to export a paged account report to a stream or a file
+def export_report(accounts: dict[int, dict[str, any]], report: str = "accounts", output_format: str = "text",
+                  page: int = 1, limit: int | None = None, output_path: str | None = None,
+                  after: int | None = None) -> int:
+    """
+        Exports one page of an account report to stdout or to a file.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            report (str): The report name, see report_account_numbers (default is 'accounts').
+            output_format (str): 'text', 'csv' or 'json' (default is 'text').
+            page (int): The 1-based page number (default is 1).
+            limit (int | None): The page size, or None for the whole report (default is None).
+            output_path (str | None): The file to write to, or None for stdout (default is None).
+            after (int | None): The last account number of the previous page of the 'accounts' report; the page
+                                starts after it (default is None).
+
+        Returns:
+            int: The number of accounts exported.
+    """
+
+    # Only the accounts up to the end of the requested page are selected
+    count: int | None = page * limit if limit is not None and page >= 1 and limit >= 1 else None;
+    account_numbers: Iterable[int] = paginate(report_account_numbers(accounts, report, count, after), page, limit);
+    if output_path is None:
+        return render_accounts(accounts, account_numbers, sys.stdout, output_format);
+    with open(output_path, "w", encoding="utf-8", newline="") as stream:
+        return render_accounts(accounts, account_numbers, stream, output_format);
+
@@ -0,0 +1,206 @@
+import Bank_History as bh
+import Bank_Reports as br
+import pytest
+import json
+from datetime import datetime, timedelta
+from io import StringIO
+
+
+def create_mock_accounts():
+    return {
+        1001: {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "id_number": "123456789",
+            "balance_cents": 250000,
+            "transactions_to_execute": [],
+            "transaction_history": [
+                ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 100.00, "2024-08-01 10:00:01")
+            ]
+        },
+        1002: {
+            "first_name": "Bob",
+            "last_name": "Johnson",
+            "id_number": "987654321",
+            "balance_cents": 150000,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        },
+        1003: {
+            "first_name": "Charlie",
+            "last_name": "Brown",
+            "id_number": "555555555",
+            "balance_cents": -2050,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+    };
+
+
+# Tests for paginate function
+
+
+def test_paginate_second_page():
+    # Act
+    actual: list[int] = list(br.paginate(iter(range(10)), page=2, limit=3));
+
+    # Assert
+    assert actual == [3, 4, 5];
+
+
+def test_paginate_invalid_page():
+    with pytest.raises(ValueError) as ex:
+        br.paginate(iter(range(10)), page=0, limit=3);
+
+    # Assert
+    assert str(ex.value) == "The page number must be a positive number.";
+
+
+# Tests for write_chunked function
+
+
+class CountingStream(StringIO):
+    def __init__(self):
+        super().__init__();
+        self.writes: int = 0;
+
+    def write(self, text):
+        self.writes += 1;
+        return super().write(text);
+
+
+def test_write_chunked_buffers_small_blocks():
+    # Arrange
+    stream: CountingStream = CountingStream();
+    blocks: list[str] = [f"line {i}\n" for i in range(1000)];
+
+    # Act
+    count: int = br.write_chunked(blocks, stream, chunk_size=4096);
+
+    # Assert
+    assert count == 1000;
+    assert stream.getvalue() == "".join(blocks);
+    assert stream.writes < 10;
+
+
+# Tests for render_accounts and export_report functions
+
+
+def test_render_accounts_text_matches_account_details():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    stream: StringIO = StringIO();
+
+    # Act
+    br.render_accounts(accounts, [1002], stream);
+
+    # Assert
+    assert stream.getvalue() == "\nAccount 1002 details:\n" \
+                                "first_name: Bob\n" \
+                                "last_name: Johnson\n" \
+                                "id_number: 987654321\n" \
+                                "balance: 1500.00\n" \
+                                "transactions_to_execute: []\n" \
+                                "transaction_history: []\n";
+
+
+def test_render_accounts_csv():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    stream: StringIO = StringIO();
+
+    # Act
+    count: int = br.render_accounts(accounts, br.report_account_numbers(accounts, "balance"), stream, "csv");
+
+    # Assert
+    lines: list[str] = stream.getvalue().splitlines();
+    assert count == 3;
+    assert lines[0] == ",".join(br.CSV_COLUMNS);
+    assert [line.split(",")[0] for line in lines[1:]] == ["1003", "1002", "1001"];
+
+
+def test_export_report_json_page_to_file(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    output_path: str = str(tmp_path / "report.json");
+
+    # Act
+    count: int = br.export_report(accounts, "accounts", "json", page=2, limit=2, output_path=output_path);
+
+    # Assert
+    with open(output_path, encoding="utf-8") as stream:
+        rows: list[dict[str, any]] = json.load(stream);
+    assert count == 1;
+    assert rows == [{"account_number": 1003, "first_name": "Charlie", "last_name": "Brown",
+                     "id_number": "555555555", "balance": -20.5, "transactions_to_execute": [],
+                     "transaction_history": []}];
+
+
+def test_export_report_includes_archived_history(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    bh.archive_all(accounts, str(tmp_path / "segments"), timedelta(days=30), now=datetime(2024, 9, 15));
+    output_path: str = str(tmp_path / "report.json");
+
+    # Act
+    br.export_report(accounts, "accounts", "json", limit=1, output_path=output_path);
+
+    # Assert
+    with open(output_path, encoding="utf-8") as stream:
+        rows: list[dict[str, any]] = json.load(stream);
+    assert accounts[1001]["transaction_history"] == [];
+    assert rows[0]["transaction_history"] == [
+        ["2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 100.00, "2024-08-01 10:00:01"]];
+
+
+# Tests for report_account_numbers function
+
+
+def test_report_account_numbers_top_n_matches_full_sort():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    accounts[1004] = dict(accounts[1002]);
+
+    # Act
+    richest: list[int] = list(br.report_account_numbers(accounts, "richest", count=2));
+    poorest: list[int] = list(br.report_account_numbers(accounts, "balance", count=3));
+
+    # Assert
+    assert richest == list(br.report_account_numbers(accounts, "richest"))[:2] == [1001, 1002];
+    assert poorest == list(br.report_account_numbers(accounts, "balance"))[:3] == [1003, 1002, 1004];
+
+
+def test_report_account_numbers_overdrawn():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    accounts[1004] = dict(accounts[1003], balance_cents=-10000);
+
+    # Act
+    overdrawn: list[int] = list(br.report_account_numbers(accounts, "overdrawn", count=5));
+
+    # Assert
+    assert overdrawn == [1004, 1003];
+
+
+def test_report_account_numbers_cursor_pages():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+
+    # Act
+    first_page: list[int] = list(br.report_account_numbers(accounts, "accounts", count=2, after=0));
+    next_page: list[int] = list(br.report_account_numbers(accounts, "accounts", count=2, after=first_page[-1]));
+    with pytest.raises(ValueError) as ex:
+        br.export_report(accounts, "balance", after=1001);
+
+    # Assert
+    assert first_page == [1001, 1002];
+    assert next_page == [1003];
+    assert str(ex.value) == "A cursor can only be used with the accounts report.";
+
+
+def test_export_report_unknown_report():
+    with pytest.raises(ValueError) as ex:
+        br.export_report(create_mock_accounts(), "unknown");
+
+    # Assert
+    assert str(ex.value) == "Unknown report 'unknown'.";
@@ -0,0 +1,210 @@
+import threading
+from datetime import datetime
+
+import Bank_Accounts as bk
+
+
+class TimingWheel:
+    """
+        A hierarchical timing wheel with one-second ticks.
+
+        Level 0 has one slot per second, and every higher level has one slot per full turn of the level below it.
+        Inserting an item and advancing one tick are O(1); items of a higher level are moved one level down
+        when the level below completes a turn. Items beyond the span of the top level wait in an overflow list
+        that is re-examined once per turn of the top level.
+    """
+
+    def __init__(self, start: int, slot_bits: int = 6, levels: int = 4) -> None:
+        """
+            Args:
+                start (int): The current time in whole seconds since the epoch.
+                slot_bits (int): log2 of the number of slots per level (default is 6, 64 slots).
+                levels (int): The number of levels (default is 4, a span of about 194 days).
+        """
+
+        self.current: int = start;
+        self.slot_bits: int = slot_bits;
+        self.slot_mask: int = (1 << slot_bits) - 1;
+        self.levels: int = levels;
+        self.wheels: list[list[list[tuple[int, any]]]] = [[[] for _ in range(1 << slot_bits)]
+                                                          for _ in range(levels)];
+        self.overflow: list[tuple[int, any]] = [];
+        self.ready: list[any] = [];
+        self.count: int = 0;
+
+    def insert(self, due: int, item: any) -> None:
+        """
+            Schedules an item for the given second. Items that are already due are returned by the next advance.
+
+            Args:
+                due (int): The due time in whole seconds since the epoch.
+                item (any): The item to schedule.
+        """
+
+        self.count += 1;
+        self._place(due, item);
+
+    def _place(self, due: int, item: any) -> None:
+        delta: int = due - self.current;
+        if delta <= 0:
+            self.ready.append(item);
+            return;
+        for level in range(self.levels):
+            if delta < 1 << (self.slot_bits * (level + 1)):
+                slot: int = (due >> (self.slot_bits * level)) & self.slot_mask;
+                self.wheels[level][slot].append((due, item));
+                return;
+        self.overflow.append((due, item));
+
+    def _cascade(self, level: int) -> None:
+        slot: int = (self.current >> (self.slot_bits * level)) & self.slot_mask;
+        bucket: list[tuple[int, any]] = self.wheels[level][slot];
+        self.wheels[level][slot] = [];
+        for due, item in bucket:
+            self._place(due, item);
+
+    def advance(self, now: int) -> list[any]:
+        """
+            Advances the wheel tick by tick up to the given second.
+
+            Args:
+                now (int): The current time in whole seconds since the epoch.
+
+            Returns:
+                list: The items that became due, in due order.
+        """
+
+        due_items: list[any] = self.ready;
+        self.ready = [];
+        while self.current < now:
+            self.current += 1;
+            if self.current & self.slot_mask == 0:
+                for level in range(1, self.levels):
+                    self._cascade(level);
+                    if (self.current >> (self.slot_bits * level)) & self.slot_mask != 0:
+                        break;
+                else:
+                    overflow: list[tuple[int, any]] = self.overflow;
+                    self.overflow = [];
+                    for due, item in overflow:
+                        self._place(due, item);
+                due_items.extend(self.ready);
+                self.ready = [];
+            slot: int = self.current & self.slot_mask;
+            bucket: list[tuple[int, any]] = self.wheels[0][slot];
+            if bucket:
+                self.wheels[0][slot] = [];
+                due_items.extend(item for _, item in bucket);
+        self.count -= len(due_items);
+        return due_items;
+
+
+# Function to convert a transaction's future time to whole seconds since the epoch
+def due_second(transaction: tuple[str, str, int, int, float]) -> int:
+    """
+        Returns the future time of a pending transaction as whole seconds since the epoch.
+
+        Args:
+            transaction (tuple): The pending transaction.
+
+        Returns:
+            int: The due time in seconds since the epoch, in local time like the rest of the interface.
+    """
+
+    return int(datetime.strptime(transaction[1], bk.TIME_FORMAT).timestamp());
+
+
+class DueTransactionExecutor(threading.Thread):
+    """
+        A background thread that settles pending transactions when their future time arrives.
+
+        Transactions are kept in a TimingWheel that is advanced once per tick, so a transaction is settled at most
+        tick_seconds (plus the time to settle the transactions before it) after it became due.
+    """
+
+    def __init__(self, accounts: dict[int, dict[str, any]], tick_seconds: float = 1.0,
+                 clock: bk.SystemClock | None = None) -> None:
+        """
+            Args:
+                accounts (dict): The dictionary containing all accounts.
+                tick_seconds (float): The time between two advances of the wheel (default is 1.0).
+                clock (SystemClock | None): The clock that decides when transactions are due, or None for the
+                                            system clock (default is None).
+        """
+
+        super().__init__(name="due-transaction-executor", daemon=True);
+        self.accounts: dict[int, dict[str, any]] = accounts;
+        self.tick_seconds: float = tick_seconds;
+        self.clock: bk.SystemClock = clock or bk.system_clock;
+        self.wheel: TimingWheel = TimingWheel(int(self.clock.time()));
+        self.wheel_lock: threading.Lock = threading.Lock();
+        self.stop_event: threading.Event = threading.Event();
+        self.settled: int = 0;
+        self.failed: list[tuple[tuple[str, str, int, int, float], Exception]] = [];
+
+    def schedule(self, transaction: tuple[str, str, int, int, float]) -> None:
+        """
+            Schedules a pending transaction for settlement at its future time.
+
+            Args:
+                transaction (tuple): The pending transaction.
+        """
+
+        with self.wheel_lock:
+            self.wheel.insert(due_second(transaction), transaction);
+
+    def schedule_pending(self) -> int:
+        """
+            Schedules every transaction that is already in the accounts' queues.
+
+            Returns:
+                int: The number of transactions scheduled.
+        """
+
+        count: int = 0;
+        for account in list(self.accounts.values()):
+            for transaction in list(account["transactions_to_execute"]):
+                self.schedule(transaction);
+                count += 1;
+        return count;
+
+    def run_once(self, now: float | None = None) -> list[tuple[str, str, int, int, float, str]]:
+        """
+            Advances the wheel to now and settles every transaction that became due.
+
+            Args:
+                now (float | None): The current time in seconds since the epoch, or None to read the clock.
+
+            Returns:
+                list: The executed transactions. Transactions that were already settled from the menu are skipped.
+        """
+
+        now = self.clock.time() if now is None else now;
+        with self.wheel_lock:
+            due_transactions: list[tuple[str, str, int, int, float]] = self.wheel.advance(int(now));
+
+        executed: list[tuple[str, str, int, int, float, str]] = [];
+        execution_time: str = self.clock.format(now);
+        for transaction in due_transactions:
+            try:
+                executed_transaction = bk.settle_transaction(self.accounts, transaction, execution_time);
+            except KeyError as e:
+                self.failed.append((transaction, e));
+                continue;
+            if executed_transaction is not None:
+                executed.append(executed_transaction);
+        self.settled += len(executed);
+        return executed;
+
+    def run(self) -> None:
+        while not self.stop_event.wait(self.tick_seconds):
+            self.run_once();
+
+    def stop(self) -> None:
+        """
+            Stops the background thread and waits for it to finish.
+        """
+
+        self.stop_event.set();
+        if self.is_alive():
+            self.join();
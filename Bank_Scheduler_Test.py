@@ -0,0 +1,117 @@
+import Bank_Scheduler as bs
+import random
+from datetime import datetime, timedelta
+
+
+def create_mock_accounts(future_time: str):
+    return {
+        1002: {
+            "first_name": "Bob",
+            "last_name": "Johnson",
+            "id_number": "987654321",
+            "balance_cents": 150000,
+            "transactions_to_execute": [("2024-08-01 12:00:00", future_time, 1002, 1003, 100.00)],
+            "transaction_history": []
+        },
+        1003: {
+            "first_name": "Charlie",
+            "last_name": "Brown",
+            "id_number": "555555555",
+            "balance_cents": 350075,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+    };
+
+
+# Tests for TimingWheel class
+
+
+def test_timing_wheel_returns_items_at_their_due_second():
+    # Arrange
+    start: int = 1_000_000;
+    wheel: bs.TimingWheel = bs.TimingWheel(start);
+    rng: random.Random = random.Random(7);
+    dues: list[int] = [start + rng.randint(1, 300_000) for _ in range(2000)];
+    for due in dues:
+        wheel.insert(due, due);
+
+    # Act
+    fired: dict[int, list[int]] = {};
+    for now in range(start + 1, start + 300_001, 997):
+        fired[now] = wheel.advance(now);
+    fired[start + 300_000] = wheel.advance(start + 300_000);
+
+    # Assert
+    previous: int = start;
+    for now, items in fired.items():
+        assert all(previous < item <= now for item in items);
+        previous = now;
+    assert sorted(item for items in fired.values() for item in items) == sorted(dues);
+    assert wheel.count == 0;
+
+
+def test_timing_wheel_overdue_and_overflow_items():
+    # Arrange
+    wheel: bs.TimingWheel = bs.TimingWheel(100, slot_bits=2, levels=2);
+
+    # Act
+    wheel.insert(50, "overdue");
+    wheel.insert(130, "overflow");
+
+    # Assert
+    assert wheel.advance(100) == ["overdue"];
+    assert wheel.advance(129) == [];
+    assert wheel.advance(130) == ["overflow"];
+
+
+# Tests for DueTransactionExecutor class
+
+
+def test_executor_settles_due_transactions():
+    # Arrange
+    future: datetime = datetime.now().replace(microsecond=0) + timedelta(seconds=30);
+    accounts: dict[int, dict[str, any]] = create_mock_accounts(future.strftime("%Y-%m-%d %H:%M:%S"));
+    executor: bs.DueTransactionExecutor = bs.DueTransactionExecutor(accounts);
+
+    # Act
+    scheduled: int = executor.schedule_pending();
+    early: list[tuple] = executor.run_once((future - timedelta(seconds=1)).timestamp());
+    on_time: list[tuple] = executor.run_once(future.timestamp());
+
+    # Assert
+    assert scheduled == 1;
+    assert early == [];
+    assert len(on_time) == 1;
+    assert accounts[1002]["balance_cents"] == 140000;
+    assert accounts[1003]["balance_cents"] == 360075;
+    assert accounts[1002]["transactions_to_execute"] == [];
+    assert accounts[1002]["transaction_history"][0][5] == future.strftime("%Y-%m-%d %H:%M:%S");
+
+
+def test_executor_skips_transactions_settled_from_the_menu():
+    # Arrange
+    future: datetime = datetime.now().replace(microsecond=0) + timedelta(seconds=30);
+    accounts: dict[int, dict[str, any]] = create_mock_accounts(future.strftime("%Y-%m-%d %H:%M:%S"));
+    executor: bs.DueTransactionExecutor = bs.DueTransactionExecutor(accounts);
+    executor.schedule_pending();
+    accounts[1002]["transactions_to_execute"].clear();
+
+    # Act
+    executed: list[tuple] = executor.run_once(future.timestamp());
+
+    # Assert
+    assert executed == [];
+    assert accounts[1002]["balance_cents"] == 150000;
+
+
+def test_executor_thread_stops():
+    # Arrange
+    executor: bs.DueTransactionExecutor = bs.DueTransactionExecutor({}, tick_seconds=0.01);
+
+    # Act
+    executor.start();
+    executor.stop();
+
+    # Assert
+    assert not executor.is_alive();
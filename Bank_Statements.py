@@ -0,0 +1,172 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+from typing import Callable
+
+import Bank_Accounts as bk
+import Bank_History as bh
+
+# File in the output directory that lists the shards already written, so an interrupted run can resume
+MANIFEST_NAME: str = "completed_shards.txt";
+
+
+# Function to format the statement of one account for a period
+def format_statement(account_number: int, account: dict[str, any], period_start: str, period_end: str) -> str:
+    """
+        Formats an account statement: the holder, the balance, the pending transfers and the transactions executed
+        in [period_start, period_end).
+
+        Args:
+            account_number (int): The account number.
+            account (dict): The account details.
+            period_start (str): The first moment of the period (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS).
+            period_end (str): The first moment after the period.
+
+        Returns:
+            str: The statement text.
+    """
+
+    lines: list[str] = [
+        f"Statement for account {account_number} ({period_start} - {period_end})",
+        f"Account holder: {account['first_name']} {account['last_name']} (ID {account['id_number']})",
+        f"Balance: {bk.format_cents(account['balance_cents'])}",
+        "Pending transfers:"
+    ];
+    lines.extend(f"  {transaction}" for transaction in account["transactions_to_execute"]);
+    lines.append("Executed transactions:");
+    lines.extend(f"  {transaction}" for transaction in
+                 bh.iter_history(account, period_start, period_end, bh.EXECUTION_TIME));
+    return "\n".join(lines) + "\n\n";
+
+
+# Function to name the statement file of a shard
+def shard_file_name(period_start: str, period_end: str, first: int, last: int) -> str:
+    """
+        Args:
+            period_start (str): The first moment of the period.
+            period_end (str): The first moment after the period.
+            first (int): The lowest account number of the shard's range.
+            last (int): The highest account number of the shard's range.
+
+        Returns:
+            str: The file name, unique to the period and the account range.
+    """
+
+    period: str = f"{period_start}_{period_end}".replace(" ", "T").replace(":", "");
+    return f"statements-{period}-{first:06d}-{last:06d}.txt";
+
+
+# Function to write the statements of one shard of accounts
+def render_shard(first: int, last: int, shard: dict[int, dict[str, any]], directory: str, period_start: str,
+                 period_end: str) -> tuple[int, int, int]:
+    """
+        Writes the statements of a shard of accounts to one file. The file is written under a temporary name and
+        renamed when complete, so an interrupted run never leaves a partial statement file behind.
+
+        Args:
+            first (int): The lowest account number of the shard's range, used in the file name.
+            last (int): The highest account number of the shard's range, used in the file name.
+            shard (dict): The accounts of the shard.
+            directory (str): The output directory.
+            period_start (str): The first moment of the period.
+            period_end (str): The first moment after the period.
+
+        Returns:
+            tuple[int, int, int]: The range of the shard and the number of statements written.
+    """
+
+    path: str = os.path.join(directory, shard_file_name(period_start, period_end, first, last));
+    with open(path + ".tmp", "w", encoding="utf-8") as output:
+        output.write("".join(format_statement(account_number, account, period_start, period_end)
+                             for account_number, account in shard.items()));
+    os.replace(path + ".tmp", path);
+    return first, last, len(shard);
+
+
+# Function to read the shards completed by an earlier run
+def read_manifest(directory: str) -> set[tuple[str, str, int, int, int]]:
+    """
+        Args:
+            directory (str): The output directory.
+
+        Returns:
+            set: The period start, period end, account range and number of accounts of every completed shard.
+    """
+
+    path: str = os.path.join(directory, MANIFEST_NAME);
+    if not os.path.exists(path):
+        return set();
+    with open(path, encoding="utf-8") as manifest:
+        return {(period_start, period_end, int(first), int(last), int(count))
+                for period_start, period_end, first, last, count in
+                (line.rstrip("\n").split("\t") for line in manifest if line.strip())};
+
+
+# Function to export the statements of all accounts with a pool of worker processes
+def export_statements(accounts: dict[int, dict[str, any]], directory: str, period_start: str, period_end: str,
+                      shard_size: int = 1000, workers: int | None = None,
+                      progress: Callable[[int, int], None] | None = None) -> int:
+    """
+        Exports the statements of all accounts for a period, one file per shard. A shard covers a fixed range of
+        shard_size account numbers, so opening an account only changes the shard of its own range.
+
+        Shards are rendered in parallel by a process pool. A shard's accounts are copied for the pool only when it
+        is submitted, and at most two shards per worker are in flight, so the copies never add up to a second copy
+        of the store. Every completed shard is recorded in the manifest of the
+        output directory with its period, range and number of accounts, and shards recorded there are skipped, so
+        running the job again resumes it. Exports of different periods can share a directory.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            directory (str): The output directory. It is created if needed.
+            period_start (str): The first moment of the period.
+            period_end (str): The first moment after the period.
+            shard_size (int): The number of account numbers per shard (default is 1000).
+            workers (int | None): The number of worker processes; 1 renders in this process, None uses one per CPU
+                                  (default is None).
+            progress (Callable | None): Called with the completed and the total number of shards after each shard
+                                        (default is None).
+
+        Returns:
+            int: The number of statements written by this run.
+    """
+
+    os.makedirs(directory, exist_ok=True);
+    shards: dict[tuple[int, int], list[int]] = {};
+    for account_number in sorted(accounts):
+        first: int = account_number // shard_size * shard_size;
+        shards.setdefault((first, first + shard_size - 1), []).append(account_number);
+    completed: set[tuple[str, str, int, int, int]] = read_manifest(directory);
+    pending: list[tuple[tuple[int, int], list[int]]] = [
+        (bounds, shard) for bounds, shard in shards.items()
+        if (period_start, period_end, *bounds, len(shard)) not in completed];
+    done: int = len(shards) - len(pending);
+    written: int = 0;
+
+    with open(os.path.join(directory, MANIFEST_NAME), "a", encoding="utf-8") as manifest:
+        def record(first: int, last: int, count: int) -> None:
+            nonlocal done, written;
+            manifest.write(f"{period_start}\t{period_end}\t{first}\t{last}\t{count}\n");
+            manifest.flush();
+            done += 1;
+            written += count;
+            if progress is not None:
+                progress(done, len(shards));
+
+        if workers == 1:
+            for bounds, shard in pending:
+                record(*render_shard(*bounds, {n: accounts[n] for n in shard}, directory, period_start, period_end));
+            return written;
+
+        in_flight_limit: int = 2 * (workers or os.cpu_count() or 1);
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight: set[Future] = set();
+            for bounds, shard in pending:
+                if len(in_flight) >= in_flight_limit:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED);
+                    for future in finished:
+                        record(*future.result());
+                in_flight.add(pool.submit(render_shard, *bounds, {n: accounts[n] for n in shard}, directory,
+                                          period_start, period_end));
+            for future in as_completed(in_flight):
+                record(*future.result());
+    return written;
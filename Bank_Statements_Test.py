@@ -0,0 +1,156 @@
+import Bank_Statements as bst
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+
+def create_mock_accounts(count: int):
+    return {
+        1000 + i: {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "id_number": str(123456000 + i),
+            "balance_cents": 10000 + i * 100,
+            "transactions_to_execute": [("2024-08-20 10:00:00", "2024-09-05 10:00:00", 1000 + i, 1000, 10.00)],
+            "transaction_history": [
+                ("2024-07-30 10:00:00", "2024-07-31 10:00:00", 1000 + i, 1000, 5.00, "2024-07-31 10:00:01"),
+                ("2024-08-10 10:00:00", "2024-08-11 10:00:00", 1000 + i, 1000, 7.00, "2024-08-11 10:00:01")
+            ]
+        } for i in range(count)
+    };
+
+
+# Tests for format_statement function
+
+
+def test_format_statement_includes_only_period_history():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts(1);
+
+    # Act
+    statement: str = bst.format_statement(1000, accounts[1000], "2024-08-01", "2024-09-01");
+
+    # Assert
+    assert "Balance: 100.00" in statement;
+    assert "2024-09-05 10:00:00" in statement;
+    assert "2024-08-11 10:00:01" in statement;
+    assert "2024-07-31 10:00:01" not in statement;
+
+
+# Tests for export_statements function
+
+
+def test_export_statements_writes_shards_and_reports_progress(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts(5);
+    calls: list[tuple[int, int]] = [];
+
+    # Act
+    written: int = bst.export_statements(accounts, str(tmp_path), "2024-08-01", "2024-09-01", shard_size=2,
+                                        workers=1, progress=lambda done, total: calls.append((done, total)));
+
+    # Assert
+    assert written == 5;
+    assert calls == [(1, 3), (2, 3), (3, 3)];
+    assert sorted(os.listdir(tmp_path)) == [bst.MANIFEST_NAME, "statements-2024-08-01_2024-09-01-001000-001001.txt",
+                                            "statements-2024-08-01_2024-09-01-001002-001003.txt",
+                                            "statements-2024-08-01_2024-09-01-001004-001005.txt"];
+
+
+def test_export_statements_resumes(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts(5);
+    with open(tmp_path / bst.MANIFEST_NAME, "w", encoding="utf-8") as manifest:
+        manifest.write("2024-08-01\t2024-09-01\t1000\t1001\t2\n");
+
+    # Act
+    written: int = bst.export_statements(accounts, str(tmp_path), "2024-08-01", "2024-09-01", shard_size=2,
+                                        workers=1);
+
+    # Assert
+    assert written == 3;
+    assert not os.path.exists(tmp_path / bst.shard_file_name("2024-08-01", "2024-09-01", 1000, 1001));
+    assert bst.read_manifest(str(tmp_path)) == {("2024-08-01", "2024-09-01", 1000, 1001, 2),
+                                                ("2024-08-01", "2024-09-01", 1002, 1003, 2),
+                                                ("2024-08-01", "2024-09-01", 1004, 1005, 1)};
+
+
+def test_export_statements_with_process_pool(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts(4);
+
+    # Act
+    written: int = bst.export_statements(accounts, str(tmp_path), "2024-08-01", "2024-09-01", shard_size=2,
+                                        workers=2);
+
+    # Assert
+    with open(tmp_path / bst.shard_file_name("2024-08-01", "2024-09-01", 1002, 1003), encoding="utf-8") as output:
+        content: str = output.read();
+    assert written == 4;
+    assert "Statement for account 1002" in content;
+    assert "Statement for account 1003" in content;
+
+
+def test_export_statements_bounds_shards_in_flight(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts(20);
+    submitted: list = [];
+    in_flight: list[int] = [];
+    render_shard = bst.render_shard;
+
+    def slow_render_shard(*args):
+        time.sleep(0.01);
+        return render_shard(*args);
+
+    class CountingPool(ThreadPoolExecutor):
+        def submit(self, function, *args):
+            in_flight.append(sum(not future.done() for future in submitted) + 1);
+            submitted.append(super().submit(function, *args));
+            return submitted[-1];
+
+    # Act
+    with patch("Bank_Statements.ProcessPoolExecutor", CountingPool), \
+            patch("Bank_Statements.render_shard", slow_render_shard):
+        written: int = bst.export_statements(accounts, str(tmp_path), "2024-08-01", "2024-09-01", shard_size=1,
+                                            workers=2);
+
+    # Assert
+    assert written == 20;
+    assert len(submitted) == 20;
+    assert max(in_flight) <= 4;
+
+
+def test_export_statements_rewrites_only_changed_shard(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts(5);
+    bst.export_statements(accounts, str(tmp_path), "2024-08-01", "2024-09-01", shard_size=2, workers=1);
+    accounts[1005] = create_mock_accounts(6)[1005];
+
+    # Act
+    written: int = bst.export_statements(accounts, str(tmp_path), "2024-08-01", "2024-09-01", shard_size=2,
+                                        workers=1);
+
+    # Assert
+    with open(tmp_path / bst.shard_file_name("2024-08-01", "2024-09-01", 1004, 1005), encoding="utf-8") as output:
+        content: str = output.read();
+    assert written == 2;
+    assert "Statement for account 1004" in content;
+    assert "Statement for account 1005" in content;
+
+
+def test_export_statements_keeps_periods_apart(tmp_path):
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts(2);
+    bst.export_statements(accounts, str(tmp_path), "2024-07-01", "2024-08-01", shard_size=2, workers=1);
+
+    # Act
+    written: int = bst.export_statements(accounts, str(tmp_path), "2024-08-01", "2024-09-01", shard_size=2,
+                                        workers=1);
+
+    # Assert
+    with open(tmp_path / bst.shard_file_name("2024-07-01", "2024-08-01", 1000, 1001), encoding="utf-8") as output:
+        content: str = output.read();
+    assert written == 2;
+    assert "2024-07-31 10:00:01" in content;
+    assert "2024-08-11 10:00:01" not in content;
@@ -0,0 +1,275 @@
+import hashlib
+import pickle
+import shelve
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Iterator
+
+# Shelf key of the store's own metadata, kept apart from the account numbers
+METADATA_KEY: str = "metadata";
+
+
+class DiskAccountStore(MutableMapping):
+    """
+        A disk-backed account store: a dbm file, through shelve, that maps account numbers to pickled accounts.
+
+        Every read unpickles a new copy of the account and every write pickles it, so the store is meant to sit
+        behind a CachedAccounts cache rather than to be used directly by the menus. Besides the accounts, the file
+        holds one metadata dict, such as the journal position the accounts were saved at.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+            Args:
+                path (str): The dbm file. It is created if needed.
+        """
+
+        self.shelf: shelve.Shelf = shelve.open(path, flag="c", protocol=pickle.HIGHEST_PROTOCOL);
+
+    def __getitem__(self, account_number: int) -> dict[str, any]:
+        return self.shelf[str(account_number)];
+
+    def __setitem__(self, account_number: int, account: dict[str, any]) -> None:
+        self.shelf[str(account_number)] = account;
+
+    def __delitem__(self, account_number: int) -> None:
+        del self.shelf[str(account_number)];
+
+    def __contains__(self, account_number: object) -> bool:
+        return str(account_number) in self.shelf;
+
+    def __iter__(self) -> Iterator[int]:
+        # dbm files have no key order; accounts are listed in account number order like the menus expect
+        return iter(sorted(int(key) for key in self.shelf.keys() if key != METADATA_KEY));
+
+    def __len__(self) -> int:
+        return len(self.shelf) - (METADATA_KEY in self.shelf);
+
+    def read_metadata(self) -> dict[str, any]:
+        return self.shelf.get(METADATA_KEY, {});
+
+    def write_metadata(self, metadata: dict[str, any]) -> None:
+        self.shelf[METADATA_KEY] = metadata;
+
+    def clear_metadata(self) -> None:
+        self.shelf.pop(METADATA_KEY, None);
+
+    def close(self) -> None:
+        self.shelf.close();
+
+
+# Function to fingerprint the state of an account
+def fingerprint(account: dict[str, any]) -> bytes:
+    """
+        Args:
+            account (dict): The account details.
+
+        Returns:
+            bytes: A digest of the pickled account, which changes whenever the account changes.
+    """
+
+    return hashlib.blake2b(pickle.dumps(account, pickle.HIGHEST_PROTOCOL), digest_size=16).digest();
+
+
+class CachedAccounts(MutableMapping):
+    """
+        A bounded LRU cache of materialized accounts in front of a disk-backed store, used like the accounts dict.
+
+        The callers change the cached account dicts in place, as everywhere in Bank_Accounts, so the cache cannot
+        see individual changes. Instead it fingerprints every account when it is loaded and writes an account back
+        when it is evicted or flushed only if its fingerprint changed. Accounts that are only read never cost a
+        write.
+
+        An account dict must not be kept after the operation that got it from the cache, because it may be evicted
+        and written back. Operations that hold account dicts while they touch other accounts, such as a settlement
+        batch and its rollback, run inside pinned (Bank_Accounts.store_lock does this), so no account is evicted
+        until they end, however many accounts they touch.
+
+        journal_seq is the number of journal entries the accounts contain, so that a restart replays only the
+        newer entries. It is None when that is unknown, for example after a crash.
+    """
+
+    def __init__(self, store: MutableMapping, capacity: int = 10_000, journal_seq: int | None = None) -> None:
+        """
+            Args:
+                store (MutableMapping): The backing store, such as a DiskAccountStore.
+                capacity (int): The maximum number of accounts kept in memory (default is 10,000).
+                journal_seq (int | None): The number of journal entries already applied to the store
+                                          (default is None, unknown).
+
+            Raises:
+                ValueError: If the capacity is smaller than the two accounts of a transfer.
+        """
+
+        if capacity < 2:
+            raise ValueError("The cache must hold at least the two accounts of a transfer.");
+        self.store: MutableMapping = store;
+        self.capacity: int = capacity;
+        self.cache: OrderedDict[int, dict[str, any]] = OrderedDict();
+        self.fingerprints: dict[int, bytes] = {};
+        self.lock: threading.RLock = threading.RLock();
+        self.hits: int = 0;
+        self.misses: int = 0;
+        self.evictions: int = 0;
+        self.writes: int = 0;
+        self.pins: int = 0;
+        self.journal_seq: int | None = journal_seq;
+
+    def __getitem__(self, account_number: int) -> dict[str, any]:
+        with self.lock:
+            account: dict[str, any] | None = self.cache.get(account_number);
+            if account is not None:
+                self.hits += 1;
+                self.cache.move_to_end(account_number);
+                return account;
+            self.misses += 1;
+            account = self.store[account_number];
+            self.fingerprints[account_number] = fingerprint(account);
+            self.cache[account_number] = account;
+            self.evict();
+            return account;
+
+    def __setitem__(self, account_number: int, account: dict[str, any]) -> None:
+        # New and replaced accounts are written through, so the store always knows every account number
+        with self.lock:
+            self.store[account_number] = account;
+            self.writes += 1;
+            self.fingerprints[account_number] = fingerprint(account);
+            self.cache[account_number] = account;
+            self.cache.move_to_end(account_number);
+            self.evict();
+
+    def __delitem__(self, account_number: int) -> None:
+        with self.lock:
+            self.cache.pop(account_number, None);
+            self.fingerprints.pop(account_number, None);
+            del self.store[account_number];
+
+    def __contains__(self, account_number: object) -> bool:
+        with self.lock:
+            return account_number in self.cache or account_number in self.store;
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.store);
+
+    def __len__(self) -> int:
+        return len(self.store);
+
+    def write_back(self, account_number: int) -> bool:
+        """
+            Writes a cached account to the store if it changed since it was loaded or last written.
+
+            Args:
+                account_number (int): The account number of a cached account.
+
+            Returns:
+                bool: True if the account was written.
+        """
+
+        account: dict[str, any] = self.cache[account_number];
+        current: bytes = fingerprint(account);
+        if current == self.fingerprints.get(account_number):
+            return False;
+        self.store[account_number] = account;
+        self.fingerprints[account_number] = current;
+        self.writes += 1;
+        return True;
+
+    @contextmanager
+    def pinned(self) -> Iterator[None]:
+        """
+            Keeps every account in memory while the context is open, even beyond the capacity. The cache is
+            trimmed back to its capacity when the outermost pinned context ends.
+        """
+
+        with self.lock:
+            self.pins += 1;
+        try:
+            yield;
+        finally:
+            with self.lock:
+                self.pins -= 1;
+                self.evict();
+
+    def evict(self) -> None:
+        """
+            Writes back and drops the least recently used accounts until the cache is within its capacity, unless
+            the accounts are pinned.
+        """
+
+        if self.pins:
+            return;
+        while len(self.cache) > self.capacity:
+            account_number: int = next(iter(self.cache));
+            self.write_back(account_number);
+            del self.cache[account_number];
+            del self.fingerprints[account_number];
+            self.evictions += 1;
+
+    def flush(self) -> int:
+        """
+            Writes every changed cached account to the store.
+
+            Returns:
+                int: The number of accounts written.
+        """
+
+        with self.lock:
+            return sum(self.write_back(account_number) for account_number in list(self.cache));
+
+    def stats(self) -> dict[str, any]:
+        """
+            Returns:
+                dict: The hits, misses, hit ratio, evictions and writes since the cache was created, and the number
+                      of cached accounts with the capacity.
+        """
+
+        lookups: int = self.hits + self.misses;
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions, "writes": self.writes, "cached": len(self.cache),
+                "capacity": self.capacity};
+
+    def close(self) -> None:
+        """
+            Flushes the cache, saves the journal position if it is known and the store keeps metadata, and closes
+            the store, if it can be closed.
+        """
+
+        with self.lock:
+            self.flush();
+            if self.journal_seq is not None and hasattr(self.store, "write_metadata"):
+                self.store.write_metadata({"journal_seq": self.journal_seq});
+            if hasattr(self.store, "close"):
+                self.store.close();
+
+
+# Function to open a disk-backed store behind a cache
+def open_cached_store(path: str, initial_accounts: dict[int, dict[str, any]],
+                      capacity: int = 10_000) -> CachedAccounts:
+    """
+        Opens a disk-backed account store behind an LRU cache. A new, empty store is first filled with the initial
+        accounts.
+
+        The journal position saved by the last close is read and removed from the file until the store is closed
+        again, so a store that was not closed cleanly, whose accounts may have been written back partway through a
+        session, opens with an unknown journal position.
+
+        Args:
+            path (str): The dbm file.
+            initial_accounts (dict): The accounts a new store starts with.
+            capacity (int): The maximum number of accounts kept in memory (default is 10,000).
+
+        Returns:
+            CachedAccounts: The cached store, used like the accounts dict.
+    """
+
+    store: DiskAccountStore = DiskAccountStore(path);
+    journal_seq: int | None = store.read_metadata().get("journal_seq");
+    store.clear_metadata();
+    if len(store) == 0:
+        for account_number, account in initial_accounts.items():
+            store[account_number] = account;
+        journal_seq = 0;
+    return CachedAccounts(store, capacity, journal_seq);
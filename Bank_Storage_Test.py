@@ -0,0 +1,197 @@
+from datetime import timedelta
+
+import pytest
+
+import Bank_Accounts as bk
+import Bank_History as bh
+import Bank_Storage as bsg
+
+
+def create_mock_accounts():
+    return {
+        1001 + i: {
+            "first_name": f"Customer{i}",
+            "last_name": "Smith",
+            "id_number": f"{100000000 + i}",
+            "balance_cents": 100000,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+        for i in range(5)
+    };
+
+
+# Tests for CachedAccounts class
+
+
+def test_cache_counts_hits_and_misses(tmp_path):
+    # Arrange
+    accounts: bsg.CachedAccounts = bsg.open_cached_store(str(tmp_path / "accounts"), create_mock_accounts(), 2);
+
+    # Act
+    for account_number in [1001, 1001, 1002, 1003, 1001]:
+        accounts[account_number];
+    stats: dict = accounts.stats();
+    accounts.close();
+
+    # Assert
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["cached"]) == (1, 4, 2, 2);
+    assert stats["writes"] == 0;
+
+
+def test_cache_writes_back_changed_accounts_only(tmp_path):
+    # Arrange
+    path: str = str(tmp_path / "accounts");
+    accounts: bsg.CachedAccounts = bsg.open_cached_store(path, create_mock_accounts(), 2);
+    transaction: tuple = ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 100.00);
+
+    # Act
+    bk.enqueue_transaction(accounts, transaction);
+    bk.settle_transaction(accounts, transaction, "2024-08-01 10:00:01");
+    for account_number in [1003, 1004, 1005]:
+        accounts[account_number];
+    writes: int = accounts.stats()["writes"];
+    accounts.close();
+    reopened: bsg.DiskAccountStore = bsg.DiskAccountStore(path);
+
+    # Assert
+    assert writes == 2;
+    assert reopened[1001]["balance_cents"] == 90000;
+    assert reopened[1002]["balance_cents"] == 110000;
+    assert reopened[1001]["transaction_history"] == [transaction + ("2024-08-01 10:00:01",)];
+    assert list(reopened) == [1001, 1002, 1003, 1004, 1005];
+    reopened.close();
+
+
+def test_cache_writes_new_accounts_through(tmp_path):
+    # Arrange
+    path: str = str(tmp_path / "accounts");
+    accounts: bsg.CachedAccounts = bsg.open_cached_store(path, create_mock_accounts(), 2);
+
+    # Act
+    bk.create_account(accounts, 1006, "John", "Doe", "123456789", 50.00);
+    count: int = len(accounts);
+    accounts.close();
+    reopened: bsg.DiskAccountStore = bsg.DiskAccountStore(path);
+
+    # Assert
+    assert count == 6;
+    assert reopened[1006]["first_name"] == "John";
+    reopened.close();
+
+
+def test_cache_rejects_tiny_capacity():
+    with pytest.raises(ValueError) as ex:
+        bsg.CachedAccounts({}, capacity=1);
+
+    # Assert
+    assert str(ex.value) == "The cache must hold at least the two accounts of a transfer.";
+
+
+def test_cache_rolls_back_batch_larger_than_capacity(tmp_path):
+    # Arrange
+    path: str = str(tmp_path / "accounts");
+    initial: dict[int, dict[str, any]] = {1001 + i: account for i, account in enumerate(
+        list(create_mock_accounts().values()) * 2)};
+    accounts: bsg.CachedAccounts = bsg.open_cached_store(path, initial, 3);
+    transactions: list[tuple] = [("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, target, 1.00)
+                                 for target in [*range(1002, 1010), 999]];
+    for transaction in transactions:
+        bk.enqueue_transaction(accounts, transaction);
+
+    # Act
+    with pytest.raises(KeyError):
+        bk.settle_batch(accounts, transactions, "2024-08-01 10:00:01");
+    cached: int = accounts.stats()["cached"];
+    accounts.close();
+    reopened: bsg.DiskAccountStore = bsg.DiskAccountStore(path);
+
+    # Assert
+    assert cached == 3;
+    assert [reopened[account_number]["balance_cents"] for account_number in range(1001, 1011)] == [100000] * 10;
+    assert len(reopened[1001]["transactions_to_execute"]) == 9;
+    reopened.close();
+
+
+def test_cache_keeps_archived_history(tmp_path):
+    # Arrange
+    path: str = str(tmp_path / "accounts");
+    initial: dict[int, dict[str, any]] = create_mock_accounts();
+    for account_number, account in initial.items():
+        account["transaction_history"] = [("2024-08-01 10:00:00", "2024-08-01 10:00:00", account_number, 1001, 1.00,
+                                           "2024-08-01 10:00:01")];
+    accounts: bsg.CachedAccounts = bsg.open_cached_store(path, initial, 2);
+
+    # Act
+    archived: int = bh.archive_all(accounts, str(tmp_path / "segments"), timedelta(days=1),
+                                   lock=bk.settlement_lock);
+    accounts.close();
+    reopened: bsg.DiskAccountStore = bsg.DiskAccountStore(path);
+
+    # Assert
+    assert archived == 5;
+    for account_number in range(1001, 1006):
+        assert reopened[account_number]["transaction_history"] == [];
+        assert len(reopened[account_number]["history_segments"]) == 1;
+    reopened.close();
+
+
+def test_store_saves_journal_position_on_close(tmp_path):
+    # Arrange
+    path: str = str(tmp_path / "accounts");
+    accounts: bsg.CachedAccounts = bsg.open_cached_store(path, create_mock_accounts(), 2);
+    accounts.journal_seq = 7;
+
+    # Act
+    accounts.close();
+    reopened: bsg.CachedAccounts = bsg.open_cached_store(path, {});
+
+    # Assert
+    assert reopened.journal_seq == 7;
+    assert list(reopened) == [1001, 1002, 1003, 1004, 1005];
+    assert len(reopened) == 5;
+    reopened.close();
+
+
+def test_store_not_closed_has_unknown_journal_position(tmp_path):
+    # Arrange
+    path: str = str(tmp_path / "accounts");
+    accounts: bsg.CachedAccounts = bsg.open_cached_store(path, create_mock_accounts(), 2);
+    accounts.journal_seq = 7;
+    accounts.close();
+
+    # Act
+    crashed: bsg.CachedAccounts = bsg.open_cached_store(path, {});
+    crashed.store.close();
+    reopened: bsg.CachedAccounts = bsg.open_cached_store(path, {});
+
+    # Assert
+    assert crashed.journal_seq == 7;
+    assert reopened.journal_seq is None;
+    reopened.close();
+
+
+def test_read_snapshot_loads_accounts_through_cache(tmp_path):
+    # Arrange
+    initial: dict[int, dict[str, any]] = {
+        1001 + i: {"first_name": f"Customer{i}", "last_name": "Smith", "id_number": f"{100000000 + i}",
+                   "balance_cents": 100000, "transactions_to_execute": [], "transaction_history": []}
+        for i in range(2000)
+    };
+    accounts: bsg.CachedAccounts = bsg.open_cached_store(str(tmp_path / "accounts"), initial, 10);
+    transaction: tuple = ("2024-08-01 10:00:00", "2024-08-01 10:00:00", 1001, 1002, 100.00);
+
+    # Act
+    with bk.ReadSnapshot(accounts) as snapshot:
+        misses_after_snapshot: int = accounts.misses;
+        bk.enqueue_transaction(accounts, transaction);
+        bk.settle_transaction(accounts, transaction, "2024-08-01 10:00:01");
+        total: int = sum(account["balance_cents"] for account in snapshot.values());
+        cached: int = accounts.stats()["cached"];
+
+    # Assert
+    assert misses_after_snapshot == 0;
+    assert total == 2000 * 100000;
+    assert cached <= 10;
+    assert accounts[1001]["balance_cents"] == 90000;
+    accounts.close();
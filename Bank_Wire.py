@@ -0,0 +1,325 @@
+import struct
+from datetime import date
+from typing import BinaryIO, Callable, Iterator
+
+import Bank_Accounts as bk
+import Bank_History as bh
+
+# Record types of a batch frame
+TRANSFER: int = 1;
+SETTLEMENT: int = 2;
+ACCOUNT: int = 3;
+
+# Fixed layouts, little-endian: times are whole seconds since 0001-01-01 and amounts are integer cents
+TRANSFER_RECORD: struct.Struct = struct.Struct("<qqqqq");  # created, due, source, target, amount
+SETTLEMENT_RECORD: struct.Struct = struct.Struct("<qqqqqq");  # created, due, source, target, amount, executed
+ACCOUNT_HEADER: struct.Struct = struct.Struct("<qqHHH");  # account number, balance, lengths of the three names
+FRAME_HEADER: struct.Struct = struct.Struct("<BII");  # record type, number of records, payload bytes
+
+# Number of seconds in a day
+DAY_SECONDS: int = 24 * 60 * 60;
+
+
+# Function to encode a timestamp as whole seconds
+def encode_time(timestamp: str) -> int:
+    """
+        Encodes a 'YYYY-MM-DD HH:MM:SS' timestamp without parsing it through strptime. The time is taken as it is
+        written, without a time zone, so decoding always gives back the same text.
+
+        Args:
+            timestamp (str): The timestamp in TIME_FORMAT.
+
+        Returns:
+            int: The seconds since 0001-01-01 00:00:00.
+
+        Raises:
+            ValueError: If the timestamp is not in TIME_FORMAT.
+    """
+
+    if len(timestamp) != 19 or timestamp[4] != "-" or timestamp[7] != "-" or timestamp[10] != " " or \
+            timestamp[13] != ":" or timestamp[16] != ":":
+        raise ValueError(f"'{timestamp}' does not match the format YYYY-MM-DD HH:MM:SS.");
+    day: int = date(int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10])).toordinal();
+    return day * DAY_SECONDS + int(timestamp[11:13]) * 3600 + int(timestamp[14:16]) * 60 + int(timestamp[17:19]);
+
+
+# Function to decode whole seconds into a timestamp
+def decode_time(seconds: int) -> str:
+    """
+        Args:
+            seconds (int): The seconds since 0001-01-01 00:00:00.
+
+        Returns:
+            str: The timestamp in TIME_FORMAT.
+    """
+
+    day, seconds = divmod(seconds, DAY_SECONDS);
+    hours, seconds = divmod(seconds, 3600);
+    minutes, seconds = divmod(seconds, 60);
+    return f"{date.fromordinal(day).isoformat()} {hours:02d}:{minutes:02d}:{seconds:02d}";
+
+
+# Function to encode a pending transaction
+def encode_transfer(transaction: tuple[str, str, int, int, float]) -> bytes:
+    """
+        Args:
+            transaction (tuple): A pending transaction (creation time, future time, source, target, amount).
+
+        Returns:
+            bytes: The 40-byte record.
+    """
+
+    creation_time, future_time, source, target, amount = transaction;
+    return TRANSFER_RECORD.pack(encode_time(creation_time), encode_time(future_time), source, target,
+                                bk.to_cents(amount));
+
+
+# Function to decode a pending transaction
+def decode_transfer(record: bytes) -> tuple[str, str, int, int, float]:
+    """
+        Args:
+            record (bytes): A record written by encode_transfer.
+
+        Returns:
+            tuple: The pending transaction.
+    """
+
+    return unpack_transfer(TRANSFER_RECORD.unpack(record));
+
+
+# Function to turn the unpacked fields of a transfer record into a pending transaction
+def unpack_transfer(fields: tuple[int, int, int, int, int]) -> tuple[str, str, int, int, float]:
+    """
+        Args:
+            fields (tuple): The integers of a transfer record.
+
+        Returns:
+            tuple: The pending transaction.
+    """
+
+    created, due, source, target, cents = fields;
+    return decode_time(created), decode_time(due), source, target, bk.from_cents(cents);
+
+
+# Function to encode an executed transaction
+def encode_settlement(executed_transaction: tuple[str, str, int, int, float, str]) -> bytes:
+    """
+        Args:
+            executed_transaction (tuple): A transaction history row, a pending transaction with its execution time.
+
+        Returns:
+            bytes: The 48-byte record.
+    """
+
+    creation_time, future_time, source, target, amount, execution_time = executed_transaction;
+    return SETTLEMENT_RECORD.pack(encode_time(creation_time), encode_time(future_time), source, target,
+                                  bk.to_cents(amount), encode_time(execution_time));
+
+
+# Function to decode an executed transaction
+def decode_settlement(record: bytes) -> tuple[str, str, int, int, float, str]:
+    """
+        Args:
+            record (bytes): A record written by encode_settlement.
+
+        Returns:
+            tuple: The transaction history row.
+    """
+
+    return unpack_settlement(SETTLEMENT_RECORD.unpack(record));
+
+
+# Function to turn the unpacked fields of a settlement record into a transaction history row
+def unpack_settlement(fields: tuple[int, int, int, int, int, int]) -> tuple[str, str, int, int, float, str]:
+    """
+        Args:
+            fields (tuple): The integers of a settlement record.
+
+        Returns:
+            tuple: The transaction history row.
+    """
+
+    return unpack_transfer(fields[:5]) + (decode_time(fields[5]),);
+
+
+# Function to encode the identity and balance of an account
+def encode_account(account_number: int, account: dict[str, any]) -> bytes:
+    """
+        Args:
+            account_number (int): The account number.
+            account (dict): The account details. The queues and the history are sent as transfer and
+                            settlement records.
+
+        Returns:
+            bytes: A fixed header followed by the UTF-8 first name, last name and ID number.
+    """
+
+    names: list[bytes] = [account[field].encode("utf-8") for field in ("first_name", "last_name", "id_number")];
+    return ACCOUNT_HEADER.pack(account_number, account["balance_cents"], *map(len, names)) + b"".join(names);
+
+
+# Function to decode the identity and balance of an account
+def decode_account(record: bytes, offset: int = 0) -> tuple[int, dict[str, any], int]:
+    """
+        Args:
+            record (bytes): The buffer holding a record written by encode_account.
+            offset (int): The position of the record in the buffer (default is 0).
+
+        Returns:
+            tuple: The account number, the account with empty queues, and the position after the record.
+    """
+
+    account_number, cents, *lengths = ACCOUNT_HEADER.unpack_from(record, offset);
+    offset += ACCOUNT_HEADER.size;
+    names: list[str] = [];
+    for length in lengths:
+        names.append(record[offset:offset + length].decode("utf-8"));
+        offset += length;
+    first_name, last_name, id_number = names;
+    return account_number, {"first_name": first_name, "last_name": last_name, "id_number": id_number,
+                            "balance_cents": cents, "transactions_to_execute": [],
+                            "transaction_history": []}, offset;
+
+
+# Function to frame a batch of records
+def encode_batch(record_type: int, records: list[any]) -> bytes:
+    """
+        Encodes many records of one type into a single frame: a header with the record type, the number of
+        records and the payload size, followed by the records back to back.
+
+        Args:
+            record_type (int): TRANSFER, SETTLEMENT or ACCOUNT.
+            records (list): Pending transactions, transaction history rows, or (account_number, account) pairs.
+
+        Returns:
+            bytes: The frame.
+
+        Raises:
+            ValueError: If the record type is unknown.
+    """
+
+    if record_type == TRANSFER:
+        payload: bytes = b"".join(encode_transfer(record) for record in records);
+    elif record_type == SETTLEMENT:
+        payload = b"".join(encode_settlement(record) for record in records);
+    elif record_type == ACCOUNT:
+        payload = b"".join(encode_account(account_number, account) for account_number, account in records);
+    else:
+        raise ValueError(f"Unknown record type {record_type}.");
+    return FRAME_HEADER.pack(record_type, len(records), len(payload)) + payload;
+
+
+# Function to decode a frame
+def decode_batch(frame: bytes) -> tuple[int, list[any]]:
+    """
+        Args:
+            frame (bytes): A frame written by encode_batch.
+
+        Returns:
+            tuple: The record type and the decoded records.
+
+        Raises:
+            ValueError: If the frame is truncated, its payload does not hold whole records, or the record type is
+                        unknown.
+    """
+
+    if len(frame) < FRAME_HEADER.size:
+        raise ValueError("The frame is truncated.");
+    record_type, count, size = FRAME_HEADER.unpack_from(frame);
+    payload: memoryview = memoryview(frame)[FRAME_HEADER.size:FRAME_HEADER.size + size];
+    if len(payload) != size:
+        raise ValueError("The frame is truncated.");
+    if record_type in (TRANSFER, SETTLEMENT):
+        record: struct.Struct = TRANSFER_RECORD if record_type == TRANSFER else SETTLEMENT_RECORD;
+        if size % record.size != 0:
+            raise ValueError(f"The payload of {size} bytes does not hold whole {record.size}-byte records.");
+        unpack: Callable = unpack_transfer if record_type == TRANSFER else unpack_settlement;
+        records: list[any] = [unpack(fields) for fields in record.iter_unpack(payload)];
+    elif record_type == ACCOUNT:
+        records = [];
+        offset: int = 0;
+        data: bytes = bytes(payload);
+        try:
+            for _ in range(count):
+                account_number, account, offset = decode_account(data, offset);
+                records.append((account_number, account));
+        except (struct.error, ValueError):
+            raise ValueError("The frame is truncated.") from None;
+        if offset != size:
+            raise ValueError(f"The payload of {size} bytes does not hold whole account records.");
+    else:
+        raise ValueError(f"Unknown record type {record_type}.");
+    if len(records) != count:
+        raise ValueError("The frame is truncated.");
+    return record_type, records;
+
+
+# Function to read the frames of a binary stream
+def read_batches(stream: BinaryIO) -> Iterator[tuple[int, list[any]]]:
+    """
+        Args:
+            stream (BinaryIO): A stream of frames written one after another.
+
+        Returns:
+            Iterator: The record type and the records of every frame, until the end of the stream.
+
+        Raises:
+            ValueError: If the stream ends inside a frame.
+    """
+
+    while header := stream.read(FRAME_HEADER.size):
+        if len(header) != FRAME_HEADER.size:
+            raise ValueError("The frame is truncated.");
+        payload: bytes = stream.read(FRAME_HEADER.unpack(header)[2]);
+        yield decode_batch(header + payload);
+
+
+# Function to write the accounts with their queues and history as frames
+def write_accounts(accounts: dict[int, dict[str, any]], stream: BinaryIO) -> int:
+    """
+        Writes a consistent copy of the accounts as three frames: the accounts, every pending transaction, and every
+        history row including the archived ones. The accounts are read through a ReadSnapshot, so transfers keep
+        settling while they are written.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            stream (BinaryIO): The binary stream to write to.
+
+        Returns:
+            int: The number of bytes written.
+    """
+
+    with bk.ReadSnapshot(accounts) as snapshot:
+        frames: list[bytes] = [
+            encode_batch(ACCOUNT, list(snapshot.items())),
+            encode_batch(TRANSFER, [transaction for account in snapshot.values()
+                                    for transaction in account["transactions_to_execute"]]),
+            encode_batch(SETTLEMENT, [row for account in snapshot.values() for row in bh.iter_history(account)])
+        ];
+    return sum(stream.write(frame) for frame in frames);
+
+
+# Function to read accounts written by write_accounts
+def read_accounts(stream: BinaryIO) -> dict[int, dict[str, any]]:
+    """
+        Args:
+            stream (BinaryIO): A stream of frames written by write_accounts.
+
+        Returns:
+            dict: The accounts, with their pending transactions and history rows in the source account.
+
+        Raises:
+            ValueError: If a frame is malformed, or a transaction refers to an account that was not read.
+    """
+
+    accounts: dict[int, dict[str, any]] = {};
+    for record_type, records in read_batches(stream):
+        if record_type == ACCOUNT:
+            accounts.update(records);
+            continue;
+        field: str = "transactions_to_execute" if record_type == TRANSFER else "transaction_history";
+        for record in records:
+            if record[2] not in accounts:
+                raise ValueError(f"Account {record[2]} does not exist.");
+            accounts[record[2]][field].append(record);
+    return accounts;
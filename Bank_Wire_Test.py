@@ -0,0 +1,179 @@
+import io
+
+import pytest
+
+import Bank_Wire as bw
+
+
+def create_mock_accounts():
+    return {
+        1001: {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "id_number": "012345678",
+            "balance_cents": 250010,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        },
+        1002: {
+            "first_name": "Zoë",
+            "last_name": "Johnson",
+            "id_number": "987654321",
+            "balance_cents": -1505,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+    };
+
+
+# Tests for encode_time and decode_time functions
+
+
+def test_time_round_trip():
+    # Arrange
+    timestamps: list[str] = ["0001-01-01 00:00:00", "2024-02-29 23:59:59", "2025-03-30 02:30:00"];
+
+    # Act
+    decoded: list[str] = [bw.decode_time(bw.encode_time(timestamp)) for timestamp in timestamps];
+
+    # Assert
+    assert decoded == timestamps;
+    assert bw.encode_time("2025-01-02 00:00:00") - bw.encode_time("2025-01-01 23:59:59") == 1;
+
+
+def test_encode_time_invalid_format():
+    # Act
+    with pytest.raises(ValueError) as ex:
+        bw.encode_time("2025/01/01 10:00:00");
+
+    # Assert
+    assert str(ex.value) == "'2025/01/01 10:00:00' does not match the format YYYY-MM-DD HH:MM:SS.";
+
+
+# Tests for transfer and settlement records
+
+
+def test_transfer_round_trip():
+    # Arrange
+    transaction: tuple = ("2025-01-01 10:00:00", "2025-01-02 10:00:00", 1001, 1002, 300.25);
+
+    # Act
+    record: bytes = bw.encode_transfer(transaction);
+
+    # Assert
+    assert len(record) == bw.TRANSFER_RECORD.size == 40;
+    assert bw.decode_transfer(record) == transaction;
+
+
+def test_settlement_round_trip():
+    # Arrange
+    executed: tuple = ("2025-01-01 10:00:00", "2025-01-02 10:00:00", 1001, 1002, 300, "2025-01-02 10:00:05");
+
+    # Act
+    record: bytes = bw.encode_settlement(executed);
+
+    # Assert
+    assert len(record) == bw.SETTLEMENT_RECORD.size == 48;
+    assert bw.decode_settlement(record) == executed;
+
+
+# Tests for account records
+
+
+def test_account_round_trip():
+    # Arrange
+    account: dict[str, any] = create_mock_accounts()[1002];
+
+    # Act
+    account_number, decoded, end = bw.decode_account(bw.encode_account(1002, account));
+
+    # Assert
+    assert account_number == 1002;
+    assert decoded == account;
+    assert end == bw.ACCOUNT_HEADER.size + len("Zoë".encode("utf-8")) + len("Johnson") + len("987654321");
+
+
+# Tests for encode_batch, decode_batch and read_batches functions
+
+
+def test_batch_round_trip_for_every_record_type():
+    # Arrange
+    transfers: list[tuple] = [("2025-01-01 10:00:00", "2025-01-02 10:00:00", 1001, 1002, n + 0.01) for n in range(100)];
+    settlements: list[tuple] = [transfer + ("2025-01-02 10:00:01",) for transfer in transfers];
+    accounts: list[tuple] = list(create_mock_accounts().items());
+
+    # Act
+    frames: list[bytes] = [bw.encode_batch(bw.TRANSFER, transfers), bw.encode_batch(bw.SETTLEMENT, settlements),
+                           bw.encode_batch(bw.ACCOUNT, accounts)];
+
+    # Assert
+    assert len(frames[0]) == bw.FRAME_HEADER.size + 100 * bw.TRANSFER_RECORD.size;
+    assert [bw.decode_batch(frame) for frame in frames] == [(bw.TRANSFER, transfers), (bw.SETTLEMENT, settlements),
+                                                            (bw.ACCOUNT, accounts)];
+
+
+def test_read_batches_from_stream():
+    # Arrange
+    transfer: tuple = ("2025-01-01 10:00:00", "2025-01-02 10:00:00", 1001, 1002, 5.00);
+    stream: io.BytesIO = io.BytesIO(bw.encode_batch(bw.TRANSFER, [transfer]) + bw.encode_batch(bw.TRANSFER, []));
+
+    # Act
+    batches: list = list(bw.read_batches(stream));
+
+    # Assert
+    assert batches == [(bw.TRANSFER, [transfer]), (bw.TRANSFER, [])];
+
+
+def test_decode_batch_truncated_frame():
+    # Arrange
+    frame: bytes = bw.encode_batch(bw.TRANSFER, [("2025-01-01 10:00:00", "2025-01-02 10:00:00", 1001, 1002, 5.00)]);
+
+    # Act
+    with pytest.raises(ValueError) as ex:
+        bw.decode_batch(frame[:-1]);
+
+    # Assert
+    assert str(ex.value) == "The frame is truncated.";
+
+
+def test_decode_batch_partial_record():
+    # Arrange
+    frame: bytes = bw.encode_batch(bw.SETTLEMENT, [
+        ("2025-01-01 10:00:00", "2025-01-02 10:00:00", 1001, 1002, 5.00, "2025-01-02 10:00:01")]);
+    header: bytes = bw.FRAME_HEADER.pack(bw.SETTLEMENT, 1, bw.SETTLEMENT_RECORD.size - 8);
+
+    # Act
+    with pytest.raises(ValueError) as ex:
+        bw.decode_batch(header + frame[bw.FRAME_HEADER.size:-8]);
+
+    # Assert
+    assert str(ex.value) == "The payload of 40 bytes does not hold whole 48-byte records.";
+
+def test_encode_batch_unknown_record_type():
+    # Act
+    with pytest.raises(ValueError) as ex:
+        bw.encode_batch(9, []);
+
+    # Assert
+    assert str(ex.value) == "Unknown record type 9.";
+
+
+# Tests for write_accounts and read_accounts functions
+
+
+def test_accounts_round_trip_with_queues_and_history():
+    # Arrange
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    accounts[1001]["transactions_to_execute"].append(("2025-01-01 10:00:00", "2030-01-02 10:00:00", 1001, 1002, 5.00));
+    accounts[1002]["transaction_history"].append(
+        ("2025-01-01 10:00:00", "2025-01-02 10:00:00", 1002, 1001, 7.25, "2025-01-02 10:00:01"));
+    stream: io.BytesIO = io.BytesIO();
+
+    # Act
+    written: int = bw.write_accounts(accounts, stream);
+    stream.seek(0);
+    decoded: dict[int, dict[str, any]] = bw.read_accounts(stream);
+
+    # Assert
+    assert written == len(stream.getvalue());
+    assert decoded == accounts;
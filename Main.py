@@ -1,33 +1,355 @@
+import argparse
+import builtins
+import os
+import time
+from contextlib import redirect_stdout
+from datetime import timedelta
+
 import Bank_Accounts as bk
+import Bank_Diagnostics as bd
+import Bank_Events as bev
+import Bank_History as bh
+import Bank_Identity as bid
+import Bank_Integrity as bi
+import Bank_Ingest as bip
+import Bank_Query as bq
+import Bank_Replication as brp
+import Bank_Reports as br
+import Bank_Scheduler as bs
+import Bank_Statements as bst
+import Bank_Wire as bw
+import Bank_Storage as bsg
 
 
-def main() -> None:
-    # Main loop to display the menu and process user selections
-    accounts = bk.init_interface();
+# Function to parse the command line arguments
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+        Parses the command line arguments. Without --report the interactive menu is started.
 
-    try:
-        while True:
+        Args:
+            argv (list[str] | None): The arguments to parse, or None for sys.argv (default is None).
+
+        Returns:
+            argparse.Namespace: The parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(description="Bank accounts interface");
+    parser.add_argument("--report", choices=["accounts", "balance", "richest", "overdrawn"],
+                        help="export an account report instead of starting the interactive menu");
+    parser.add_argument("--format", dest="output_format", choices=["text", "csv", "json"], default="text",
+                        help="the output format of the report");
+    parser.add_argument("--page", type=int, default=1, help="the 1-based page of the report to export");
+    parser.add_argument("--limit", type=int, default=None, help="the number of accounts per page");
+    parser.add_argument("--after", type=int, default=None,
+                        help="list the accounts after this account number (accounts report only)");
+    parser.add_argument("--output", default=None, help="the file to write the report to (default is stdout)");
+    parser.add_argument("--no-background", dest="background", action="store_false",
+                        help="do not settle due transactions automatically in the background");
+    parser.add_argument("--archive-dir", default=None,
+                        help="move old transaction history to compressed segments in this directory");
+    parser.add_argument("--archive-after-days", type=float, default=30,
+                        help="the age in days after which transaction history is archived");
+    parser.add_argument("--statements", default=None,
+                        help="export the statements of all accounts to this directory and exit");
+    parser.add_argument("--export-wire", default=None,
+                        help="write the accounts, pending transactions and history to this file in the binary wire "
+                             "format of Bank_Wire and exit");
+    parser.add_argument("--where", nargs=3, action="append", metavar=("FIELD", "OP", "VALUE"),
+                        help="list the accounts matching this predicate, such as --where balance '<' 0, and exit; "
+                             "repeat it to combine predicates");
+    parser.add_argument("--save-snapshot", default=None,
+                        help="save the balances and history counts of the accounts to this file and exit");
+    parser.add_argument("--reconcile", default=None,
+                        help="replay the history executed since the snapshot in this file, report every account "
+                             "whose balance does not match and exit");
+    parser.add_argument("--period-start", default=None, help="the first day of the statement period (YYYY-MM-DD)");
+    parser.add_argument("--period-end", default=None, help="the first day after the statement period (YYYY-MM-DD)");
+    parser.add_argument("--workers", type=int, default=None, help="the number of statement worker processes");
+    parser.add_argument("--journal", default=None,
+                        help="replay this journal on startup and append every transfer, settlement and new account");
+    parser.add_argument("--replicate", type=int, default=None,
+                        help="stream the journal to followers on this local port (requires --journal)");
+    parser.add_argument("--store", default=None,
+                        help="keep the accounts in this disk-backed store, with only the active accounts in memory");
+    parser.add_argument("--cache-size", type=int, default=10_000,
+                        help="the number of accounts the --store cache keeps in memory");
+    parser.add_argument("--replay", default=None,
+                        help="run the menu inputs recorded in this file, one per line, and report their timings; "
+                             "transactions are only settled by the replayed inputs");
+    return parser.parse_args(argv);
+
+
+# Names of the main menu options, used in the replay timings
+MENU_OPTIONS: dict[str, str] = {
+    "1": "Add a new transaction",
+    "2": "Execute all pending transactions",
+    "3": "Execute all due transactions",
+    "4": "Reports interface",
+    "5": "Open a new account",
+    "7": "Memory diagnostics"
+};
+
+
+# Function to run the main menu until the user exits
+def run_menu(accounts: dict[int, dict[str, any]], ingest: bip.IngestPipeline, profiler: bd.MemoryProfiler,
+             timings: list[tuple[str, float]] | None = None, identities: bid.IdentityTable | None = None,
+             events: bev.EventStore | None = None) -> None:
+    """
+        Displays the main menu and processes the user's selections until Exit is selected or the input ends.
+
+        Args:
+            accounts (dict): The dictionary containing all accounts.
+            ingest (IngestPipeline): The pipeline that commits new transfers.
+            profiler (MemoryProfiler): The profiler of the memory diagnostics option.
+            timings (list | None): If given, (option, seconds) is appended for every processed selection
+                                   (default is None).
+            identities (IdentityTable | None): The identity indexes used by the reports (default is None).
+            events (EventStore | None): The projections used by the reports (default is None).
+    """
+
+    while True:
+        try:
             option: str = bk.print_menu();
+            started: float = time.perf_counter();
 
             match option:
                 case "1":
-                    accounts = bk.add_transaction(accounts);
+                    accounts = bk.add_transaction(accounts, ingest=ingest);
                 case "2":
                     accounts = bk.execute_transactions(accounts, due_only=False);
                 case "3":
                     accounts = bk.execute_transactions(accounts, due_only=True);
                 case "4":
-                    bk.reports_interface(accounts);
+                    bk.reports_interface(accounts, identities, events);
                 case "5":
                     accounts = bk.open_new_account(accounts);
                 case "6":
                     print("Exiting the system.");
-                    break;
+                    return;
+                case "7":
+                    print(bd.format_report(profiler.report(accounts)));
+                    if isinstance(accounts, bsg.CachedAccounts):
+                        print(f"Account cache: {accounts.stats()}");
                 case _:
                     print("Invalid option. Please try again.");
+        except EOFError:
+            return;
+
+        if timings is not None:
+            timings.append((option, time.perf_counter() - started));
+
+
+# Function to replay a recorded session through the main menu
+def replay_session(path: str, accounts: dict[int, dict[str, any]], ingest: bip.IngestPipeline,
+                   profiler: bd.MemoryProfiler, identities: bid.IdentityTable | None = None,
+                   events: bev.EventStore | None = None) -> list[tuple[str, float]]:
+    """
+        Feeds the lines of a recorded session to the prompts of the menu, with the menu output suppressed. Lines
+        starting with '#' are comments. The replay ends at an Exit selection or at the end of the file.
+
+        Args:
+            path (str): The session file, one input per line.
+            accounts (dict): The dictionary containing all accounts.
+            ingest (IngestPipeline): The pipeline that commits new transfers.
+            profiler (MemoryProfiler): The profiler of the memory diagnostics option.
+            identities (IdentityTable | None): The identity indexes used by the reports (default is None).
+            events (EventStore | None): The projections used by the reports (default is None).
+
+        Returns:
+            list: (option, seconds) for every main menu selection that was processed completely.
+    """
+
+    with open(path, encoding="utf-8") as source:
+        answers = iter([line.rstrip("\n") for line in source if not line.startswith("#")]);
+
+    def scripted_input(prompt: str = "") -> str:
+        try:
+            return next(answers);
+        except StopIteration:
+            raise EOFError("The recorded session has ended.") from None;
+
+    timings: list[tuple[str, float]] = [];
+    original_input = builtins.input;
+    builtins.input = scripted_input;
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            run_menu(accounts, ingest, profiler, timings, identities, events);
+    finally:
+        builtins.input = original_input;
+    return timings;
+
+
+# Function to format the timings of a replayed session
+def format_timings(timings: list[tuple[str, float]]) -> str:
+    """
+        Args:
+            timings (list): (option, seconds) pairs returned by replay_session.
+
+        Returns:
+            str: The number of commands, total, mean and slowest time of every option, in milliseconds.
+    """
+
+    lines: list[str] = [f"Replayed {len(timings)} commands in {sum(seconds for _, seconds in timings) * 1000:.1f} ms."];
+    by_option: dict[str, list[float]] = {};
+    for option, seconds in timings:
+        by_option.setdefault(option, []).append(seconds);
+    for option, durations in sorted(by_option.items()):
+        lines.append(f"{option}. {MENU_OPTIONS.get(option, 'Invalid option')}: {len(durations)} commands, "
+                     f"total {sum(durations) * 1000:.1f} ms, mean {sum(durations) / len(durations) * 1000:.3f} ms, "
+                     f"max {max(durations) * 1000:.3f} ms");
+    return "\n".join(lines);
+
+
+def main(argv: list[str] | None = None) -> None:
+    arguments: argparse.Namespace = parse_arguments(argv);
+    accounts = bk.init_interface();
+
+    # Disk-backed store with the hot set of accounts cached in memory
+    store: bsg.CachedAccounts | None = None;
+    if arguments.store:
+        store = bsg.open_cached_store(arguments.store, accounts, arguments.cache_size);
+        accounts = store;
+    try:
+        run(arguments, accounts);
+    finally:
+        if store is not None:
+            store.close();
+
+
+# Function to run the interface selected by the command line arguments
+def run(arguments: argparse.Namespace, accounts: dict[int, dict[str, any]]) -> None:
+    """
+        Runs an export, or the interactive menu with its background threads, on the given accounts.
+
+        Args:
+            arguments (argparse.Namespace): The parsed command line arguments.
+            accounts (dict): The dictionary containing all accounts.
+    """
+
+    if arguments.archive_dir:
+        bh.archive_all(accounts, arguments.archive_dir, timedelta(days=arguments.archive_after_days),
+                       lock=bk.settlement_lock);
+
+    # Journal that makes every change durable and feeds the followers
+    journal: brp.Journal | None = None;
+    server: brp.ReplicationServer | None = None;
+    if arguments.journal:
+        # A disk-backed store already holds the entries recorded before it was last closed
+        from_seq: int = 0;
+        if isinstance(accounts, bsg.CachedAccounts):
+            if accounts.journal_seq is None:
+                print("The --store was not closed cleanly, so it is unknown which journal entries it holds. "
+                      "Restore it from a backup or start a new store from the journal.");
+                return;
+            from_seq = accounts.journal_seq;
+        brp.replay_journal(accounts, arguments.journal, from_seq);
+        journal = brp.Journal(arguments.journal);
+        # A new journal starts with the accounts it was started from, so it alone recreates the store
+        bev.seed_journal(journal, accounts);
+        if isinstance(accounts, bsg.CachedAccounts):
+            accounts.journal_seq = journal.seq;
+        bk.event_listeners.append(journal.record);
+        if arguments.replicate is not None:
+            # Merkle tree of the accounts, kept up to date, whose root lets followers verify their replica
+            server = brp.ReplicationServer(journal, port=arguments.replicate, tree=bi.maintain_merkle_tree(accounts));
+            print(f"Replicating to followers on port {server.start()}.");
+    elif arguments.replicate is not None:
+        print("--replicate requires --journal.");
+        return;
+
+    if arguments.report:
+        br.export_report(accounts, arguments.report, arguments.output_format, arguments.page, arguments.limit,
+                         arguments.output, arguments.after);
+        return;
+
+    if arguments.statements:
+        if not arguments.period_start or not arguments.period_end:
+            print("--statements requires --period-start and --period-end.");
+            return;
+        bst.export_statements(accounts, arguments.statements, arguments.period_start, arguments.period_end,
+                              workers=arguments.workers,
+                              progress=lambda done, total: print(f"Statements: {done}/{total} shards done."));
+        return;
+
+    if arguments.where:
+        try:
+            rows: list[tuple[int, dict[str, any]]] = bq.query_accounts(
+                accounts, [bq.parse_predicate(*predicate) for predicate in arguments.where], order_by="account_number");
+        except ValueError as e:
+            print(f"Invalid query: {e}");
+            return;
+        for account_number, account in rows:
+            print(f"{account_number}: {account['first_name']} {account['last_name']}, "
+                  f"balance {bk.format_cents(account['balance_cents'])}");
+        return;
+
+    if arguments.save_snapshot:
+        bi.save_snapshot(bi.take_snapshot(accounts), arguments.save_snapshot);
+        print(f"Saved a snapshot of {len(accounts)} accounts to {arguments.save_snapshot}.");
+        return;
+
+    if arguments.reconcile:
+        mismatches: list[tuple[int, float | None, float | None]] = bi.reconcile(accounts,
+                                                                                bi.load_snapshot(arguments.reconcile));
+        for account_number, rebuilt, live in mismatches:
+            print(f"Account {account_number}: rebuilt balance {rebuilt}, live balance {live}.");
+        print(f"Reconciliation found {len(mismatches)} mismatched accounts.");
+        return;
+
+    if arguments.export_wire:
+        with open(arguments.export_wire, "wb") as output:
+            print(f"Wrote {bw.write_accounts(accounts, output)} bytes to {arguments.export_wire}.");
+        return;
+
+    # Background thread that settles transactions when their future time arrives. A replay runs without it, so
+    # its timings and results depend only on the recorded inputs and not on the wall clock
+    executor: bs.DueTransactionExecutor | None = None;
+    if arguments.background and not arguments.replay:
+        executor = bs.DueTransactionExecutor(accounts);
+        executor.schedule_pending();
+        executor.start();
+
+    # Single writer that commits new transfers in batches from a bounded queue
+    ingest: bip.IngestPipeline = bip.IngestPipeline(accounts, scheduler=executor);
+    ingest.start();
+
+    # Interned names and identity indexes that answer the ID and first name reports without a scan
+    identities: bid.IdentityTable = bid.build_identity_table(accounts);
+
+    # Projections of the journal, kept up to date as events are published, that answer the balance total. Without
+    # a journal there is no event log to build them from, and the reports scan the accounts
+    events: bev.EventStore | None = None;
+    if journal is not None:
+        events = bev.build_event_store(accounts, journal, ("balances",));
+
+    # Memory profiler of the diagnostics option, which keeps the previous report to show growth
+    profiler: bd.MemoryProfiler = bd.MemoryProfiler();
+
+    # Main loop to display the menu and process user selections, or a recorded session replayed through it
+    try:
+        if arguments.replay:
+            print(format_timings(replay_session(arguments.replay, accounts, ingest, profiler, identities,
+                                                events)));
+        else:
+            run_menu(accounts, ingest, profiler, identities=identities, events=events);
 
     except KeyboardInterrupt:
         print("\nProgram interrupted by user. Exiting.");
+    finally:
+        bk.event_listeners.remove(identities.record);
+        if events is not None:
+            bk.event_listeners.remove(events.record);
+        ingest.stop();
+        if executor is not None:
+            executor.stop();
+        if server is not None:
+            server.stop();
+            bi.release_merkle_tree(accounts);
+        if journal is not None:
+            bk.event_listeners.remove(journal.record);
+            journal.close();
+            if isinstance(accounts, bsg.CachedAccounts):
+                accounts.journal_seq = journal.seq;
 
 
 if __name__ == "__main__":
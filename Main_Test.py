@@ -0,0 +1,159 @@
+from unittest.mock import patch
+
+import Bank_Diagnostics as bd
+import Bank_Ingest as bip
+import Bank_Replication as brp
+import Bank_Storage as bsg
+import Main
+
+
+def create_mock_accounts():
+    return {
+        1001: {
+            "first_name": "Alice",
+            "last_name": "Smith",
+            "id_number": "123456789",
+            "balance_cents": 250000,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        },
+        1002: {
+            "first_name": "Bob",
+            "last_name": "Johnson",
+            "id_number": "987654321",
+            "balance_cents": 150000,
+            "transactions_to_execute": [],
+            "transaction_history": []
+        }
+    };
+
+
+# Tests for replay_session function
+
+
+def test_replay_session_runs_recorded_inputs(tmp_path, capsys):
+    # Arrange
+    session = tmp_path / "session.txt";
+    session.write_text("# Open an account, then print the total\n"
+                       "5\nJohn\nDoe\n123456789\n1000.00\n4\n9\n10\n8\n6\n4\n");
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+    ingest: bip.IngestPipeline = bip.IngestPipeline(accounts);
+
+    # Act
+    timings: list = Main.replay_session(str(session), accounts, ingest, bd.MemoryProfiler());
+
+    # Assert
+    assert [option for option, _ in timings] == ["5", "4", "8"];
+    assert all(seconds >= 0 for _, seconds in timings);
+    assert accounts[1003]["first_name"] == "John";
+    assert capsys.readouterr().out == "";
+
+
+def test_replay_session_stops_at_end_of_file(tmp_path):
+    # Arrange
+    session = tmp_path / "session.txt";
+    session.write_text("5\nJohn\n");
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+
+    # Act
+    timings: list = Main.replay_session(str(session), accounts, bip.IngestPipeline(accounts), bd.MemoryProfiler());
+
+    # Assert
+    assert timings == [];
+    assert 1003 not in accounts;
+
+
+# Tests for format_timings function
+
+
+def test_format_timings_groups_by_option():
+    # Act
+    text: str = Main.format_timings([("4", 0.002), ("5", 0.001), ("4", 0.004)]);
+
+    # Assert
+    assert text.splitlines() == [
+        "Replayed 3 commands in 7.0 ms.",
+        "4. Reports interface: 2 commands, total 6.0 ms, mean 3.000 ms, max 4.000 ms",
+        "5. Open a new account: 1 commands, total 1.0 ms, mean 1.000 ms, max 1.000 ms"
+    ];
+
+
+def test_replay_runs_without_background_executor(tmp_path):
+    # Arrange
+    session = tmp_path / "session.txt";
+    session.write_text("4\n9\n10\n6\n");
+    accounts: dict[int, dict[str, any]] = create_mock_accounts();
+
+    # Act
+    with patch("Bank_Scheduler.DueTransactionExecutor") as executor, patch("builtins.print"):
+        Main.run(Main.parse_arguments(["--replay", str(session)]), accounts);
+
+    # Assert
+    executor.assert_not_called();
+
+
+# Tests for main function
+
+
+def test_restart_with_store_and_journal_applies_entries_once(tmp_path):
+    # Arrange
+    store_path: str = str(tmp_path / "accounts");
+    journal_path: str = str(tmp_path / "journal.log");
+    session = tmp_path / "session.txt";
+    session.write_text("6\n");
+    journal: brp.Journal = brp.Journal(journal_path);
+    journal.record({}, {"type": "settlement", "transaction": ["2024-08-17 14:00:00", "2024-08-18 14:00:00", 1001,
+                                                              1002, 300], "execution_time": "2024-08-18 14:00:00"});
+    journal.close();
+    argv: list[str] = ["--store", store_path, "--journal", journal_path, "--replay", str(session)];
+
+    # Act
+    balances: list[tuple[int, int]] = [];
+    for _ in range(3):
+        with patch("builtins.print"):
+            Main.main(argv);
+        store: bsg.DiskAccountStore = bsg.DiskAccountStore(store_path);
+        balances.append((store[1001]["balance_cents"], len(store[1001]["transaction_history"])));
+        store.close();
+
+    # Assert
+    assert balances == [(220050, 2)] * 3;
+
+
+def test_saved_snapshot_reconciles_after_journal_replay(tmp_path):
+    # Arrange
+    snapshot_path: str = str(tmp_path / "snapshot.json");
+    journal_path: str = str(tmp_path / "journal.log");
+    with patch("builtins.print"):
+        Main.main(["--save-snapshot", snapshot_path]);
+    journal: brp.Journal = brp.Journal(journal_path);
+    journal.record({}, {"type": "account_open", "account_number": 1004, "first_name": "Dana", "last_name": "White",
+                        "id_number": "444444444", "balance": 100.00});
+    journal.record({}, {"type": "settlement", "transaction": ["2024-08-17 14:00:00", "2024-08-18 14:00:00", 1001,
+                                                              1002, 300], "execution_time": "2024-08-18 14:00:00"});
+    journal.close();
+
+    # Act
+    with patch("builtins.print") as mock_print:
+        Main.main(["--journal", journal_path, "--reconcile", snapshot_path]);
+
+    # Assert
+    mock_print.assert_called_once_with("Reconciliation found 0 mismatched accounts.");
+
+
+def test_where_lists_matching_accounts():
+    # Act
+    with patch("builtins.print") as mock_print:
+        Main.main(["--where", "balance", ">", "2000", "--where", "last_name", "==", "Smith"]);
+
+    # Assert
+    mock_print.assert_called_once_with("1001: Alice Smith, balance 2500.50");
+
+
+def test_where_rejects_non_numeric_balance():
+    # Act
+    with patch("builtins.print") as mock_print:
+        Main.main(["--where", "balance", "<", "low"]);
+
+    # Assert
+    mock_print.assert_called_once_with("Invalid query: The value of balance should be a number.");